@@ -21,6 +21,12 @@ from Qt import QtWidgets
 from Qt import QtCore
 from Qt import QtGui
 
+WINDOW_OBJECT_NAME = 'ScaleReferenceWindow'
+
+# cached by get_maya_main_window() and show()
+_MAYA_MAIN_WINDOW = None
+_UI_WINDOW = None
+
 
 class ScaleReference(QtWidgets.QMainWindow):
     '''Class that creates QtWidget and executes functionality.
@@ -47,6 +53,7 @@ class ScaleReference(QtWidgets.QMainWindow):
         '''
 
         self.setWindowTitle('Scale Reference')
+        self.setObjectName(WINDOW_OBJECT_NAME)
 
         # Label for Scene Units -----------------------------------------------
 
@@ -57,11 +64,11 @@ class ScaleReference(QtWidgets.QMainWindow):
 
         self.current_maya_unit = cmds.currentUnit(query=True, linear=True)
 
-        units_lbl = QtWidgets.QLabel(self.current_maya_unit)
-        units_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        self.units_lbl = QtWidgets.QLabel(self.current_maya_unit)
+        self.units_lbl.setAlignment(QtCore.Qt.AlignCenter)
 
         scene_units_lbl_layout.layout().addWidget(scene_units_lbl)
-        scene_units_lbl_layout.layout().addWidget(units_lbl)
+        scene_units_lbl_layout.layout().addWidget(self.units_lbl)
 
         # User selected Units combobox Layout ---------------------------------
 
@@ -522,6 +529,14 @@ class ScaleReference(QtWidgets.QMainWindow):
             self.popup_ok_window(
                 str(grp_name) + '_refDistance_grp' + 'does not exist')
 
+    def refresh_scene_units(self):
+        '''Updates the Scene's Units label when the window is reopened.
+
+        '''
+
+        self.current_maya_unit = cmds.currentUnit(query=True, linear=True)
+        self.units_lbl.setText(self.current_maya_unit)
+
     def reset_line_edits(self):
         '''Resets Qt QLineEdits after Dimension Group creation and deletion.
 
@@ -533,9 +548,49 @@ class ScaleReference(QtWidgets.QMainWindow):
         self.height_le.setText('')
 
 
-MAIN_WINDOW = \
-    [o for o in QtWidgets.qApp.topLevelWidgets() if o.objectName() ==
-     'MayaWindow'][0]
+def get_maya_main_window():
+    '''Returns Maya's main window, wrapped once and then cached.
+
+    Returns:
+        QtWidgets.QWidget -- Maya's main window.
+    '''
+
+    global _MAYA_MAIN_WINDOW
+
+    if _MAYA_MAIN_WINDOW is None:
+        from maya import OpenMayaUI
+        from Qt import QtCompat
+
+        pointer = OpenMayaUI.MQtUtil.mainWindow()
+        _MAYA_MAIN_WINDOW = QtCompat.wrapInstance(
+            int(pointer), QtWidgets.QWidget)
+
+    return _MAYA_MAIN_WINDOW
+
+
+def show():
+    '''Shows the Scale Reference window, building it on first use.
+
+    Later calls reuse and raise the same window instead of creating
+    another one.
+
+    Returns:
+        ScaleReference -- The window.
+    '''
+
+    global _UI_WINDOW
+
+    if _UI_WINDOW is None:
+        _UI_WINDOW = ScaleReference(get_maya_main_window())
+    else:
+        _UI_WINDOW.refresh_scene_units()
+
+    _UI_WINDOW.show()
+    _UI_WINDOW.raise_()
+    _UI_WINDOW.activateWindow()
+
+    return _UI_WINDOW
+
 
-UI_WINDOW = ScaleReference(MAIN_WINDOW)
-UI_WINDOW.show()
+if __name__ == '__main__':
+    show()
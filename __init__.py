@@ -1,8 +1,49 @@
+'''Scale Reference tool.
+
+Importing the package only loads the core API, so mayapy batch jobs and
+render farm Python never import Qt. The gui module is imported the first
+time it is used, through show() or the package's gui attribute.
+'''
+
+import sys
+
 from core import *
-import gui
+
+
+def show():
+    '''Shows the Scale Reference window, importing the GUI on first use.
+
+    Returns:
+        gui.ScaleReference -- The window.
+    '''
+
+    return _load_gui().show()
+
+
+def _load_gui():
+    import gui
+    return gui
+
+
+def __getattr__(name):
+    # lazy module attributes need Python 3.7, on Python 2 use show()
+    if name == 'gui':
+        return _load_gui()
+    raise AttributeError(
+        'module ' + repr(__name__) + ' has no attribute ' + repr(name))
+
 
 def reload_all_modules():
+    try:
+        reload_module = reload
+    except NameError:
+        from importlib import reload as reload_module
+
     import core
-    import gui
-    reload(core)
-    reload(gui)
+    import network
+    # core re-exports the reference layout of network
+    reload_module(network)
+    reload_module(core)
+    # the GUI is only reloaded once something loaded it
+    if 'gui' in sys.modules:
+        reload_module(sys.modules['gui'])
@@ -0,0 +1,230 @@
+'''Flags meshes whose size does not match their scale reference.
+
+Every mesh's world bounding box is read with one batched query into a NumPy
+array, and every reference's dimensions and position with two more. Each
+mesh transform is compared with its assigned reference, or the nearest one,
+with vectorized math, so scenes with tens of thousands of transforms stay
+interactive.
+
+Like a fitted reference, a mesh's length is its X extent, its width its Z
+extent and its height its Y extent.
+
+    import audit
+    print(audit.format_audit(audit.audit_scale(tolerance=0.1)))
+'''
+
+from collections import namedtuple
+
+from scene import cmds
+
+import core
+import metadata
+import registry
+import units
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# mesh is the long name of the mesh transform. dimensions and expected are
+# (length, width, height) in scene units, ratio is how far the worst axis
+# is off, ie. 2.0 for twice or half the size
+AuditResult = namedtuple(
+    'AuditResult', ['mesh', 'reference', 'dimensions', 'expected', 'ratio'])
+
+DEFAULT_TOLERANCE = 0.25
+
+# meshes compared against every reference at once when picking the nearest
+NEAREST_CHUNK_SIZE = 4096
+
+
+def collect_mesh_bounds(nodes=None):
+    '''Returns the combined world bounds of every mesh transform.
+
+    Keyword Arguments:
+        nodes {list} -- Meshes or their parents, None uses every mesh in
+            the scene (default: {None})
+
+    Returns:
+        tuple -- Long transform names and an (N, 6) array of their
+            (xmin, ymin, zmin, xmax, ymax, zmax) bounds, in scene units.
+    '''
+
+    if nodes is None:
+        shapes = cmds.ls(type='mesh', noIntermediate=True, long=True)
+    else:
+        shapes = cmds.ls(
+            nodes, dag=True, type='mesh', noIntermediate=True, long=True)
+    if not shapes:
+        return [], numpy.zeros((0, 6))
+
+    bounds = numpy.asarray(
+        cmds.worldBoundingBoxes(shapes), dtype=numpy.float64)
+    # transforms sharing a short name under different parents stay apart
+    transforms = numpy.array([
+        shape.rsplit('|', 1)[0] if shape.count('|') > 1 else shape
+        for shape in shapes])
+
+    # several meshes under one transform are combined into one box
+    names, inverse = numpy.unique(transforms, return_inverse=True)
+    if len(names) == len(shapes):
+        return names.tolist(), bounds[numpy.argsort(inverse)]
+
+    order = numpy.argsort(inverse, kind='mergesort')
+    starts = numpy.flatnonzero(numpy.r_[True, numpy.diff(inverse[order])])
+    combined = numpy.hstack((
+        numpy.minimum.reduceat(bounds[order, :3], starts),
+        numpy.maximum.reduceat(bounds[order, 3:], starts)))
+
+    return names.tolist(), combined
+
+
+def collect_references():
+    '''Returns the prefix, dimensions and world position of every reference.
+
+    Returns:
+        tuple -- Prefixes, an (M, 3) array of (length, width, height) and an
+            (M, 3) array of world positions, in scene units.
+    '''
+
+    scene_unit = core.get_scene_units()
+    groups = metadata.read_all('*' + registry.REF_GRP_SUFFIX)
+    if not groups:
+        return [], numpy.zeros((0, 3)), numpy.zeros((0, 3))
+
+    dimensions = []
+    for grp_name, ref_data in groups:
+        if ref_data is None:
+            dimensions.append(core.get_dimension_distances(grp_name))
+        elif (ref_data.get('scene_unit') or scene_unit) != scene_unit:
+            dimensions.append(units.convert_many(
+                ref_data['dimensions'], ref_data['scene_unit'], scene_unit))
+        else:
+            dimensions.append(ref_data['dimensions'])
+
+    positions = cmds.worldPositions([grp_name for grp_name, _ in groups])
+
+    return [registry.get_prefix(grp_name) for grp_name, _ in groups], \
+        numpy.asarray(dimensions, dtype=numpy.float64), \
+        numpy.asarray(positions, dtype=numpy.float64)
+
+
+def nearest_references(points, ref_positions):
+    '''Returns the index of the nearest reference of every point.
+
+    Distances are computed a chunk of points at a time so memory stays
+    bounded with many meshes and references.
+
+    Arguments:
+        points {numpy.ndarray} -- (N, 3) world positions.
+        ref_positions {numpy.ndarray} -- (M, 3) reference positions.
+
+    Returns:
+        numpy.ndarray -- (N,) indices into ref_positions.
+    '''
+
+    nearest = numpy.empty(len(points), dtype=numpy.intp)
+    for start in range(0, len(points), NEAREST_CHUNK_SIZE):
+        chunk = points[start:start + NEAREST_CHUNK_SIZE]
+        squared = ((chunk[:, None, :] - ref_positions[None, :, :]) ** 2) \
+            .sum(axis=2)
+        nearest[start:start + len(chunk)] = squared.argmin(axis=1)
+    return nearest
+
+
+def audit_scale(nodes=None, assignments=None, tolerance=DEFAULT_TOLERANCE,
+                any_orientation=False, outliers_only=True):
+    '''Compares mesh sizes with their scale references.
+
+    Keyword Arguments:
+        nodes {list} -- Meshes or their parents, None audits every mesh
+            (default: {None})
+        assignments {dict} -- Long name of a mesh transform, ie.
+            '|set|chair' -> prefix of the reference to compare it with.
+            Unassigned meshes use the nearest reference (default: {None})
+        tolerance {float} -- Allowed deviation, ie. 0.25 accepts sizes
+            between 1 / 1.25 and 1.25 times the reference
+            (default: {DEFAULT_TOLERANCE})
+        any_orientation {bool} -- Compare the sorted extents, so a mesh
+            lying on its side still matches (default: {False})
+        outliers_only {bool} -- Only return meshes above the tolerance
+            (default: {True})
+
+    Raises:
+        ImportError -- If NumPy is not available.
+        ValueError -- If an assigned prefix is not in the scene.
+
+    Returns:
+        list -- AuditResult tuples, worst ratio first.
+    '''
+
+    if numpy is None:
+        raise ImportError('audit_scale requires NumPy')
+
+    prefixes, ref_dimensions, ref_positions = collect_references()
+    meshes, bounds = collect_mesh_bounds(nodes)
+    if not prefixes or not meshes:
+        return []
+
+    # length is measured along X, width along Z and height along Y
+    extents = bounds[:, 3:] - bounds[:, :3]
+    dimensions = extents[:, [0, 2, 1]]
+    centers = (bounds[:, :3] + bounds[:, 3:]) / 2.0
+
+    ref_indices = nearest_references(centers, ref_positions)
+    if assignments:
+        prefix_indices = dict((prefix, index)
+                              for index, prefix in enumerate(prefixes))
+        for mesh_index, mesh in enumerate(meshes):
+            prefix = assignments.get(mesh)
+            if prefix is None:
+                continue
+            if prefix not in prefix_indices:
+                raise ValueError(
+                    str(prefix) + registry.REF_GRP_SUFFIX +
+                    ' does not exist')
+            ref_indices[mesh_index] = prefix_indices[prefix]
+
+    expected = ref_dimensions[ref_indices]
+    measured = dimensions
+    if any_orientation:
+        measured = numpy.sort(measured, axis=1)
+        expected = numpy.sort(expected, axis=1)
+
+    # flat axes of a mesh or reference are skipped instead of dividing by 0
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        ratios = measured / expected
+        ratios = numpy.maximum(ratios, 1.0 / ratios)
+    ratios[~numpy.isfinite(ratios)] = 1.0
+    worst = ratios.max(axis=1)
+
+    selected = numpy.flatnonzero(worst > 1.0 + tolerance) if outliers_only \
+        else numpy.arange(len(meshes))
+    selected = selected[numpy.argsort(-worst[selected], kind='mergesort')]
+
+    return [AuditResult(
+        meshes[index], prefixes[ref_indices[index]],
+        tuple(dimensions[index].tolist()),
+        tuple(ref_dimensions[ref_indices[index]].tolist()),
+        float(worst[index])) for index in selected]
+
+
+def format_audit(results, limit=50):
+    '''Returns audit results as text, ie. for the script editor.
+
+    Keyword Arguments:
+        limit {int} -- Rows to show before summarizing the rest
+            (default: {50})
+    '''
+
+    lines = ['%-30s %-20s %8s  %-26s %s' % (
+        'mesh', 'reference', 'ratio', 'size (l, w, h)', 'expected')]
+    for result in results[:limit]:
+        lines.append('%-30s %-20s %8.3f  %-26s %s' % (
+            result.mesh, result.reference, result.ratio,
+            '%.3g, %.3g, %.3g' % result.dimensions,
+            '%.3g, %.3g, %.3g' % result.expected))
+    if len(results) > limit:
+        lines.append('... ' + str(len(results) - limit) + ' more')
+    return '\n'.join(lines)
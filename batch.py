@@ -0,0 +1,266 @@
+'''Stamps scale references into many scene files with a pool of mayapy.
+
+The manifest is a JSON file holding a list of jobs, or {"jobs": [...]}:
+
+    {"scene": "shots/sh010.ma",
+     "output": "shots/sh010_ref.ma",      (optional, defaults to scene)
+     "backend": "cmds",                   (optional)
+     "references": [["crate", 50, 50, 50, "cm"], ...],
+     "manifest": "sh010_refs.csv",        (optional, see manifest.py)
+     "report": "sh010_refs_report.csv"}   (optional, see report.py)
+
+Every job runs in its own mayapy process so a scene that crashes or hangs
+Maya only fails that job. Failed jobs are retried, and one JSON line per
+scene is written to the result log as soon as the scene is done.
+
+usage: python batch.py MANIFEST [--mayapy PATH] [--workers N]
+       [--retries N] [--timeout SECONDS] [--log FILE]
+'''
+
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+# prefixes the worker's result line, Maya prints its own output on stdout
+RESULT_MARKER = 'SCALEREF_RESULT '
+
+SCENE_TYPES = {'.ma': 'mayaAscii', '.mb': 'mayaBinary'}
+
+
+def load_manifest(path):
+    '''Returns the list of jobs of a JSON manifest.
+
+    '''
+
+    with open(path) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if isinstance(manifest, dict):
+        manifest = manifest['jobs']
+    return manifest
+
+
+# =============================================================================
+# Controller
+# =============================================================================
+
+def run_job(job, mayapy='mayapy', retries=1, timeout=None):
+    '''Runs one job in a fresh mayapy process, retrying failures.
+
+    Arguments:
+        job {dict} -- Job of the manifest.
+
+    Keyword Arguments:
+        mayapy {str} -- mayapy executable (default: {'mayapy'})
+        retries {int} -- Extra attempts after a failure (default: {1})
+        timeout {float} -- Seconds before a worker is killed, None waits
+            forever (default: {None})
+
+    Returns:
+        dict -- Result of the last attempt, see run_worker().
+    '''
+
+    command = [mayapy, os.path.abspath(__file__), '--worker']
+    job_json = json.dumps(job)
+
+    for attempt in range(1, retries + 2):
+        start = time.time()
+        result = _run_process(command, job_json, timeout)
+        result.update({
+            'scene': job.get('scene'),
+            'attempts': attempt,
+            'seconds': time.time() - start,
+        })
+        if result['status'] != 'failed':
+            break
+
+    return result
+
+
+def _run_process(command, job_json, timeout):
+    try:
+        process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT)
+    except OSError as err:
+        return {'status': 'failed', 'errors': [str(err)]}
+
+    timer = None
+    if timeout:
+        timer = threading.Timer(timeout, process.kill)
+        timer.start()
+    try:
+        output = process.communicate(job_json.encode('utf-8'))[0]
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+    # Maya may print anything, a bad byte or result only fails this scene
+    output = output.decode('utf-8', 'replace')
+    for line in reversed(output.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            try:
+                result = json.loads(line[len(RESULT_MARKER):])
+            except ValueError as err:
+                return {'status': 'failed',
+                        'errors': ['unreadable worker result: ' + str(err)]}
+            if not isinstance(result, dict):
+                return {'status': 'failed',
+                        'errors': ['unreadable worker result: ' +
+                                   repr(result)]}
+            return result
+
+    # the worker died before reporting, keep the end of its output
+    return {
+        'status': 'failed',
+        'errors': ['mayapy exited with code ' + str(process.returncode)] +
+                  output.splitlines()[-20:],
+    }
+
+
+def run_batch(jobs, log_path, mayapy='mayapy', workers=None, retries=1,
+              timeout=None):
+    '''Runs every job on a pool of mayapy processes.
+
+    Arguments:
+        jobs {list} -- Jobs of the manifest.
+        log_path {str} -- File that receives one JSON result per line.
+
+    Keyword Arguments:
+        mayapy {str} -- mayapy executable (default: {'mayapy'})
+        workers {int} -- Concurrent mayapy processes, None uses the number
+            of CPUs (default: {None})
+        retries {int} -- Extra attempts after a failure (default: {1})
+        timeout {float} -- Seconds before a worker is killed
+            (default: {None})
+
+    Returns:
+        dict -- Number of jobs per status.
+    '''
+
+    pool = ThreadPool(workers or multiprocessing.cpu_count())
+    counts = {}
+
+    def run(job):
+        return run_job(job, mayapy, retries, timeout)
+
+    try:
+        with open(log_path, 'w') as log_file:
+            for result in pool.imap_unordered(run, jobs):
+                log_file.write(json.dumps(result) + '\n')
+                log_file.flush()
+                counts[result['status']] = counts.get(result['status'], 0) + 1
+    finally:
+        pool.close()
+        pool.join()
+
+    return counts
+
+
+# =============================================================================
+# Worker, runs inside mayapy
+# =============================================================================
+
+def run_worker(job):
+    '''Opens a scene, builds its references and saves it.
+
+    Arguments:
+        job {dict} -- Job of the manifest.
+
+    Returns:
+        dict -- status ('ok', 'partial' when some references failed, or
+            'failed'), created reference count and error messages.
+    '''
+
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+    try:
+        from maya import cmds
+
+        import core
+
+        cmds.file(job['scene'], open=True, force=True)
+
+        results = core.create_dimension_grps(
+            [tuple(spec) for spec in job.get('references', [])],
+            backend=job.get('backend', 'cmds'))
+        errors = [result.prefix + ': ' + result.error
+                  for result in results if result.error]
+        created = len(results) - len(errors)
+
+        if job.get('manifest'):
+            import manifest
+
+            report = manifest.build_from_manifest(
+                job['manifest'], backend=job.get('backend', 'cmds'))
+            created += report['created']
+            errors.extend(
+                job['manifest'] + ':' + str(line) + ': ' + message
+                for line, message in report['errors'])
+
+        output = job.get('output') or job['scene']
+        scene_type = SCENE_TYPES.get(
+            os.path.splitext(output)[1].lower(), 'mayaAscii')
+        cmds.file(rename=output)
+        cmds.file(save=True, force=True, type=scene_type)
+
+        reported = None
+        if job.get('report'):
+            import report
+
+            reported = report.export_report(job['report'])
+
+        return {
+            'status': 'partial' if errors else 'ok',
+            'created': created,
+            'reported': reported,
+            'errors': errors,
+        }
+    finally:
+        maya.standalone.uninitialize()
+
+
+def _worker_main():
+    job = json.loads(sys.stdin.read())
+    try:
+        result = run_worker(job)
+    except Exception as err:  # report any failure to the controller
+        result = {'status': 'failed', 'errors': [repr(err)]}
+
+    sys.stdout.write('\n' + RESULT_MARKER + json.dumps(result) + '\n')
+    sys.stdout.flush()
+    return 0 if result['status'] != 'failed' else 1
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--worker']:
+        return _worker_main()
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('manifest', help='JSON manifest of jobs')
+    parser.add_argument(
+        '--mayapy', default=os.environ.get('MAYAPY', 'mayapy'),
+        help='mayapy executable (default: $MAYAPY or mayapy)')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--retries', type=int, default=1)
+    parser.add_argument('--timeout', type=float)
+    parser.add_argument('--log', default='scale_reference_batch.jsonl')
+    args = parser.parse_args(argv)
+
+    counts = run_batch(
+        load_manifest(args.manifest), args.log, args.mayapy, args.workers,
+        args.retries, args.timeout)
+
+    print(', '.join('%s: %d' % item for item in sorted(counts.items())))
+    return 1 if counts.get('failed') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
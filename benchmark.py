@@ -0,0 +1,255 @@
+'''Benchmarks reference creation, conversion, lookup and deletion at scale.
+
+Runs against scene.FakeCmds so it needs no Maya session. Reports wall time,
+scene operations per reference and peak Python memory for each case and
+batch size, and can save the results as JSON to compare across releases.
+
+usage: python benchmark.py [--sizes 1 100 1000 10000] [--output FILE]
+       [--baseline FILE] [--tolerance 0.25] [--no-memory]
+'''
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+import core
+import registry
+import scene
+
+DEFAULT_SIZES = (1, 100, 1000, 10000)
+
+# benchmark json layout version
+FORMAT_VERSION = 1
+
+
+def make_specs(count, unit='m'):
+    '''Returns count distinct (prefix, length, width, height, unit) specs.
+
+    '''
+
+    return [('bench%05d' % index, 1.0 + index % 7, 2.0, 3.0, unit)
+            for index in range(count)]
+
+
+def bench_create(specs):
+    core.create_dimension_grps(specs)
+
+
+def bench_create_template(specs):
+    core.create_dimension_grps(specs, backend='template')
+
+
+def bench_convert(specs):
+    scene_unit = core.get_scene_units()
+    for _, len_value, width_value, height_value, unit in specs:
+        core.convert_units(
+            True, scene_unit, unit, len_value, width_value, height_value)
+
+
+def bench_exists(specs):
+    for spec in specs:
+        core.check_ref_grp_exists(spec[0])
+
+
+def bench_exists_registry(specs):
+    registry.enable()
+    try:
+        for spec in specs:
+            core.check_ref_grp_exists(spec[0])
+    finally:
+        registry.disable()
+
+
+def bench_delete(specs):
+    for spec in specs:
+        core.delete_ref_grp(spec[0])
+
+
+def bench_delete_bulk(specs):
+    core.delete_ref_grps(pattern='bench*')
+
+
+# case name -> (callable, whether the references must already exist)
+CASES = (
+    ('create', bench_create, False),
+    ('create_template', bench_create_template, False),
+    ('convert', bench_convert, False),
+    ('exists', bench_exists, True),
+    ('exists_registry', bench_exists_registry, True),
+    ('delete', bench_delete, True),
+    ('delete_bulk', bench_delete_bulk, True),
+)
+
+
+def run_case(case_func, specs, prebuild, memory=True):
+    '''Times one case on a fresh fake scene.
+
+    Tracing allocations slows Python down several times over, so the case
+    is timed untraced and run a second time for its peak memory.
+
+    Arguments:
+        case_func {callable} -- Benchmark taking the specs.
+        specs {list} -- Reference specs the case works on.
+        prebuild {bool} -- Build the references before timing.
+
+    Keyword Arguments:
+        memory {bool} -- Measure peak memory in a second, traced run
+            (default: {True})
+
+    Returns:
+        dict -- seconds, ops_per_ref and peak_bytes of the case.
+    '''
+
+    seconds, operations = _run_once(case_func, specs, prebuild)
+
+    peak_bytes = None
+    if memory and tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            _run_once(case_func, specs, prebuild, trace=True)
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'ops_per_ref': operations / float(len(specs)),
+        'peak_bytes': peak_bytes,
+    }
+
+
+def _run_once(case_func, specs, prebuild, trace=False):
+    # returns the seconds and scene operations the case took. When trace is
+    # set the peak is reset after the setup, so only the case is measured.
+    fake = scene.FakeCmds()
+    with scene.use_backend(fake):
+        if prebuild:
+            core.create_dimension_grps(specs)
+        fake.reset_stats()
+        if trace:
+            tracemalloc.clear_traces()
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+
+        start = scene._clock()
+        case_func(specs)
+        seconds = scene._clock() - start
+
+    return seconds, fake.operation_count()
+
+
+def run(sizes=DEFAULT_SIZES, cases=None, memory=True):
+    '''Runs every case at every size.
+
+    Keyword Arguments:
+        sizes {iterable} -- Batch sizes to run (default: {DEFAULT_SIZES})
+        cases {list} -- Names of the cases to run, None runs all of them
+            (default: {None})
+        memory {bool} -- See run_case (default: {True})
+
+    Returns:
+        dict -- Benchmark report, see FORMAT_VERSION.
+    '''
+
+    results = []
+    for size in sizes:
+        specs = make_specs(size)
+        for case_name, case_func, prebuild in CASES:
+            if cases and case_name not in cases:
+                continue
+            result = run_case(case_func, specs, prebuild, memory)
+            result.update({'case': case_name, 'size': size})
+            results.append(result)
+
+    return {
+        'format': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    '''Returns the results that got slower than baseline by over tolerance.
+
+    Arguments:
+        report {dict} -- Report returned by run().
+        baseline {dict} -- Earlier report to compare against.
+        tolerance {float} -- Allowed slowdown ratio, ie. 0.25 for 25%.
+
+    Returns:
+        list -- (case, size, baseline seconds, seconds) of each regression.
+    '''
+
+    previous = dict(((result['case'], result['size']), result['seconds'])
+                    for result in baseline['results'])
+
+    regressions = []
+    for result in report['results']:
+        key = (result['case'], result['size'])
+        if key in previous and \
+                result['seconds'] > previous[key] * (1.0 + tolerance):
+            regressions.append(key + (previous[key], result['seconds']))
+    return regressions
+
+
+def format_table(report):
+    '''Returns the report as a plain text table.
+
+    '''
+
+    lines = ['%-16s %8s %12s %12s %12s' % (
+        'case', 'size', 'seconds', 'ops/ref', 'peak KiB')]
+    for result in report['results']:
+        peak = result['peak_bytes']
+        lines.append('%-16s %8d %12.4f %12.1f %12s' % (
+            result['case'], result['size'], result['seconds'],
+            result['ops_per_ref'],
+            '-' if peak is None else '%.1f' % (peak / 1024.0)))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument(
+        '--cases', nargs='+', choices=[case[0] for case in CASES])
+    parser.add_argument('--output', help='write the report as JSON')
+    parser.add_argument('--baseline', help='report to check regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument(
+        '--no-memory', action='store_true',
+        help='skip the second, traced run measuring peak memory')
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.cases, not args.no_memory)
+    print(format_table(report))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(
+                report, json.load(baseline_file), args.tolerance)
+        for case_name, size, before, after in regressions:
+            print('REGRESSION %s @ %d: %.4fs -> %.4fs' % (
+                case_name, size, before, after))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,133 +1,681 @@
-from maya import cmds
+import fnmatch
+import re
+from collections import namedtuple
 
-def create_dimension_grp(grp_name, len_value, width_value, height_value):
+from scene import cmds
+
+import metadata
+import naming
+import network
+import profiling
+import registry
+import units
+import validation
+from network import (
+    DIMENSION_COLORS, get_dimension_points, set_color_overrides)
+
+BuildResult = namedtuple('BuildResult', ['prefix', 'group', 'error'])
+
+# scene backends create_dimension_grps can build with
+BACKENDS = ('cmds', 'om', 'template')
+
+# prefix of the network the 'template' backend duplicates
+TEMPLATE_PREFIX = 'scaleReferenceTemplate'
+
+# shared display layer each dimension's parts are put on, see
+# assign_display_layers
+DISPLAY_LAYER_FORMAT = 'scaleReference_{0}_layer'
+
+def create_dimension_grp(grp_name, len_value, width_value, height_value,
+                         unit=None, position=None, allocator=None,
+                         parts=None, scene_unit=None):
     '''Create Dimension Group for a reference of scale.
 
     Dimension Group is a set of 3 custom distance measurements to represent
     length, width, and height.
 
+    Every node is created directly under its final name and parent, and each
+    distanceDimShape is connected to its locators once, as planned by
+    network.plan_reference. The group carries the reference's metadata, see
+    metadata.py.
+
+    Arguments:
+        grp_name {str} -- Prefix used to name every node of the reference.
+        len_value {float} -- Length of the reference in scene units.
+        width_value {float} -- Width of the reference in scene units.
+        height_value {float} -- Height of the reference in scene units.
+
+    Keyword Arguments:
+        unit {str} -- Unit the dimensions were specified in, recorded in
+            the reference registry (default: {None})
+        position {tuple} -- World (x, y, z) to center the reference on,
+            None keeps it at the origin (default: {None})
+        allocator {naming.NameAllocator} -- Allocator of unique node
+            names, None uses the default _01 names (default: {None})
+        parts {dict} -- See build_dimension_network (default: {None})
+        scene_unit {str} -- Scene's linear unit, queried when None
+            (default: {None})
+
+    Returns:
+        str -- Name of the created _refDistance_grp.
+    '''
+
+    dimensions = (len_value, width_value, height_value)
+    reference = network.plan_reference(
+        None, grp_name, dimensions, unit, position,
+        scene_unit or get_scene_units(), naming.reference_node_names(
+            grp_name, [dimen for dimen, _ in DIMENSION_COLORS], allocator))
+    ref_grp = build_reference(reference, parts)
+
+    with profiling.phase('register'):
+        register_ref_grp(grp_name, ref_grp, unit, reference.dimensions)
+
+    return ref_grp
+
+def build_dimension_network(grp_name, len_value, width_value, height_value,
+                            position=None, names=None, parts=None):
+    '''Creates the node network of a Dimension Group.
+
+    Unlike create_dimension_grp the group is not recorded in the reference
+    registry.
+
+    Keyword Arguments:
+        position {tuple} -- World (x, y, z) to center the reference on
+            (default: {None})
+        names {dict} -- Node names from naming.reference_node_names, None
+            uses the default names (default: {None})
+        parts {dict} -- When given, no colors are set. Each dimension's
+            (group, start locator, end locator, distance) names are
+            appended to parts[dimension] instead, to be colored or layered
+            in bulk with apply_dimension_display (default: {None})
+
+    Returns:
+        str -- Name of the created _refDistance_grp.
+    '''
+
+    return build_reference(network.plan_reference(
+        None, grp_name, (len_value, width_value, height_value),
+        position=position, names=names), parts)
+
+def build_reference(reference, parts=None):
+    '''Builds a reference planned by network.plan_reference with maya.cmds.
+
+    A reference that fails part way is removed again, so the scene never
+    holds half of one.
+
+    Arguments:
+        reference {network.ReferencePlan} -- Reference to build.
+
+    Keyword Arguments:
+        parts {dict} -- See build_dimension_network (default: {None})
+
+    Returns:
+        str -- Name of the created _refDistance_grp.
+    '''
+
+    actual = {}
+    ref_grp = network.apply_reference(reference, actual, colors=parts is None)
+    if parts is not None:
+        for dimen, _, nodes in reference.parts:
+            parts.setdefault(dimen, []).append(
+                tuple(actual[node] for node in nodes))
+
+    return ref_grp
+
+def create_locator(loc_name, position, parent, shape_name=None):
+    '''Creates a locator transform and shape under parent.
+
+    Arguments:
+        loc_name {str} -- Name of the locator's transform.
+        position {tuple} -- Local (x, y, z) position of the locator shape.
+        parent {str} -- Transform to parent the locator under.
+
+    Keyword Arguments:
+        shape_name {str} -- Name of the locator's shape
+            (default: {loc_name + 'Shape'})
+
+    Returns:
+        tuple -- Names of the locator's transform and shape.
+    '''
+
+    loc = cmds.createNode('transform', n=loc_name, p=parent)
+    loc_shape = cmds.createNode(
+        'locator', n=shape_name or loc_name + 'Shape', p=loc)
+    cmds.setAttr(loc_shape + '.localPosition', *position)
+
+    return loc, loc_shape
+
+def create_dimension_grps(specs, backend='cmds', min_size=None,
+                          display_layers=False, allocator=None,
+                          existing_prefixes=None):
+    '''Create many Dimension Groups in a single undo chunk.
+
+    Viewport refresh is suspended while the batch is built so Maya only
+    redraws once at the end. Every spec is validated before the scene is
+    touched, and node names are allocated from one index of the scene's
+    names instead of relying on Maya's auto-rename. A failing spec does
+    not stop the batch, it is reported in the returned results instead.
+
     Arguments:
-        item {[type]} -- [description]
+        specs {list} -- (prefix, length, width, height, unit) tuples. The
+            dimensions are expressed in unit and converted to the scene's
+            units before building. A unit of None means scene units. An
+            optional sixth item gives the world (x, y, z) position to
+            center the reference on, in scene units.
+
+    Keyword Arguments:
+        backend {str} -- 'cmds' builds each reference with maya.cmds,
+            'om' queues the whole batch on one OpenMaya 2.0 MDagModifier,
+            'template' builds one network and duplicates it for every
+            reference (default: {'cmds'})
+        min_size {float} -- Reject specs with a dimension smaller than
+            this once converted to scene units (default: {None})
+        display_layers {bool} -- Draw the parts through the three shared
+            display layers of assign_display_layers instead of per-node
+            color overrides (default: {False})
+        allocator {naming.NameAllocator} -- Index of the scene's node
+            names. Batches built in chunks pass the same one to every
+            call, so the scene is only scanned once. None indexes the
+            scene for this call (default: {None})
+        existing_prefixes {set} -- Prefixes of the scene's references,
+            shared between chunks like allocator. The prefixes built are
+            added to it. None queries the scene (default: {None})
+
+    Returns:
+        list -- One BuildResult(prefix, group, error) per spec, in order.
+            group is None and error holds the message when a spec failed,
+            see validation.validate_specs for the checks run up front.
+    '''
+
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend: ' + str(backend))
+
+    scene_unit = get_scene_units()
+    results = [None] * len(specs)
+    refs = []
+
+    # reject invalid specs before any scene work starts
+    with profiling.phase('validate'):
+        for error in validation.validate_specs(
+                specs, scene_unit, min_size, existing=existing_prefixes):
+            if results[error.index] is None:
+                results[error.index] = BuildResult(
+                    error.prefix, None, error.message)
+
+    with profiling.phase('convert'):
+        for index, spec in enumerate(specs):
+            if results[index] is not None:
+                continue
+
+            grp_name, len_value, width_value, height_value, unit = spec[:5]
+            position = spec[5] if len(spec) > 5 else None
+            if unit and unit != scene_unit:
+                len_value, width_value, height_value = convert_units(
+                    True, scene_unit, unit, len_value, width_value,
+                    height_value)
+            else:
+                len_value, width_value, height_value = \
+                    float(len_value), float(width_value), float(height_value)
+
+            refs.append((
+                index, (grp_name, len_value, width_value, height_value),
+                unit, position))
+
+    if refs and allocator is None:
+        with profiling.phase('names'):
+            allocator = naming.NameAllocator()
+
+    # dimension -> parts of every reference, colored or layered at the end.
+    # The om and template builders color their nodes themselves unless
+    # they go on display layers.
+    parts = dict((dimen, []) for dimen, _ in DIMENSION_COLORS)
+    layer_parts = parts if display_layers else None
+
+    cmds.undoInfo(openChunk=True, chunkName='createDimensionGrps')
+    cmds.refresh(suspend=True)
+    try:
+        with profiling.phase('build'):
+            if backend == 'om':
+                _build_om(refs, results, allocator, layer_parts, scene_unit)
+            elif backend == 'template':
+                _build_template(
+                    refs, results, allocator, layer_parts, scene_unit)
+            else:
+                _build_cmds(refs, results, allocator, parts, scene_unit)
+
+        with profiling.phase('color'):
+            apply_dimension_display(parts, display_layers)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    if existing_prefixes is not None:
+        existing_prefixes.update(
+            str(result.prefix) for result in results if result.group)
+
+    return results
+
+def _build_cmds(refs, results, allocator, parts, scene_unit):
+    for index, ref, unit, position in refs:
+        try:
+            ref_grp = create_dimension_grp(
+                *ref, unit=unit, position=position, allocator=allocator,
+                parts=parts, scene_unit=scene_unit)
+        except (RuntimeError, ValueError) as err:
+            results[index] = BuildResult(ref[0], None, str(err))
+        else:
+            results[index] = BuildResult(ref[0], ref_grp, None)
+
+def _build_template(refs, results, allocator, parts, scene_unit):
+    if not refs:
+        return
+
+    dimens = [dimen for dimen, _ in DIMENSION_COLORS]
+
+    # build one template network, then duplicate it for every reference and
+    # only rename its nodes and move its locators
+    template_names = naming.reference_node_names(
+        TEMPLATE_PREFIX, dimens, allocator)
+    # the copies keep the template's colors, unless they go on layers
+    with profiling.phase('template'):
+        template = build_dimension_network(
+            TEMPLATE_PREFIX, 2.0, 2.0, 2.0, names=template_names,
+            parts=None if parts is None else {})
+        # copies inherit the attribute and only need their value set
+        cmds.addAttr(
+            template, longName=metadata.METADATA_ATTR, dataType='string')
+    try:
+        # name of each template descendant -> key in reference_node_names
+        keys = dict((name, key) for key, name in template_names.items())
+        template_keys = [
+            keys[node.split('|')[-1]] for node in cmds.listRelatives(
+                template, allDescendents=True, fullPath=True)]
+
+        for index, ref, unit, position in refs:
+            names = naming.reference_node_names(ref[0], dimens, allocator)
+            reference = network.plan_reference(
+                index, ref[0], ref[1:], unit, position, scene_unit, names)
+            try:
+                ref_grp = _duplicate_template(
+                    template, template_keys, reference, names, parts)
+            except (RuntimeError, ValueError) as err:
+                results[index] = BuildResult(ref[0], None, str(err))
+            else:
+                with profiling.phase('register'):
+                    register_ref_grp(
+                        ref[0], ref_grp, unit, reference.dimensions)
+                results[index] = BuildResult(ref[0], ref_grp, None)
+    finally:
+        with profiling.phase('template'):
+            cmds.delete(template)
+
+def _duplicate_template(template, template_keys, reference, names, parts):
+    with profiling.phase('duplicate'):
+        ref_grp = cmds.duplicate(
+            template, inputConnections=True, returnRootsOnly=True,
+            n=names['ref_grp'])[0]
+
+    try:
+        # listRelatives returns the copies in the same order as the
+        # template's nodes. Rename the deepest nodes first so the remaining
+        # paths stay valid.
+        with profiling.phase('rename'):
+            copies = cmds.listRelatives(
+                ref_grp, allDescendents=True, fullPath=True)
+            # planned name -> name of the renamed copy
+            actual = {reference.group: ref_grp}
+            for copy, key in sorted(
+                    zip(copies, template_keys),
+                    key=lambda pair: -pair[0].count('|')):
+                actual[names[key]] = cmds.rename(copy, names[key])
+
+        # the copy already has the nodes, connections, colors and metadata
+        # attribute, only the planned values differ from the template's
+        with profiling.phase('values'):
+            for op in reference.ops:
+                if op[0] == network.SET_ATTR:
+                    network.apply_op(op, actual)
+    except (RuntimeError, ValueError):
+        cmds.delete(ref_grp)
+        raise
+
+    if parts is not None:
+        for dimen, _, nodes in reference.parts:
+            parts[dimen].append(tuple(actual[node] for node in nodes))
+
+    return ref_grp
+
+def _build_om(refs, results, allocator, parts, scene_unit):
+    import om_backend
+
+    # the modifier is applied as a whole, so it fails or succeeds as a whole
+    try:
+        with profiling.phase('modifier'):
+            ref_grps = om_backend.create_dimension_grps(
+                [ref + (position,) for _, ref, _, position in refs],
+                allocator, parts)
+    except RuntimeError as err:
+        for index, ref, _, _ in refs:
+            results[index] = BuildResult(ref[0], None, str(err))
+    else:
+        for (index, ref, unit, _), ref_grp in zip(refs, ref_grps):
+            metadata.write(ref_grp, ref[1:], unit, scene_unit)
+            register_ref_grp(ref[0], ref_grp, unit, ref[1:])
+            results[index] = BuildResult(ref[0], ref_grp, None)
+
+def create_fitted_dimension_grps(nodes=None, backend='cmds'):
+    '''Create one Dimension Group per mesh, sized from its bounding box.
+
+    Each reference is named after the mesh's transform and centered on its
+    world bounding box, see fitted_prefixes. The bounds of every mesh are
+    read with one batched query. Several meshes under one transform share
+    one reference sized to their combined bounds.
+
+    Keyword Arguments:
+        nodes {list} -- Meshes or their parents, None uses the selection
+            (default: {None})
+        backend {str} -- See create_dimension_grps (default: {'cmds'})
+
+    Returns:
+        list -- One BuildResult per fitted transform.
     '''
 
-    dimens = ('length', 'width', 'height')
+    return create_dimension_grps(get_fitted_specs(nodes), backend=backend)
 
+def get_fitted_specs(nodes=None):
+    '''Returns the specs create_fitted_dimension_grps builds.
+
+    Keyword Arguments:
+        nodes {list} -- Meshes or their parents, None uses the selection
+            (default: {None})
+
+    Returns:
+        list -- One (prefix, length, width, height, None, position) spec
+            per mesh transform, in scene units.
+    '''
+
+    if nodes is None:
+        shapes = cmds.ls(
+            selection=True, dag=True, type='mesh', noIntermediate=True,
+            long=True)
+    else:
+        shapes = cmds.ls(
+            nodes, dag=True, type='mesh', noIntermediate=True, long=True)
+    if not shapes:
+        return []
+
+    # transform path -> combined (xmin, ymin, zmin, xmax, ymax, zmax)
+    transform_bounds = {}
+    transform_order = []
+    for shape, bounds in zip(shapes, cmds.worldBoundingBoxes(shapes)):
+        transform = shape.rsplit('|', 1)[0] if shape.count('|') > 1 \
+            else shape
+        if transform in transform_bounds:
+            previous = transform_bounds[transform]
+            bounds = tuple(min(previous[i], bounds[i]) for i in range(3)) + \
+                tuple(max(previous[i], bounds[i]) for i in range(3, 6))
+        else:
+            transform_order.append(transform)
+        transform_bounds[transform] = bounds
+
+    specs = []
+    for transform, prefix in zip(
+            transform_order, fitted_prefixes(transform_order)):
+        xmin, ymin, zmin, xmax, ymax, zmax = transform_bounds[transform]
+        # length is measured along X, width along Z and height along Y
+        specs.append((
+            prefix, xmax - xmin, zmax - zmin, ymax - ymin, None,
+            ((xmin + xmax) / 2.0, (ymin + ymax) / 2.0, (zmin + zmax) / 2.0)))
+
+    return specs
+
+def fitted_prefixes(transforms):
+    '''Returns a unique reference prefix for each transform.
+
+    A prefix is the transform's short name with its namespace separators
+    replaced, ie. 'set:chair' gives 'set_chair'. Transforms sharing a short
+    name, like several chair|chairShape under different parents, are
+    told apart by their whole path instead, ie. 'room1_chair'.
+
+    Arguments:
+        transforms {list} -- Long names of the transforms.
+
+    Returns:
+        list -- Prefixes in the order of transforms.
+    '''
+
+    short_prefixes = [_name_to_prefix(transform.split('|')[-1])
+                      for transform in transforms]
+    counts = {}
+    for prefix in short_prefixes:
+        counts[prefix] = counts.get(prefix, 0) + 1
+
+    prefixes = []
+    used = set()
+    for transform, prefix in zip(transforms, short_prefixes):
+        if counts[prefix] > 1:
+            prefix = _name_to_prefix(transform.strip('|'))
+        # two paths can still give the same prefix, ie. a_b|c and a|b_c
+        unique_prefix = prefix
+        suffix = 1
+        while unique_prefix in used:
+            suffix += 1
+            unique_prefix = prefix + '_' + str(suffix)
+        used.add(unique_prefix)
+        prefixes.append(unique_prefix)
+
+    return prefixes
+
+def _name_to_prefix(name):
+    # namespaces and path separators are not allowed in node names
+    return re.sub(r'[^0-9A-Za-z_]', '_', name)
+
+def update_dimension_grp(grp_name, length=None, width=None, height=None,
+                         unit=None):
+    '''Resizes an existing Dimension Group in place.
+
+    Only the local positions of the affected locators change, so the
+    group's nodes, connections and anything rigged to them are kept.
+    Dimensions that are not given, or whose locators already sit at the
+    requested size, are skipped. The group's metadata is rewritten with the new
+    size, and added to groups built before it existed.
+
+    Arguments:
+        grp_name {str} -- Prefix of the reference.
+
+    Keyword Arguments:
+        length {float} -- New length (default: {None})
+        width {float} -- New width (default: {None})
+        height {float} -- New height (default: {None})
+        unit {str} -- Unit the new values are expressed in, None means
+            scene units (default: {None})
+
+    Raises:
+        ValueError -- If the reference does not exist or a value is not
+            greater than zero.
+
+    Returns:
+        list -- Names of the dimensions that changed.
+    '''
+
+    ref_grp = str(grp_name) + '_refDistance_grp'
+    if not check_ref_grp_exists(grp_name):
+        raise ValueError(ref_grp + ' does not exist')
+
+    requested = [(dimen, value) for dimen, value in (
+        ('length', length), ('width', width), ('height', height))
+        if value is not None]
+    if not requested:
+        return []
+
+    values = [float(value) for _, value in requested]
+    if min(values) <= 0.0:
+        raise ValueError('Distance Values must be greater than zero')
+    scene_unit = get_scene_units()
+    if unit:
+        values = units.convert_many(values, unit, scene_unit)
+
+    # sizes of the other dimensions to write back, from the group's
+    # metadata in the scene unit it was written in
+    dimens = [dimen for dimen, _ in DIMENSION_COLORS]
+    ref_registry = registry.get_registry()
+    entry = ref_registry.get(grp_name) if ref_registry is not None else None
+    ref_data = metadata.read(ref_grp)
+    current = {}
+    source_unit = entry.unit if entry is not None else None
+    if ref_data is not None:
+        written = ref_data['dimensions']
+        written_unit = ref_data.get('scene_unit') or scene_unit
+        if written_unit != scene_unit:
+            written = units.convert_many(written, written_unit, scene_unit)
+        current = dict(zip(dimens, written))
+        source_unit = ref_data.get('unit')
+
+    # unchanged dimensions are detected from the locators themselves, they
+    # may have been moved since the metadata was written
+    locators = get_dimension_locators(ref_grp)
+    changed = []
+    for (dimen, _), value in zip(requested, values):
+        start_shape, end_shape = locators[dimen]
+        tuple_start_pos, tuple_end_pos = get_dimension_points(
+            dimen, value, value, value)
+        current[dimen] = value
+
+        if _positions_match(start_shape, tuple_start_pos) and \
+                _positions_match(end_shape, tuple_end_pos):
+            continue
+
+        cmds.setAttr(start_shape + '.localPosition', *tuple_start_pos)
+        cmds.setAttr(end_shape + '.localPosition', *tuple_end_pos)
+        changed.append(dimen)
+
+    if not changed:
+        return changed
+
+    # groups without metadata measure the dimensions that were not updated
     for dimen in dimens:
-        tuple_start_pos = ()
-        tuple_end_pos = ()
-
-        if dimen == 'length':
-            tuple_start_pos = (len_value)/2.0, 0, 0
-            tuple_end_pos = -(len_value)/2.0, 0, 0
-        elif dimen == 'width':
-            tuple_start_pos = 0, 0, (width_value)/2.0
-            tuple_end_pos = 0, 0, -((width_value)/2.0)
-        elif dimen == 'height':
-            tuple_start_pos = 0, (height_value)/2.0, 0
-            tuple_end_pos = 0, -((height_value)/2.0), 0
-
-        # create Length Locators
-        start_dimen_loc = cmds.spaceLocator(
-            n=str(grp_name) + '_start' + dimen + '_loc_01',
-            p=tuple_start_pos)
-
-        end_dimen_loc = cmds.spaceLocator(
-            n=str(grp_name) + '_end' + dimen + '_loc_01',
-            p=tuple_end_pos)
-
-        # Create length distanceDimension at generic 3d point
-        # to be repurposed
-        cmds.distanceDimension(startPoint=[1, 1, 1], endPoint=[-1, -1, -1])
-
-        # Rename default distanceDimension locators' transform and
-        # shape
-        temp_loc_1 = cmds.rename('locator1', 'tempLoc_01')
-        temp_rel_1 = cmds.listRelatives(temp_loc_1)
-        loc_name_1 = cmds.rename(temp_rel_1, temp_loc_1 + 'Shape')
-
-        temp_loc_2 = cmds.rename('locator2', 'tempLoc_02')
-        temp_rel_2 = cmds.listRelatives(temp_loc_2)
-        loc_name_2 = cmds.rename(temp_rel_2, temp_loc_2 + 'Shape')
-
-        # Rename distanceDimension Node
-        dist_dimen_new_name = cmds.rename(
-            'distanceDimension1', str(grp_name) + '_dist' + dimen + '_01')
-        temp_rel = cmds.listRelatives(dist_dimen_new_name)
-        cmds.rename(temp_rel, dist_dimen_new_name + 'Shape')
-
-        # Disconnect default distanceDimension locator and
-        # distanceDimension Node
-        cmds.disconnectAttr(
-            str(loc_name_1) + '.worldPosition',
-            str(dist_dimen_new_name) + 'Shape' + '.startPoint')
-        cmds.disconnectAttr(
-            str(loc_name_2) + '.worldPosition',
-            str(dist_dimen_new_name) + 'Shape' + '.endPoint')
-
-        # Connect new Locators to distanceDimension Node
-        cmds.connectAttr(
-            start_dimen_loc[0] + 'Shape.worldPosition',
-            str(dist_dimen_new_name) + 'Shape' + '.startPoint')
-        cmds.connectAttr(
-            end_dimen_loc[0] + 'Shape.worldPosition',
-            str(dist_dimen_new_name) + 'Shape' + '.endPoint')
-
-        # Delete default Locators
-        cmds.delete(temp_loc_1, temp_loc_2)
-
-        if dimen == 'length':
-            # group Lenth distanceDimension objects
-            length_grp = cmds.group(
-                start_dimen_loc, end_dimen_loc, dist_dimen_new_name,
-                n=str(grp_name) + '_' + dimen + 'Dist_grp')
-
-            set_color_overide(
-                13, start_dimen_loc, end_dimen_loc, dist_dimen_new_name)
-
-        elif dimen == 'width':
-            width_grp = cmds.group(
-                start_dimen_loc, end_dimen_loc, dist_dimen_new_name,
-                n=str(grp_name) + '_' + dimen + 'Dist_grp')
-
-            set_color_overide(
-                6, start_dimen_loc, end_dimen_loc, dist_dimen_new_name)
-
-        elif dimen == 'height':
-            height_grp = cmds.group(
-                start_dimen_loc, end_dimen_loc, dist_dimen_new_name,
-                n=str(grp_name) + '_' + dimen + 'Dist_grp')
-
-            set_color_overide(
-                14, start_dimen_loc, end_dimen_loc, dist_dimen_new_name)
-
-    cmds.group(
-        length_grp, width_grp, height_grp,
-        n=str(grp_name) + '_refDistance_grp')
+        if dimen not in current:
+            current[dimen] = 2.0 * max(abs(value) for value in cmds.getAttr(
+                locators[dimen][0] + '.localPosition')[0])
+
+    dimensions = (current['length'], current['width'], current['height'])
+    with profiling.phase('metadata'):
+        metadata.write(
+            ref_grp, dimensions, unit or source_unit, scene_unit,
+            add=not cmds.objExists(ref_grp + '.' + metadata.METADATA_ATTR))
+    if entry is not None:
+        ref_registry.add(
+            grp_name, entry.group, unit or source_unit, dimensions)
+
+    return changed
+
+def _positions_match(loc_shape, position):
+    return all(abs(a - b) < 1e-9 for a, b in zip(
+        cmds.getAttr(loc_shape + '.localPosition')[0], position))
+
+def update_dimension_grps(updates):
+    '''Resizes many Dimension Groups in a single undo chunk.
+
+    Arguments:
+        updates {list} -- (prefix, length, width, height, unit) tuples,
+            see update_dimension_grp. None skips a dimension.
+
+    Returns:
+        list -- One (prefix, changed dimensions, error) tuple per update.
+    '''
+
+    results = []
+
+    cmds.undoInfo(openChunk=True, chunkName='updateDimensionGrps')
+    cmds.refresh(suspend=True)
+    try:
+        for grp_name, length, width, height, unit in updates:
+            try:
+                changed = update_dimension_grp(
+                    grp_name, length, width, height, unit)
+            except (RuntimeError, ValueError) as err:
+                results.append((grp_name, [], str(err)))
+            else:
+                results.append((grp_name, changed, None))
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    return results
+
+def get_dimension_locators(ref_grp):
+    '''Returns the start and end locator shapes of each dimension.
+
+    Arguments:
+        ref_grp {str} -- Name of a _refDistance_grp.
+
+    Returns:
+        dict -- Dimension name to (start shape, end shape) names.
+    '''
+
+    locators = {}
+    for loc_shape in cmds.listRelatives(
+            ref_grp, allDescendents=True, type='locator', fullPath=True) \
+            or []:
+        short_name = loc_shape.split('|')[-1]
+        for dimen, _ in DIMENSION_COLORS:
+            if '_start' + dimen + '_loc' in short_name:
+                locators.setdefault(dimen, [None, None])[0] = loc_shape
+            elif '_end' + dimen + '_loc' in short_name:
+                locators.setdefault(dimen, [None, None])[1] = loc_shape
+
+    for dimen, _ in DIMENSION_COLORS:
+        if None in locators.get(dimen, (None,)):
+            raise ValueError(
+                str(ref_grp) + ' is missing its ' + dimen + ' locators')
+
+    return dict((dimen, tuple(shapes)) for dimen, shapes in locators.items())
+
+def get_dimension_distances(ref_grp):
+    '''Returns the distances a Dimension Group's shapes measure.
+
+    Arguments:
+        ref_grp {str} -- Name of a _refDistance_grp.
+
+    Returns:
+        tuple -- Measured (length, width, height) in scene units, None for
+            a dimension whose distance shape is missing.
+    '''
+
+    distances = {}
+    for dist_shape in cmds.listRelatives(
+            ref_grp, allDescendents=True, type='distanceDimShape',
+            fullPath=True) or []:
+        short_name = dist_shape.split('|')[-1]
+        for dimen, _ in DIMENSION_COLORS:
+            if '_dist' + dimen in short_name:
+                distances[dimen] = cmds.getAttr(dist_shape + '.distance')
+
+    return tuple(distances.get(dimen) for dimen, _ in DIMENSION_COLORS)
 
 def convert_units(up_or_down, cur_maya_unit, target_unit, len_value, width_value, height_value):
-    if up_or_down:
-        unit_convert_length = cmds.convertUnit(
-            str(len_value), fromUnit=target_unit, toUnit=cur_maya_unit)
-        unit_conv_width = cmds.convertUnit(
-            str(width_value), fromUnit=target_unit, toUnit=cur_maya_unit)
-        unit_conv_height = cmds.convertUnit(
-            str(height_value), fromUnit=target_unit, toUnit=cur_maya_unit)
+    '''Converts length, width and height between the scene and target units.
 
-    else:
-        unit_convert_length = cmds.convertUnit(
-            str(len_value), fromUnit=cur_maya_unit, toUnit=target_unit)
-        unit_conv_width = cmds.convertUnit(
-            str(width_value), fromUnit=cur_maya_unit, toUnit=target_unit)
-        unit_conv_height = cmds.convertUnit(
-            str(height_value), fromUnit=cur_maya_unit, toUnit=target_unit)
+    Arguments:
+        up_or_down {bool} -- True converts from target_unit to cur_maya_unit,
+            False converts from cur_maya_unit to target_unit.
+        cur_maya_unit {str} -- Scene's linear unit.
+        target_unit {str} -- Unit selected by the user.
+        len_value {float} -- Length to convert.
+        width_value {float} -- Width to convert.
+        height_value {float} -- Height to convert.
+
+    Returns:
+        tuple -- Converted length, width and height.
+    '''
 
-    temp_str_length = unit_convert_length.split(target_unit)
-    temp_str_width = unit_conv_width.split(target_unit)
-    temp_str_height = unit_conv_height.split(target_unit)
+    if up_or_down:
+        from_unit, to_unit = target_unit, cur_maya_unit
+    else:
+        from_unit, to_unit = cur_maya_unit, target_unit
 
-    len_value = float(temp_str_length[0])
-    width_value = float(temp_str_width[0])
-    height_value = float(temp_str_height[0])
+    len_value, width_value, height_value = units.convert_many(
+        (len_value, width_value, height_value), from_unit, to_unit)
 
     return len_value, width_value, height_value
 
@@ -138,11 +686,179 @@ def get_scene_units():
     return cmds.currentUnit(query=True, linear=True)
 
 def check_ref_grp_exists(grp_name):
+    ref_registry = registry.get_registry()
+    if ref_registry is not None:
+        return ref_registry.exists(grp_name)
+
     return cmds.objExists(str(grp_name) + '_refDistance_grp')
 
 def delete_ref_grp(grp_name):
     cmds.delete(str(grp_name) + '_refDistance_grp')
 
+    ref_registry = registry.get_registry()
+    if ref_registry is not None:
+        ref_registry.remove(grp_name)
+
+def find_ref_grps(names=None, pattern=None, regex=None):
+    '''Returns the prefixes of existing references matching any criteria.
+
+    Keyword Arguments:
+        names {list} -- Exact prefixes (default: {None})
+        pattern {str} -- Glob the prefix must match, ie. 'shot010_*'
+            (default: {None})
+        regex {str} -- Regular expression the whole prefix must match
+            (default: {None})
+
+    Returns:
+        list -- Sorted prefixes of the matching references.
+    '''
+
+    existing = registry.existing_prefixes()
+    wanted = set(names or ())
+    compiled_regex = re.compile('(?:' + regex + r')\Z') if regex else None
+
+    return sorted(
+        prefix for prefix in existing
+        if prefix in wanted or
+        (pattern and fnmatch.fnmatchcase(prefix, pattern)) or
+        (compiled_regex and compiled_regex.match(prefix)))
+
+def delete_ref_grps(names=None, pattern=None, regex=None, dry_run=False):
+    '''Deletes every reference matching a list, glob or regex at once.
+
+    The matching groups are removed with a single delete command.
+
+    Keyword Arguments:
+        names {list} -- Exact prefixes (default: {None})
+        pattern {str} -- Glob the prefix must match (default: {None})
+        regex {str} -- Regular expression the whole prefix must match
+            (default: {None})
+        dry_run {bool} -- Only return what would be deleted
+            (default: {False})
+
+    Returns:
+        list -- Sorted prefixes of the deleted references.
+    '''
+
+    prefixes = find_ref_grps(names, pattern, regex)
+    if dry_run or not prefixes:
+        return prefixes
+
+    cmds.delete(
+        [prefix + registry.REF_GRP_SUFFIX for prefix in prefixes])
+
+    ref_registry = registry.get_registry()
+    if ref_registry is not None:
+        for prefix in prefixes:
+            ref_registry.remove(prefix)
+
+    return prefixes
+
+def read_ref_grp(grp_name):
+    '''Returns what a reference represents, read from its metadata.
+
+    Arguments:
+        grp_name {str} -- Prefix of the reference.
+
+    Returns:
+        registry.ReferenceEntry -- Entry with the reference's unit and
+            (length, width, height) in scene units, None when the group
+            has no metadata.
+    '''
+
+    ref_grp = str(grp_name) + registry.REF_GRP_SUFFIX
+    ref_data = metadata.read(ref_grp)
+    if ref_data is None:
+        return None
+
+    # the scene unit may have changed since the metadata was written
+    dimensions = ref_data['dimensions']
+    scene_unit = get_scene_units()
+    written_unit = ref_data.get('scene_unit') or scene_unit
+    if written_unit != scene_unit:
+        dimensions = units.convert_many(dimensions, written_unit, scene_unit)
+    return registry.ReferenceEntry(
+        grp_name, ref_grp, ref_data.get('unit'), tuple(dimensions))
+
+def register_ref_grp(grp_name, ref_grp, unit, dimensions):
+    '''Records a newly built reference in the active registry, if any.
+
+    Arguments:
+        grp_name {str} -- Prefix of the reference.
+        ref_grp {str} -- Name of its _refDistance_grp.
+        unit {str} -- Unit the reference was specified in.
+        dimensions {tuple} -- (length, width, height) in scene units.
+    '''
+
+    ref_registry = registry.get_registry()
+    if ref_registry is not None:
+        ref_registry.add(grp_name, ref_grp, unit, dimensions)
+
+def apply_dimension_display(parts, display_layers=False):
+    '''Colors the parts collected by build_dimension_network in bulk.
+
+    Arguments:
+        parts {dict} -- Dimension -> (group, start locator, end locator,
+            distance) names.
+
+    Keyword Arguments:
+        display_layers {bool} -- Put the groups on the shared display
+            layers instead of setting per-node colors (default: {False})
+    '''
+
+    if display_layers:
+        assign_display_layers(dict(
+            (dimen, [items[0] for items in dimen_parts])
+            for dimen, dimen_parts in parts.items()))
+        return
+
+    colors = {}
+    for dimen, color_index in DIMENSION_COLORS:
+        colors.setdefault(color_index, []).extend(
+            node for items in parts.get(dimen, ()) for node in items[1:])
+    set_color_overrides(colors)
+
+def get_display_layer(dimen):
+    '''Returns the shared display layer of a dimension, creating it once.
+
+    New layers are drawn with the dimension's color of DIMENSION_COLORS.
+
+    Arguments:
+        dimen {str} -- One of 'length', 'width' or 'height'.
+    '''
+
+    layer = DISPLAY_LAYER_FORMAT.format(dimen)
+    if cmds.objExists(layer):
+        return layer
+
+    layer = cmds.createDisplayLayer(name=layer, empty=True, noRecurse=True)
+    cmds.setAttr(layer + '.color', dict(DIMENSION_COLORS)[dimen])
+    return layer
+
+def assign_display_layers(dimension_grps):
+    '''Puts dimension groups on their dimension's shared display layer.
+
+    Each layer is filled with one editDisplayLayerMembers command. Once
+    the references are on the layers, recoloring or hiding every length,
+    width or height is one attribute change on its layer.
+
+    Arguments:
+        dimension_grps {dict} -- Dimension -> names of its _<dimen>Dist_grp
+            groups.
+
+    Returns:
+        dict -- Dimension -> name of its display layer.
+    '''
+
+    layers = {}
+    for dimen, grps in dimension_grps.items():
+        if not grps:
+            continue
+        layers[dimen] = get_display_layer(dimen)
+        cmds.editDisplayLayerMembers(layers[dimen], grps, noRecurse=True)
+
+    return layers
+
 def set_color_overide(index, *args):
     '''Sets overrideColor attribute.
 
@@ -154,9 +870,8 @@ def set_color_overide(index, *args):
     '''
 
     for loc in args:
-        if 'dist' in loc:
-            cmds.setAttr(str(loc) + '.overrideEnabled', 1)
-            cmds.setAttr(str(loc) + '.overrideColor', index)
-        else:
-            cmds.setAttr(loc[0] + '.overrideEnabled', 1)
-            cmds.setAttr(loc[0] + '.overrideColor', index)
+        # cmds.spaceLocator style results are lists of names
+        if isinstance(loc, (list, tuple)):
+            loc = loc[0]
+        cmds.setAttr(str(loc) + '.overrideEnabled', 1)
+        cmds.setAttr(str(loc) + '.overrideColor', index)
@@ -15,13 +15,21 @@ pyqt_version    :4.11.4
 '''
 
 import core
+import registry
+import scheduler
+from units import UNIT_MEASUREMENTS
 
 # import Qt.py packages
 from Qt import QtWidgets
 from Qt import QtCore
 from Qt import QtGui
+from Qt import QtCompat
 
-UNIT_MEASUREMENTS = ['cm', 'mm', 'm', 'km', 'in', 'ft', 'yd', 'mi']
+WINDOW_OBJECT_NAME = 'ScaleReferenceWindow'
+
+# cached by get_maya_main_window() and show()
+_MAYA_MAIN_WINDOW = None
+_UI_WINDOW = None
 
 class ScaleReference(QtWidgets.QMainWindow):
     '''Class that creates QtWidget and executes functionality.
@@ -40,6 +48,14 @@ class ScaleReference(QtWidgets.QMainWindow):
         '''
 
         super(ScaleReference, self).__init__(parent)
+
+        # running scheduler.ChunkedBuild, one chunk is built per timer tick
+        # so Maya's UI stays responsive
+        self.batch = None
+        self.batch_timer = QtCore.QTimer(self)
+        self.batch_timer.setInterval(0)
+        self.batch_timer.timeout.connect(self.run_batch_chunk)
+
         self.init_ui()
 
     def init_ui(self):
@@ -48,6 +64,7 @@ class ScaleReference(QtWidgets.QMainWindow):
         '''
 
         self.setWindowTitle('Scale Reference')
+        self.setObjectName(WINDOW_OBJECT_NAME)
 
         # Label for Scene Units -----------------------------------------------
 
@@ -58,11 +75,11 @@ class ScaleReference(QtWidgets.QMainWindow):
 
         self.current_maya_unit = core.get_scene_units()
 
-        units_lbl = QtWidgets.QLabel(self.current_maya_unit)
-        units_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        self.units_lbl = QtWidgets.QLabel(self.current_maya_unit)
+        self.units_lbl.setAlignment(QtCore.Qt.AlignCenter)
 
         scene_units_lbl_layout.layout().addWidget(scene_units_lbl)
-        scene_units_lbl_layout.layout().addWidget(units_lbl)
+        scene_units_lbl_layout.layout().addWidget(self.units_lbl)
 
         # User selected Units combobox Layout ---------------------------------
 
@@ -103,9 +120,29 @@ class ScaleReference(QtWidgets.QMainWindow):
         button_layout = QtWidgets.QVBoxLayout()
         create_btn = QtWidgets.QPushButton('Create New Reference')
         delete_btn = QtWidgets.QPushButton('Delete Named Reference')
+        fit_btn = QtWidgets.QPushButton('Fit To Selected Geometry')
+        manifest_btn = QtWidgets.QPushButton('Build From Manifest...')
 
         button_layout.layout().addWidget(create_btn)
         button_layout.layout().addWidget(delete_btn)
+        button_layout.layout().addWidget(fit_btn)
+        button_layout.layout().addWidget(manifest_btn)
+
+        # Batch Progress Layout -----------------------------------------------
+
+        self.progress_widget = QtWidgets.QWidget()
+        self.progress_widget.setLayout(QtWidgets.QVBoxLayout())
+        self.progress_widget.layout().setContentsMargins(0, 0, 0, 0)
+
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_lbl = QtWidgets.QLabel('')
+        self.progress_lbl.setAlignment(QtCore.Qt.AlignCenter)
+        cancel_btn = QtWidgets.QPushButton('Cancel')
+
+        self.progress_widget.layout().addWidget(self.progress_bar)
+        self.progress_widget.layout().addWidget(self.progress_lbl)
+        self.progress_widget.layout().addWidget(cancel_btn)
+        self.progress_widget.hide()
 
         # Central Widget ------------------------------------------------------
 
@@ -117,6 +154,7 @@ class ScaleReference(QtWidgets.QMainWindow):
         central_widget.layout().addLayout(scale_prefix_layout)
         central_widget.layout().addLayout(dimensions_form_layout)
         central_widget.layout().addLayout(button_layout)
+        central_widget.layout().addWidget(self.progress_widget)
 
         # set central widget
         self.setCentralWidget(central_widget)
@@ -126,9 +164,15 @@ class ScaleReference(QtWidgets.QMainWindow):
         # =====================================================================
 
         create_btn.clicked.connect(
-            lambda: core.create_locators(units_combobox.currentText()))
+            lambda: self.create_locators(units_combobox.currentText()))
+
+        delete_btn.clicked.connect(lambda: self.delete_dimension_grp())
+
+        fit_btn.clicked.connect(lambda: self.fit_selected_geometry())
 
-        delete_btn.clicked.connect(lambda: core.delete_dimension_grp())
+        manifest_btn.clicked.connect(lambda: self.build_from_manifest())
+
+        cancel_btn.clicked.connect(lambda: self.cancel_batch())
 
         self.width_le.textChanged.connect(
             lambda: self.check_line_edit_state(self.width_le))
@@ -275,6 +319,23 @@ class ScaleReference(QtWidgets.QMainWindow):
         elif result == QtWidgets.QMessageBox.No:
             return False
 
+    def refresh_scene_units(self):
+        '''Updates the Scene's Units label when the window is reopened.
+
+        '''
+
+        self.current_maya_unit = core.get_scene_units()
+        self.units_lbl.setText(self.current_maya_unit)
+
+    def closeEvent(self, event):
+        '''Disables the reference registry and its scene callbacks.
+
+        show() enables it again when the window is reopened.
+        '''
+
+        registry.disable()
+        super(ScaleReference, self).closeEvent(event)
+
     def reset_line_edits(self):
         '''Resets Qt QLineEdits after Dimension Group creation and deletion.
 
@@ -318,7 +379,9 @@ class ScaleReference(QtWidgets.QMainWindow):
 
             up_or_down = self.popup_up_down_window(message)
 
-            len_value, width_value, height_value = core.convert_units()
+            len_value, width_value, height_value = core.convert_units(
+                up_or_down, self.current_maya_unit, target_unit,
+                len_value, width_value, height_value)
 
             # Test Case: if values after conversion are too small
             # to be used in current scene
@@ -335,10 +398,10 @@ class ScaleReference(QtWidgets.QMainWindow):
 
                 return
 
-            core.create_dimension_grp()
+        core.create_dimension_grp(
+            grp_name, len_value, width_value, height_value)
 
-            self.reset_line_edits()
-            return
+        self.reset_line_edits()
 
     def delete_dimension_grp(self):
         '''Deletes grp that contains predefined suffix.
@@ -351,6 +414,18 @@ class ScaleReference(QtWidgets.QMainWindow):
         if grp_name == '':
             self.popup_ok_window('A name was not entered')
             return
+        elif any(char in grp_name for char in '*?['):
+            # glob, ie. shot010_* deletes every matching reference at once
+            prefixes = core.delete_ref_grps(pattern=grp_name, dry_run=True)
+            if not prefixes:
+                self.popup_ok_window(
+                    'No reference matches ' + str(grp_name))
+            elif self.popup_yes_no_window(
+                    'Delete ' + str(len(prefixes)) + ' references matching ' +
+                    str(grp_name) + '?'):
+                core.delete_ref_grps(names=prefixes)
+                self.reset_line_edits()
+            return
         elif core.check_ref_grp_exists(grp_name):
             core.delete_ref_grp(grp_name)
 
@@ -361,9 +436,168 @@ class ScaleReference(QtWidgets.QMainWindow):
                 str(grp_name) + '_refDistance_grp' + 'does not exist')
             return
 
-MAIN_WINDOW = \
-    [o for o in QtWidgets.qApp.topLevelWidgets() if o.objectName() ==
-     'MayaWindow'][0]
+    def fit_selected_geometry(self):
+        '''Creates one reference per selected mesh from its bounding box.
+
+        '''
+
+        specs = core.get_fitted_specs()
+
+        if not specs:
+            self.popup_ok_window('Select one or more meshes to fit')
+            return
+
+        self.start_batch(scheduler.ChunkedBuild(specs))
+
+    def build_from_manifest(self):
+        '''Builds every reference of a CSV or JSON manifest picked by the user.
+
+        '''
+
+        path = QtCompat.QFileDialog.getOpenFileName(
+            self, 'Build From Manifest', '',
+            'Manifests (*.csv *.json *.jsonl *.ndjson)')[0]
+        if not path:
+            return
+
+        self.start_batch(scheduler.ChunkedBuild.from_manifest(path))
+
+    def start_batch(self, batch):
+        '''Starts building a batch a chunk at a time.
+
+        Arguments:
+            batch {scheduler.ChunkedBuild} -- Batch to build.
+        '''
+
+        if self.batch is not None:
+            self.popup_ok_window('Another batch is still being built')
+            return
+
+        self.batch = batch
+        self.update_batch_progress()
+        self.progress_widget.show()
+        self.batch_timer.start()
+
+    def run_batch_chunk(self):
+        '''Builds the next chunk of the running batch.
+
+        '''
+
+        if self.batch is None:
+            self.batch_timer.stop()
+            return
+
+        try:
+            more = self.batch.step()
+        except Exception as err:
+            # the timer would retry the failing chunk on every tick
+            self.batch.cancel()
+            self.finish_batch()
+            self.popup_ok_window('The batch stopped: ' + str(err))
+            return
+
+        self.update_batch_progress()
+        if not more:
+            self.finish_batch()
+
+    def update_batch_progress(self):
+        '''Shows the running batch's progress and throughput.
+
+        '''
+
+        progress = self.batch.progress
+        if progress is None:
+            # unknown total, ie. a streamed manifest
+            self.progress_bar.setRange(0, 0)
+        else:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(progress * 1000))
+
+        total = '' if self.batch.total is None \
+            else ' of ' + str(self.batch.total)
+        self.progress_lbl.setText(
+            '%d%s processed, %d built, %.0f refs/sec' % (
+                self.batch.processed, total, len(self.batch.created),
+                self.batch.refs_per_second))
+
+    def cancel_batch(self):
+        '''Stops the running batch between two chunks.
+
+        Chunks only hold whole references, so the user either keeps the
+        ones built so far or removes them all.
+        '''
+
+        if self.batch is None:
+            return
+
+        self.batch_timer.stop()
+        keep = not self.batch.created or self.popup_yes_no_window(
+            'Keep the ' + str(len(self.batch.created)) +
+            ' references built so far?')
+        self.batch.cancel(rollback=not keep)
+        self.finish_batch()
+
+    def finish_batch(self):
+        '''Hides the progress and reports the references that failed.
+
+        '''
+
+        self.batch_timer.stop()
+        batch, self.batch = self.batch, None
+        self.progress_widget.hide()
+
+        if batch.errors:
+            self.popup_ok_window(
+                str(len(batch.errors)) + ' references could not be ' +
+                'created:\n' + '\n'.join(
+                    str(source) + ': ' + str(message)
+                    for source, message in batch.errors[:20]))
+
+def get_maya_main_window():
+    '''Returns Maya's main window, wrapped once and then cached.
+
+    Returns:
+        QtWidgets.QWidget -- Maya's main window.
+    '''
+
+    global _MAYA_MAIN_WINDOW
+
+    if _MAYA_MAIN_WINDOW is None:
+        from maya import OpenMayaUI
+        from Qt import QtCompat
+
+        pointer = OpenMayaUI.MQtUtil.mainWindow()
+        _MAYA_MAIN_WINDOW = QtCompat.wrapInstance(
+            int(pointer), QtWidgets.QWidget)
+
+    return _MAYA_MAIN_WINDOW
+
+def show():
+    '''Shows the Scale Reference window, building it on first use.
+
+    Later calls reuse and raise the same window instead of creating
+    another one. The reference registry is enabled while the window is
+    open.
+
+    Returns:
+        ScaleReference -- The window.
+    '''
+
+    global _UI_WINDOW
+
+    # existence checks and listings are lookups while the window is open
+    registry.enable()
+
+    if _UI_WINDOW is None:
+        _UI_WINDOW = ScaleReference(get_maya_main_window())
+    else:
+        _UI_WINDOW.refresh_scene_units()
+
+    _UI_WINDOW.show()
+    _UI_WINDOW.raise_()
+    _UI_WINDOW.activateWindow()
+
+    return _UI_WINDOW
 
-UI_WINDOW = ScaleReference(MAIN_WINDOW)
-UI_WINDOW.show()
+if __name__ == '__main__':
+    show()
@@ -0,0 +1,319 @@
+'''Streaming import of reference specs from CSV and JSON files.
+
+Rows are read one at a time and built in chunks, so a manifest with tens of
+thousands of references is never held in memory as a whole. Every chunk is
+built and committed with its own core.create_dimension_grps call.
+
+Supported files:
+    .csv -- prefix, length, width, height[, unit[, x, y, z]] columns, with
+        or without a header row naming them.
+    .jsonl / .ndjson -- one object or array per line.
+    .json -- a top-level array of objects or arrays.
+
+Objects use the keys prefix, length, width, height and optionally unit and
+position ([x, y, z]). Arrays hold the same values in that order.
+
+unit only applies to the dimensions. Positions, like the position of a
+core.create_dimension_grps spec, are always in scene units.
+'''
+
+import csv
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+import core
+import naming
+import registry
+
+# spec is None and error holds the message when the row is invalid
+ManifestRow = namedtuple('ManifestRow', ['line', 'spec', 'error'])
+
+CSV_COLUMNS = ('prefix', 'length', 'width', 'height', 'unit', 'x', 'y', 'z')
+
+DEFAULT_CHUNK_SIZE = 500
+
+# characters read at a time from .json files
+JSON_READ_SIZE = 65536
+
+# strings, which may hide brackets and commas, and the characters that nest
+# or separate the items of a .json array. Strings end at a line break, so an
+# unterminated one cannot swallow the following items.
+_JSON_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\\n])*"?|[\[\]{},]')
+
+# position suffix of json's error messages, relative to the decoded text
+_JSON_POSITION_RE = re.compile(r': line \d+ column \d+.*$')
+
+
+def parse_spec(values):
+    '''Returns a create_dimension_grps spec from a row.
+
+    Arguments:
+        values {dict or list} -- Row keyed by CSV_COLUMNS names, or its
+            values in CSV_COLUMNS order.
+
+    Raises:
+        ValueError -- If the row is invalid.
+
+    Returns:
+        tuple -- (prefix, length, width, height, unit[, position])
+    '''
+
+    if isinstance(values, (list, tuple)):
+        position = values[5] if len(values) > 5 else None
+        if isinstance(position, (list, tuple)):
+            # [prefix, length, width, height, unit, [x, y, z]]
+            values = dict(zip(CSV_COLUMNS[:5], values[:5]))
+            values['position'] = position
+        else:
+            values = dict(zip(CSV_COLUMNS, values))
+    elif not isinstance(values, dict):
+        raise ValueError('expected an object or array: ' + repr(values))
+
+    prefix = str(values.get('prefix') or '').strip()
+    if not prefix:
+        raise ValueError('missing prefix')
+
+    dimensions = []
+    for column in ('length', 'width', 'height'):
+        try:
+            dimensions.append(float(values[column]))
+        except KeyError:
+            raise ValueError('missing ' + column)
+        except (TypeError, ValueError):
+            raise ValueError(
+                'invalid ' + column + ': ' + repr(values[column]))
+
+    unit = values.get('unit') or None
+    spec = (prefix,) + tuple(dimensions) + (unit,)
+
+    position = values.get('position')
+    if position is None and values.get('x') not in (None, ''):
+        position = (values.get('x'), values.get('y'), values.get('z'))
+    if position is not None:
+        try:
+            spec += (tuple(float(value) for value in position),)
+        except (TypeError, ValueError):
+            raise ValueError('invalid position: ' + repr(position))
+
+    return spec
+
+
+def _parsed_row(line, values):
+    try:
+        return ManifestRow(line, parse_spec(values), None)
+    except ValueError as err:
+        return ManifestRow(line, None, str(err))
+
+
+def iter_csv_rows(path):
+    '''Yields a ManifestRow for every data row of a CSV file.
+
+    '''
+
+    if sys.version_info[0] < 3:
+        csv_file = open(path, 'rb')
+    else:
+        csv_file = open(path, newline='')
+
+    with csv_file:
+        reader = csv.reader(csv_file)
+        columns = None
+        for values in reader:
+            if not any(field.strip() for field in values):
+                continue
+
+            if columns is None:
+                columns = CSV_COLUMNS
+                header = [field.strip().lower() for field in values]
+                if 'prefix' in header:
+                    columns = header
+                    continue
+
+            yield _parsed_row(reader.line_num, dict(zip(columns, values)))
+
+
+def iter_json_lines_rows(path):
+    '''Yields a ManifestRow for every line of a JSON Lines file.
+
+    '''
+
+    with open(path) as json_file:
+        for line_number, line in enumerate(json_file, 1):
+            if not line.strip():
+                continue
+            try:
+                values = json.loads(line)
+            except ValueError as err:
+                yield ManifestRow(line_number, None, _json_error(err))
+            else:
+                yield _parsed_row(line_number, values)
+
+
+def _json_error(err):
+    # the row already carries the line number
+    return getattr(err, 'msg', None) or _JSON_POSITION_RE.sub('', str(err))
+
+
+def _json_item_end(buffer):
+    # index of the comma or bracket ending the array item buffer starts
+    # with, None when the item continues past the buffer
+    depth = 0
+    for match in _JSON_TOKEN_RE.finditer(buffer):
+        token = match.group()
+        if token in '[{':
+            depth += 1
+        elif token in ']}':
+            if not depth:
+                return match.start()
+            depth -= 1
+        elif token == ',' and not depth:
+            return match.start()
+    return None
+
+
+def iter_json_rows(path):
+    '''Yields a ManifestRow for every item of a top-level JSON array.
+
+    The array is decoded one item at a time from fixed size reads. A
+    malformed item is reported and skipped, reading resumes with the next
+    item of the array.
+    '''
+
+    decoder = json.JSONDecoder()
+
+    with open(path) as json_file:
+        buffer = ''
+        line_number = 1
+        started = False
+        eof = False
+
+        while True:
+            # skip whitespace and separators, counting lines as we go
+            index = 0
+            while index < len(buffer) and buffer[index] in ' \t\r\n,[]':
+                if buffer[index] == '[':
+                    # only the outer bracket, items may be arrays too
+                    if started:
+                        break
+                    started = True
+                elif buffer[index] == '\n':
+                    line_number += 1
+                index += 1
+            buffer = buffer[index:]
+
+            if not buffer:
+                if eof:
+                    return
+                chunk = json_file.read(JSON_READ_SIZE)
+                eof = not chunk
+                buffer += chunk
+                continue
+
+            if not started:
+                yield ManifestRow(
+                    line_number, None, 'expected a JSON array of references')
+                return
+
+            try:
+                values, end = decoder.raw_decode(buffer)
+            except ValueError as err:
+                end = _json_item_end(buffer)
+                if end is None and not eof:
+                    # the item continues in the next read
+                    chunk = json_file.read(JSON_READ_SIZE)
+                    eof = not chunk
+                    buffer += chunk
+                    continue
+
+                # malformed, skip to the next item
+                message = _json_error(err)
+                if end is None:
+                    # the item never ends, nothing after it can be read
+                    yield ManifestRow(
+                        line_number, None,
+                        message + ', the rest of the file was skipped')
+                    return
+                yield ManifestRow(line_number, None, message)
+                line_number += buffer.count('\n', 0, end)
+                buffer = buffer[end:]
+                continue
+
+            yield _parsed_row(line_number, values)
+            line_number += buffer.count('\n', 0, end)
+            buffer = buffer[end:]
+
+
+def iter_rows(path):
+    '''Yields a ManifestRow for every row of a CSV or JSON manifest.
+
+    '''
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return iter_csv_rows(path)
+    elif extension in ('.jsonl', '.ndjson'):
+        return iter_json_lines_rows(path)
+    elif extension == '.json':
+        return iter_json_rows(path)
+
+    raise ValueError('Unsupported manifest type: ' + str(path))
+
+
+def build_from_manifest(path, chunk_size=DEFAULT_CHUNK_SIZE, backend='cmds',
+                        on_chunk=None):
+    '''Builds every reference of a manifest, one chunk at a time.
+
+    Arguments:
+        path {str} -- CSV, JSON or JSON Lines manifest.
+
+    Keyword Arguments:
+        chunk_size {int} -- References built per create_dimension_grps
+            call (default: {DEFAULT_CHUNK_SIZE})
+        backend {str} -- See core.create_dimension_grps
+            (default: {'cmds'})
+        on_chunk {callable} -- Called with the running report after every
+            chunk (default: {None})
+
+    Returns:
+        dict -- created count, and errors as (line, message) tuples for
+            invalid rows and references that failed to build.
+    '''
+
+    report = {'created': 0, 'errors': []}
+    lines = []
+    specs = []
+    # scene index shared by every chunk, so no chunk rescans the scene
+    allocator = naming.NameAllocator()
+    existing_prefixes = set(registry.existing_prefixes())
+
+    def flush():
+        results = core.create_dimension_grps(
+            specs, backend=backend, allocator=allocator,
+            existing_prefixes=existing_prefixes)
+        for line, result in zip(lines, results):
+            if result.error:
+                report['errors'].append((line, result.error))
+            else:
+                report['created'] += 1
+        del lines[:]
+        del specs[:]
+        if on_chunk is not None:
+            on_chunk(report)
+
+    for row in iter_rows(path):
+        if row.error:
+            report['errors'].append((row.line, row.error))
+            continue
+
+        lines.append(row.line)
+        specs.append(row.spec)
+        if len(specs) >= chunk_size:
+            flush()
+
+    if specs:
+        flush()
+
+    return report
@@ -0,0 +1,99 @@
+'''Metadata stored on every _refDistance_grp.
+
+Each group carries one string attribute holding compact JSON:
+
+    {"dimensions":[50.0,50.0,50.0],"scene_unit":"cm","unit":"m","version":1}
+
+dimensions are (length, width, height) in scene_unit, unit is the unit the
+reference was specified in and version the METADATA_VERSION it was written
+with. Reading a reference back is one getAttr instead of a walk over its
+locators, and read_all() rebuilds every reference from one scene query.
+'''
+
+import json
+
+from scene import cmds
+
+METADATA_ATTR = 'scaleReference'
+
+# layout version written to new groups
+METADATA_VERSION = 1
+
+
+def encode(dimensions, unit, scene_unit):
+    '''Returns the metadata string of a reference.
+
+    Arguments:
+        dimensions {tuple} -- (length, width, height) in scene units.
+        unit {str} -- Unit the reference was specified in, or None.
+        scene_unit {str} -- Scene's linear unit.
+    '''
+
+    return json.dumps({
+        'dimensions': [float(value) for value in dimensions],
+        'unit': unit,
+        'scene_unit': scene_unit,
+        'version': METADATA_VERSION,
+    }, sort_keys=True, separators=(',', ':'))
+
+
+def decode(value):
+    '''Returns the metadata dict of a string, or None if it is not valid.
+
+    '''
+
+    if not value:
+        return None
+    try:
+        data = json.loads(value)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or len(data.get('dimensions') or ()) != 3:
+        return None
+    return data
+
+
+def write(ref_grp, dimensions, unit, scene_unit, add=True):
+    '''Stores the metadata of a reference on its group.
+
+    Arguments:
+        ref_grp {str} -- Name of the _refDistance_grp.
+        dimensions {tuple} -- (length, width, height) in scene units.
+        unit {str} -- Unit the reference was specified in, or None.
+        scene_unit {str} -- Scene's linear unit.
+
+    Keyword Arguments:
+        add {bool} -- Add the attribute first, False when the group already
+            has it, ie. it was duplicated from a group that does
+            (default: {True})
+    '''
+
+    if add:
+        cmds.addAttr(ref_grp, longName=METADATA_ATTR, dataType='string')
+    cmds.setAttr(
+        ref_grp + '.' + METADATA_ATTR,
+        encode(dimensions, unit, scene_unit), type='string')
+
+
+def read(ref_grp):
+    '''Returns the metadata of one group, or None if it has none.
+
+    '''
+
+    plug = str(ref_grp) + '.' + METADATA_ATTR
+    if not cmds.objExists(plug):
+        return None
+    return decode(cmds.getAttr(plug))
+
+
+def read_all(pattern='*_refDistance_grp'):
+    '''Returns the metadata of every group matching pattern.
+
+    All values are read with one stringAttrValues query.
+
+    Returns:
+        list -- (group name, metadata dict or None) tuples.
+    '''
+
+    return [(node, decode(value)) for node, value in
+            cmds.stringAttrValues(pattern, METADATA_ATTR)]
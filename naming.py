@@ -0,0 +1,128 @@
+'''Collision-free names for the nodes of a reference.
+
+NameAllocator indexes the names already in the scene with one ls query and
+then hands out unique names from memory. A batch never probes objExists
+per node and never depends on Maya's auto-rename picking the right node.
+'''
+
+from scene import cmds
+
+DEFAULT_PADDING = 2
+
+
+class NameAllocator(object):
+    '''Hands out node names that are not used in the scene or the batch.
+
+    Keyword Arguments:
+        existing {iterable} -- Names already taken, None indexes the
+            scene's short names with one ls query (default: {None})
+    '''
+
+    def __init__(self, existing=None):
+        if existing is None:
+            existing = (name.split('|')[-1] for name in cmds.ls() or [])
+        self._taken = set(existing)
+        # base name -> next counter to try
+        self._counters = {}
+
+    def __contains__(self, name):
+        return name in self._taken
+
+    def is_free(self, name):
+        return name not in self._taken
+
+    def reserve(self, name):
+        '''Marks an exact name as taken.
+
+        '''
+
+        self._taken.add(name)
+
+    def release(self, name):
+        '''Makes a name available again, ie. after its node was deleted.
+
+        '''
+
+        self._taken.discard(name)
+
+    def allocate(self, base, padding=DEFAULT_PADDING):
+        '''Returns base with the lowest free counter suffix, ie. base_01.
+
+        Arguments:
+            base {str} -- Name without its counter.
+
+        Keyword Arguments:
+            padding {int} -- Digits of the counter (default: {2})
+
+        Returns:
+            str -- The reserved name.
+        '''
+
+        counter = self._counters.get(base, 1)
+        name = '%s_%0*d' % (base, padding, counter)
+        while name in self._taken:
+            counter += 1
+            name = '%s_%0*d' % (base, padding, counter)
+
+        self._counters[base] = counter + 1
+        self._taken.add(name)
+        return name
+
+    def allocate_exact(self, name):
+        '''Returns name itself if it is free, otherwise name plus a counter.
+
+        '''
+
+        if name not in self._taken:
+            self._taken.add(name)
+            return name
+
+        counter = self._counters.get(name, 1)
+        while name + str(counter) in self._taken:
+            counter += 1
+
+        self._counters[name] = counter + 1
+        self._taken.add(name + str(counter))
+        return name + str(counter)
+
+
+def reference_node_names(grp_name, dimens, allocator=None):
+    '''Returns the names of every node of a reference.
+
+    Arguments:
+        grp_name {str} -- Prefix of the reference.
+        dimens {iterable} -- Dimension names, ie. 'length'.
+
+    Keyword Arguments:
+        allocator {NameAllocator} -- Allocator that makes every name
+            unique, None returns the default names (default: {None})
+
+    Returns:
+        dict -- 'ref_grp' and, per dimension, (dimen, part) keys with part
+            one of 'grp', 'start', 'start_shape', 'end', 'end_shape',
+            'dist' and 'dist_shape'.
+    '''
+
+    grp_name = str(grp_name)
+
+    def counted(base):
+        if allocator is None:
+            return base + '_01'
+        return allocator.allocate(base)
+
+    def exact(name):
+        if allocator is None:
+            return name
+        return allocator.allocate_exact(name)
+
+    names = {'ref_grp': exact(grp_name + '_refDistance_grp')}
+    for dimen in dimens:
+        names[dimen, 'grp'] = exact(grp_name + '_' + dimen + 'Dist_grp')
+        for part, base in (
+                ('start', grp_name + '_start' + dimen + '_loc'),
+                ('end', grp_name + '_end' + dimen + '_loc'),
+                ('dist', grp_name + '_dist' + dimen)):
+            names[dimen, part] = counted(base)
+            names[dimen, part + '_shape'] = exact(names[dimen, part] + 'Shape')
+
+    return names
@@ -0,0 +1,266 @@
+'''The node network of a reference, as ops that build it.
+
+plan_reference() is the one description of a reference's node network.
+core builds references by running its ops with maya.cmds, or sets the
+values of template copies from them, plan.py plans whole batches of them
+off the main thread and om_backend queues them on OpenMaya modifiers.
+
+Ops are tuples whose first item is their kind:
+
+    (CREATE_NODE, node_type, name, parent or None)
+    (SET_ATTR, node, attr, values, attr_type or None)
+    (ADD_ATTR, node, attr, data_type)
+    (CONNECT_ATTR, source node, source attr, destination node,
+        destination attr)
+    (SET_COLOR_OVERRIDES, ((color index, nodes), ...))
+
+Node names are the planned names. When the scene changed since the ops
+were planned and Maya picks another name, later ops follow the actual
+name.
+'''
+
+from collections import namedtuple
+
+from scene import cmds
+
+import metadata
+import naming
+import profiling
+
+# dimension and the overrideColor index its nodes are drawn with
+DIMENSION_COLORS = (('length', 13), ('width', 6), ('height', 14))
+
+CREATE_NODE = 'createNode'
+SET_ATTR = 'setAttr'
+ADD_ATTR = 'addAttr'
+CONNECT_ATTR = 'connectAttr'
+SET_COLOR_OVERRIDES = 'setColorOverrides'
+
+# dimensions are (length, width, height) and position the world (x, y, z)
+# or None, both in scene units. ops create the whole reference and the first
+# op creates its group. parts are (dimension, color index, (group, start
+# locator, end locator, distance)) tuples, the batch's SET_COLOR_OVERRIDES
+# op draws all but the group with the color. steps are (step, end) tuples
+# splitting ops into the build steps profiling times, each step runs the
+# ops up to index end.
+ReferencePlan = namedtuple(
+    'ReferencePlan',
+    ['index', 'prefix', 'group', 'unit', 'dimensions', 'position', 'ops',
+     'parts', 'steps'])
+
+
+def get_dimension_points(dimen, len_value, width_value, height_value):
+    '''Returns the start and end points of a dimension's measurement.
+
+    Length is measured along X, width along Z and height along Y, centered
+    on the origin.
+
+    Arguments:
+        dimen {str} -- One of 'length', 'width' or 'height'.
+
+    Returns:
+        tuple -- Start and end (x, y, z) points.
+    '''
+
+    if dimen == 'length':
+        return ((len_value)/2.0, 0, 0), (-(len_value)/2.0, 0, 0)
+    elif dimen == 'width':
+        return (0, 0, (width_value)/2.0), (0, 0, -((width_value)/2.0))
+    elif dimen == 'height':
+        return (0, (height_value)/2.0, 0), (0, -((height_value)/2.0), 0)
+
+    raise ValueError('Unknown dimension: ' + str(dimen))
+
+
+def plan_reference(index, grp_name, dimensions, unit=None, position=None,
+                   scene_unit=None, names=None):
+    '''Plans the ops that build one reference, see the module docstring.
+
+    Arguments:
+        index {int} -- Index of the reference's spec, or None.
+        grp_name {str} -- Prefix of the reference.
+        dimensions {tuple} -- (length, width, height) in scene units.
+
+    Keyword Arguments:
+        unit {str} -- Unit the reference was specified in
+            (default: {None})
+        position {tuple} -- World (x, y, z) to center the reference on, in
+            scene units (default: {None})
+        scene_unit {str} -- Scene's linear unit. None plans the node network
+            only, without the metadata ops (default: {None})
+        names {dict} -- Node names from naming.reference_node_names, None
+            uses the default names (default: {None})
+
+    Returns:
+        ReferencePlan -- The reference's ops and parts.
+    '''
+
+    dimensions = tuple(float(value) for value in dimensions)
+    if position is not None:
+        position = tuple(float(value) for value in position)
+    if names is None:
+        names = naming.reference_node_names(
+            grp_name, [dimen for dimen, _ in DIMENSION_COLORS])
+    ref_grp = names['ref_grp']
+
+    ops = [(CREATE_NODE, 'transform', ref_grp, None)]
+    parts = []
+    if position is not None:
+        ops.append((SET_ATTR, ref_grp, 'translate', position, None))
+    steps = [('group', len(ops))]
+
+    for dimen, color_index in DIMENSION_COLORS:
+        points = get_dimension_points(dimen, *dimensions)
+        dimen_grp = names[dimen, 'grp']
+        ops.append((CREATE_NODE, 'transform', dimen_grp, ref_grp))
+        steps.append(('group', len(ops)))
+
+        for part, point in zip(('start', 'end'), points):
+            loc, loc_shape = names[dimen, part], names[dimen, part + '_shape']
+            ops.append((CREATE_NODE, 'transform', loc, dimen_grp))
+            ops.append((CREATE_NODE, 'locator', loc_shape, loc))
+            ops.append((SET_ATTR, loc_shape, 'localPosition',
+                        tuple(float(value) for value in point), None))
+        steps.append(('locators', len(ops)))
+
+        dist, dist_shape = names[dimen, 'dist'], names[dimen, 'dist_shape']
+        ops.append((CREATE_NODE, 'transform', dist, dimen_grp))
+        ops.append((CREATE_NODE, 'distanceDimShape', dist_shape, dist))
+        steps.append(('distance', len(ops)))
+        ops.append((CONNECT_ATTR, names[dimen, 'start_shape'],
+                    'worldPosition[0]', dist_shape, 'startPoint'))
+        ops.append((CONNECT_ATTR, names[dimen, 'end_shape'],
+                    'worldPosition[0]', dist_shape, 'endPoint'))
+        steps.append(('connect', len(ops)))
+
+        parts.append((dimen, color_index, (
+            dimen_grp, names[dimen, 'start'], names[dimen, 'end'], dist)))
+
+    if scene_unit is not None:
+        ops.append((ADD_ATTR, ref_grp, metadata.METADATA_ATTR, 'string'))
+        ops.append((SET_ATTR, ref_grp, metadata.METADATA_ATTR, (
+            metadata.encode(dimensions, unit, scene_unit),), 'string'))
+        steps.append(('metadata', len(ops)))
+
+    return ReferencePlan(index, grp_name, ref_grp, unit, dimensions,
+                         position, tuple(ops), tuple(parts), tuple(steps))
+
+
+def apply_reference(reference, actual, colors=False):
+    '''Runs the ops of one reference, deleting it again if one fails.
+
+    Arguments:
+        reference {ReferencePlan} -- Reference to build.
+        actual {dict} -- See apply_op.
+
+    Keyword Arguments:
+        colors {bool} -- Also set the color overrides of its parts, which
+            plan.execute_plan sets for the whole batch at once
+            (default: {False})
+
+    Returns:
+        str -- Name of the created group.
+    '''
+
+    try:
+        # phases are only opened while profiling, so a disabled profiler
+        # costs one lookup per reference
+        if profiling.get_profiler() is None:
+            for op in reference.ops:
+                apply_op(op, actual)
+        else:
+            start = 0
+            for step, end in reference.steps:
+                with profiling.phase(step):
+                    for op in reference.ops[start:end]:
+                        apply_op(op, actual)
+                start = end
+        if colors:
+            with profiling.phase('color'):
+                apply_op(color_op((reference,)), actual)
+    except (RuntimeError, ValueError):
+        if cmds.objExists(actual.get(reference.group, '')):
+            cmds.delete(actual[reference.group])
+        raise
+
+    return actual[reference.group]
+
+
+def apply_op(op, actual, skipped=()):
+    '''Runs one op through the scene proxy.
+
+    Arguments:
+        op {tuple} -- Op, see the module docstring.
+        actual {dict} -- Planned name -> actual name of the nodes created
+            so far, updated by CREATE_NODE ops.
+
+    Keyword Arguments:
+        skipped {set} -- Planned nodes SET_COLOR_OVERRIDES leaves out, ie.
+            those of references that failed (default: {()})
+    '''
+
+    kind = op[0]
+    if kind == CREATE_NODE:
+        _, node_type, name, parent = op
+        if parent is None:
+            actual[name] = cmds.createNode(node_type, n=name)
+        else:
+            actual[name] = cmds.createNode(
+                node_type, n=name, p=actual.get(parent, parent))
+    elif kind == SET_ATTR:
+        _, node, attr, values, attr_type = op
+        plug = actual.get(node, node) + '.' + attr
+        if attr_type:
+            cmds.setAttr(plug, *values, type=attr_type)
+        else:
+            cmds.setAttr(plug, *values)
+    elif kind == ADD_ATTR:
+        _, node, attr, data_type = op
+        cmds.addAttr(
+            actual.get(node, node), longName=attr, dataType=data_type)
+    elif kind == CONNECT_ATTR:
+        _, source, source_attr, destination, destination_attr = op
+        cmds.connectAttr(
+            actual.get(source, source) + '.' + source_attr,
+            actual.get(destination, destination) + '.' + destination_attr)
+    elif kind == SET_COLOR_OVERRIDES:
+        set_color_overrides(dict(
+            (color_index, [actual.get(node, node) for node in nodes
+                           if node not in skipped])
+            for color_index, nodes in op[1]))
+    else:
+        raise ValueError('Unknown op: ' + str(kind))
+
+
+def color_op(references):
+    '''Plans the SET_COLOR_OVERRIDES op that colors references' parts.
+
+    Arguments:
+        references {iterable} -- ReferencePlans to color.
+
+    Returns:
+        tuple -- One op setting every color at once.
+    '''
+
+    colors = {}
+    for reference in references:
+        for _, color_index, nodes in reference.parts:
+            colors.setdefault(color_index, []).extend(nodes[1:])
+    return (SET_COLOR_OVERRIDES, tuple(
+        (color_index, tuple(nodes))
+        for color_index, nodes in sorted(colors.items())))
+
+
+def set_color_overrides(colors):
+    '''Sets the override colors of many nodes with one scene command.
+
+    Arguments:
+        colors {dict} -- overrideColor index -> names of the nodes to draw
+            with it.
+    '''
+
+    colors = dict(
+        (color_index, list(nodes)) for color_index, nodes in colors.items()
+        if nodes)
+    if colors:
+        cmds.setColorOverrides(colors)
@@ -0,0 +1,372 @@
+'''OpenMaya 2.0 backend for building Dimension Groups.
+
+The ops network.plan_reference plans for every reference of a batch, its
+nodes, attribute values and connections, are queued on one MDagModifier
+and applied with a single doIt(). String values follow on a second
+modifier in the same undoable step.
+
+Modifiers are applied through the scaleReferenceModifier command so they
+land on Maya's undo queue. This module is its own plugin: ensure_plugin()
+loads it the first time a modifier is run.
+'''
+
+import os
+
+from maya import cmds
+from maya.api import OpenMaya as om
+
+import naming
+import network
+
+PLUGIN_COMMAND = 'scaleReferenceModifier'
+
+# modifiers handed from run_modifier() to the command's doIt()
+_PENDING_MODIFIERS = None
+
+
+def maya_useNewAPI():
+    '''Tells Maya this plugin uses the Python API 2.0.
+
+    '''
+
+    pass
+
+
+class ModifierCommand(om.MPxCommand):
+    '''Undoable command that applies the pending modifiers in order.
+
+    '''
+
+    def __init__(self):
+        super(ModifierCommand, self).__init__()
+        self.modifiers = []
+
+    @classmethod
+    def creator(cls):
+        return cls()
+
+    def doIt(self, args):
+        global _PENDING_MODIFIERS
+
+        pending, _PENDING_MODIFIERS = _PENDING_MODIFIERS, None
+        if not pending:
+            raise RuntimeError('No pending modifier to apply')
+
+        # a failed command is not put on the undo queue, so roll back the
+        # modifiers and operations that were applied before the error here
+        try:
+            for modifier in pending:
+                if callable(modifier):
+                    modifier = modifier()
+                    if modifier is None:
+                        continue
+                self.modifiers.append(modifier)
+                modifier.doIt()
+        except RuntimeError:
+            self.undoIt()
+            raise
+
+    def redoIt(self):
+        for modifier in self.modifiers:
+            modifier.doIt()
+
+    def undoIt(self):
+        for modifier in reversed(self.modifiers):
+            modifier.undoIt()
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin).registerCommand(
+        PLUGIN_COMMAND, ModifierCommand.creator)
+
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(PLUGIN_COMMAND)
+
+
+def ensure_plugin():
+    '''Loads this module as a plugin if its command is not registered yet.
+
+    '''
+
+    if hasattr(cmds, PLUGIN_COMMAND):
+        return
+
+    plugin_path = os.path.splitext(os.path.abspath(__file__))[0] + '.py'
+    cmds.loadPlugin(plugin_path, quiet=True)
+
+
+def run_modifier(*modifiers):
+    '''Applies modifiers in order as a single undoable step.
+
+    If one fails, the ones applied before it are undone again.
+
+    Arguments:
+        *modifiers {om.MDGModifier} -- Modifiers with queued operations.
+            A callable is called once the modifiers before it are applied
+            and returns the next modifier, or None, for operations that
+            need their nodes or attributes to exist.
+    '''
+
+    global _PENDING_MODIFIERS
+
+    ensure_plugin()
+
+    _PENDING_MODIFIERS = modifiers
+    try:
+        getattr(cmds, PLUGIN_COMMAND)()
+    finally:
+        _PENDING_MODIFIERS = None
+
+
+class ReferenceBuilder(object):
+    '''Queues the ops of many planned references on one MDagModifier.
+
+    References are planned by network.plan_reference, like the ones core
+    builds: same node names, hierarchy, locator positions, connections and
+    color overrides.
+
+    Keyword Arguments:
+        allocator {naming.NameAllocator} -- Allocator of unique node names,
+            None uses the default _01 names (default: {None})
+    '''
+
+    def __init__(self, allocator=None):
+        self.modifier = om.MDagModifier()
+        self.allocator = allocator
+        # planned name -> MObject of every queued node
+        self._created = {}
+        # (node, attr, value) of string values, set once their attribute
+        # exists
+        self._strings = []
+        self._ref_grps = []
+        self._dimension_grps = {}
+
+    def add_reference(self, grp_name, len_value, width_value, height_value,
+                      position=None, colors=True):
+        '''Queues one Dimension Group.
+
+        Arguments:
+            grp_name {str} -- Prefix used to name every node of the
+                reference.
+            len_value {float} -- Length of the reference in scene units.
+            width_value {float} -- Width of the reference in scene units.
+            height_value {float} -- Height of the reference in scene units.
+
+        Keyword Arguments:
+            position {tuple} -- World (x, y, z) to center the reference on
+                (default: {None})
+            colors {bool} -- Set the color overrides of the parts
+                (default: {True})
+        '''
+
+        reference = network.plan_reference(
+            None, grp_name, (len_value, width_value, height_value),
+            position=position, names=naming.reference_node_names(
+                grp_name, [dimen for dimen, _ in network.DIMENSION_COLORS],
+                self.allocator))
+        self.add_ops(reference.ops)
+
+        self._ref_grps.append(self._created[reference.group])
+        for dimen, color_index, nodes in reference.parts:
+            self._dimension_grps.setdefault(dimen, []).append(
+                self._created[nodes[0]])
+            if not colors:
+                continue
+
+            for node in nodes[1:]:
+                self.modifier.newPlugValueBool(
+                    _plug(self._created[node], 'overrideEnabled'), True)
+                self.modifier.newPlugValueInt(
+                    _plug(self._created[node], 'overrideColor'),
+                    color_index)
+
+    def add_ops(self, ops):
+        '''Queues planned ops, see network.py.
+
+        Arguments:
+            ops {iterable} -- CREATE_NODE, SET_ATTR, ADD_ATTR and
+                CONNECT_ATTR ops.
+
+        Raises:
+            RuntimeError -- If an op is not supported.
+        '''
+
+        for op in ops:
+            kind = op[0]
+            if kind == network.CREATE_NODE:
+                _, node_type, name, parent = op
+                parent = om.MObject.kNullObj if parent is None \
+                    else self._node(parent)
+                node = self.modifier.createNode(node_type, parent)
+                self.modifier.renameNode(node, name)
+                self._created[name] = node
+            elif kind == network.SET_ATTR:
+                _, name, attr, values, attr_type = op
+                if attr_type == 'string':
+                    self._strings.append((name, attr, values[0]))
+                elif attr_type:
+                    raise RuntimeError(
+                        'Unsupported attribute type: ' + attr_type)
+                else:
+                    plug = _plug(self._node(name), attr)
+                    if plug.isCompound:
+                        for child, value in enumerate(values):
+                            _set_plug_value(
+                                self.modifier, plug.child(child), value)
+                    else:
+                        _set_plug_value(self.modifier, plug, values[0])
+            elif kind == network.ADD_ATTR:
+                _, name, attr, data_type = op
+                if data_type != 'string':
+                    raise RuntimeError('Unsupported data type: ' + data_type)
+                self.modifier.addAttribute(
+                    self._node(name), om.MFnTypedAttribute().create(
+                        attr, attr, om.MFnData.kString))
+            elif kind == network.CONNECT_ATTR:
+                _, source, source_attr, destination, destination_attr = op
+                self.modifier.connect(
+                    _element_plug(self._node(source), source_attr),
+                    _element_plug(self._node(destination), destination_attr))
+            else:
+                raise RuntimeError('Unsupported op: ' + str(kind))
+
+    def execute(self):
+        '''Applies every queued reference in one undoable step.
+
+        String values can only be set once their attribute exists, so they
+        follow on a second MDGModifier, applied in the same undoable step.
+        If it fails, the first modifier is undone too.
+
+        Returns:
+            list -- Names of the created _refDistance_grps, in the order
+                they were added.
+        '''
+
+        run_modifier(self.modifier, self._string_modifier)
+
+        return [om.MFnDependencyNode(ref_grp).name()
+                for ref_grp in self._ref_grps]
+
+    def created_names(self):
+        '''Returns the planned name -> actual name of the executed nodes.
+
+        '''
+
+        return dict((name, om.MFnDependencyNode(node).name())
+                    for name, node in self._created.items())
+
+    def dimension_grps(self):
+        '''Returns the names of the executed _<dimen>Dist_grp groups.
+
+        Returns:
+            dict -- Dimension -> group names, in the order they were added.
+        '''
+
+        return dict(
+            (dimen, [om.MFnDependencyNode(grp).name() for grp in grps])
+            for dimen, grps in self._dimension_grps.items())
+
+    def _string_modifier(self):
+        if not self._strings:
+            return None
+
+        string_modifier = om.MDGModifier()
+        for name, attr, value in self._strings:
+            string_modifier.newPlugValueString(
+                _plug(self._node(name), attr), value)
+        return string_modifier
+
+    def _node(self, name):
+        if name in self._created:
+            return self._created[name]
+        selection = om.MSelectionList()
+        selection.add(name)
+        return selection.getDependNode(0)
+
+
+def _plug(node, attr_name):
+    return om.MFnDependencyNode(node).findPlug(attr_name, False)
+
+
+def _distance(value):
+    # plug values are stored in centimeters whatever the scene unit is,
+    # cmds.setAttr values are in the scene unit like value
+    return om.MDistance(value, om.MDistance.uiUnit())
+
+
+def create_dimension_grps(refs, allocator=None, parts=None):
+    '''Builds many Dimension Groups with a single modifier.
+
+    Arguments:
+        refs {list} -- (prefix, length, width, height, position) tuples in
+            scene units. position may be None.
+
+    Keyword Arguments:
+        allocator {naming.NameAllocator} -- Allocator of unique node names
+            (default: {None})
+        parts {dict} -- When given, no colors are set and each created
+            _<dimen>Dist_grp is appended to parts[dimension] as a
+            one-item tuple, see core.build_dimension_network
+            (default: {None})
+
+    Returns:
+        list -- Names of the created _refDistance_grps.
+    '''
+
+    builder = ReferenceBuilder(allocator)
+    for grp_name, len_value, width_value, height_value, position in refs:
+        builder.add_reference(
+            grp_name, len_value, width_value, height_value, position,
+            colors=parts is None)
+
+    ref_grps = builder.execute()
+    if parts is not None:
+        for dimen, grps in builder.dimension_grps().items():
+            parts.setdefault(dimen, []).extend((grp,) for grp in grps)
+
+    return ref_grps
+
+
+def execute_ops(ops):
+    '''Applies planned build ops with OpenMaya modifiers, see network.py.
+
+    Arguments:
+        ops {iterable} -- CREATE_NODE, SET_ATTR, ADD_ATTR and CONNECT_ATTR
+            ops, see network.py.
+
+    Raises:
+        RuntimeError -- If an op fails, nothing is applied then.
+
+    Returns:
+        dict -- Planned name -> actual name of every created node.
+    '''
+
+    builder = ReferenceBuilder()
+    builder.add_ops(ops)
+    builder.execute()
+    return builder.created_names()
+
+
+def _set_plug_value(modifier, plug, value):
+    # values are in the scene unit like with cmds.setAttr, distance plugs
+    # store centimeters
+    attribute = plug.attribute()
+    if attribute.hasFn(om.MFn.kUnitAttribute) and \
+            om.MFnUnitAttribute(attribute).unitType() == \
+            om.MFnUnitAttribute.kDistance:
+        modifier.newPlugValueMDistance(plug, _distance(value))
+    else:
+        modifier.newPlugValueDouble(plug, value)
+
+
+def _element_plug(node, attr):
+    # 'worldPosition[0]' -> element 0 of worldPosition
+    attr_name, _, index = attr.partition('[')
+    plug = _plug(node, attr_name)
+    if index:
+        plug = plug.elementByLogicalIndex(int(index.rstrip(']')))
+    return plug
@@ -0,0 +1,542 @@
+'''Plans reference builds off the main thread and executes them on it.
+
+Building a batch is split in two:
+
+    plan_references() turns specs into a BuildPlan: validation, unit
+        conversion, naming, locator positions and metadata are all worked
+        out up front. It never touches the scene, only a SceneSnapshot
+        taken beforehand, so it can run in a thread or process pool.
+    execute_plan() runs the planned ops through the scene proxy. This is
+        the only part that has to run on Maya's main thread.
+
+A BuildPlan is made of tuples, strings and numbers only, so it is immutable
+and can be pickled to and from worker processes.
+
+The ops and the ReferencePlan of each reference are planned by
+network.plan_reference(), the names of network.py are re-exported here.
+Node names are the planned names. When the scene changed since the
+snapshot and Maya picks another name, later ops follow the actual name.
+
+A lineup set up in one shot can be reproduced in others: record_scene()
+saves the plan of its references to a compact JSON file, gzipped when the
+path ends with .gz, and replay_plan() executes it in another scene. The
+file holds one row per reference, its ops are planned again when it is
+loaded. The values in the file are already validated and in scene units,
+so replaying only converts them again when the other scene uses a
+different unit.
+
+    import plan
+    plan.record_scene('/shows/abc/lineup.json.gz')
+    # in every other shot
+    plan.replay_plan('/shows/abc/lineup.json.gz')
+'''
+
+import gzip
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from collections import namedtuple
+from multiprocessing.pool import ThreadPool
+
+import scene
+from scene import cmds
+
+import core
+import naming
+import registry
+import units
+import validation
+from network import (
+    ADD_ATTR, CONNECT_ATTR, CREATE_NODE, DIMENSION_COLORS, SET_ATTR,
+    SET_COLOR_OVERRIDES, ReferencePlan, apply_op, apply_reference, color_op,
+    plan_reference)
+
+# layout version of BuildPlan and of the files save_plan() writes
+PLAN_VERSION = 2
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# scene state planning depends on, names and prefixes are frozensets
+SceneSnapshot = namedtuple(
+    'SceneSnapshot', ['scene_unit', 'names', 'prefixes'])
+
+# size is the number of planned specs, errors are (index, prefix, message)
+# tuples of the specs that were rejected while planning
+BuildPlan = namedtuple(
+    'BuildPlan',
+    ['version', 'scene_unit', 'size', 'references', 'post_ops', 'errors'])
+
+
+def take_snapshot():
+    '''Reads the scene state planning needs. Runs on the main thread.
+
+    Returns:
+        SceneSnapshot -- Scene unit, node names and reference prefixes.
+    '''
+
+    return SceneSnapshot(
+        core.get_scene_units(),
+        frozenset(name.split('|')[-1] for name in cmds.ls() or []),
+        frozenset(registry.existing_prefixes()))
+
+
+def plan_references(specs, snapshot, min_size=None, workers=1,
+                    processes=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''Plans the build of many references without touching the scene.
+
+    Arguments:
+        specs {list} -- Specs, see core.create_dimension_grps.
+        snapshot {SceneSnapshot} -- Scene state from take_snapshot().
+
+    Keyword Arguments:
+        min_size {float} -- See core.create_dimension_grps
+            (default: {None})
+        workers {int} -- Chunks planned in parallel, 1 plans in the
+            calling thread (default: {1})
+        processes {bool} -- Use a process pool instead of a thread pool.
+            Where workers are spawned rather than forked (Windows, macOS)
+            they are started with mayapy, found next to the Maya binary
+            in a GUI session (default: {False})
+        chunk_size {int} -- Specs per pool task
+            (default: {DEFAULT_CHUNK_SIZE})
+
+    Returns:
+        BuildPlan -- The plan, see execute_plan().
+    '''
+
+    # malformed specs are left as they are for validation to report
+    specs = [tuple(spec) if isinstance(spec, list) else spec
+             for spec in specs]
+
+    # validation looks at the whole batch, ie. for duplicate prefixes
+    errors = []
+    rejected = set()
+    for error in validation.validate_specs(
+            specs, snapshot.scene_unit, min_size, check_scene=False):
+        if error.index not in rejected:
+            rejected.add(error.index)
+            errors.append((error.index, error.prefix, error.message))
+    for index, spec in enumerate(specs):
+        if index not in rejected and str(spec[0]) in snapshot.prefixes:
+            rejected.add(index)
+            errors.append((
+                index, str(spec[0]),
+                str(spec[0]) + registry.REF_GRP_SUFFIX + ' already exists'))
+    errors.sort()
+
+    valid = [(index, spec) for index, spec in enumerate(specs)
+             if index not in rejected]
+    chunks = [valid[start:start + chunk_size]
+              for start in range(0, len(valid), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        if processes:
+            _use_mayapy_executable()
+        pool_type = multiprocessing.Pool if processes else ThreadPool
+        pool = pool_type(workers, _init_worker, (snapshot,))
+        try:
+            planned = pool.map(_plan_worker_chunk, chunks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        planned = [_plan_chunk(chunk, snapshot) for chunk in chunks]
+
+    return _build_plan(
+        snapshot.scene_unit, len(specs),
+        itertools.chain.from_iterable(planned), errors)
+
+
+def _build_plan(scene_unit, size, references, errors):
+    references = tuple(references)
+
+    # color every reference's parts with a single command
+    return BuildPlan(
+        PLAN_VERSION, scene_unit, size, references,
+        (color_op(references),), tuple(errors))
+
+
+def _use_mayapy_executable():
+    # spawned workers run sys.executable, which is the Maya binary itself
+    # in a GUI session and would open another Maya
+    executable = os.path.basename(sys.executable).lower()
+    if not executable.startswith('maya') or executable.startswith('mayapy'):
+        return
+
+    extension = '.exe' if executable.endswith('.exe') else ''
+    directory = os.path.dirname(sys.executable)
+    # mayapy is next to maya.exe on Windows, and in Maya.app/Contents/bin
+    # next to Contents/MacOS/Maya on macOS
+    for candidate in (
+            os.path.join(directory, 'mayapy' + extension),
+            os.path.join(directory, os.pardir, 'bin', 'mayapy' + extension)):
+        if os.path.isfile(candidate):
+            multiprocessing.set_executable(os.path.normpath(candidate))
+            return
+
+    raise RuntimeError(
+        'processes=True needs mayapy next to ' + sys.executable)
+
+
+_WORKER_SNAPSHOT = None
+
+
+def _init_worker(snapshot):
+    global _WORKER_SNAPSHOT
+    _WORKER_SNAPSHOT = snapshot
+
+
+def _plan_worker_chunk(chunk):
+    return _plan_chunk(chunk, _WORKER_SNAPSHOT)
+
+
+def _plan_chunk(chunk, snapshot):
+    # prefixes are unique at this point and every node name ends with a
+    # suffix tied to its prefix, so chunks can never allocate the same
+    # name. Each chunk only has to avoid the snapshot's names.
+    allocator = naming.NameAllocator(snapshot.names)
+    dimens = [dimen for dimen, _ in DIMENSION_COLORS]
+    references = []
+    for index, spec in chunk:
+        grp_name, len_value, width_value, height_value, unit = spec[:5]
+        position = spec[5] if len(spec) > 5 else None
+
+        dimensions = (
+            float(len_value), float(width_value), float(height_value))
+        if unit and unit != snapshot.scene_unit:
+            dimensions = tuple(units.convert_many(
+                dimensions, unit, snapshot.scene_unit))
+
+        references.append(plan_reference(
+            index, str(grp_name), dimensions, unit, position,
+            snapshot.scene_unit,
+            naming.reference_node_names(grp_name, dimens, allocator)))
+    return references
+
+
+def execute_plan(plan, backend='cmds'):
+    '''Runs a plan's ops in a single undo chunk. Runs on the main thread.
+
+    With 'cmds' a reference whose ops fail is deleted again, so only whole
+    references are left in the scene. With 'om' the references are applied
+    as a whole, so they fail or succeed as a whole.
+
+    Arguments:
+        plan {BuildPlan} -- Plan from plan_references().
+
+    Keyword Arguments:
+        backend {str} -- 'cmds' runs every op through the scene proxy, 'om'
+            queues them on OpenMaya 2.0 modifiers, see
+            om_backend.execute_ops (default: {'cmds'})
+
+    Returns:
+        list -- One core.BuildResult per planned spec, in order.
+    '''
+
+    if backend not in ('cmds', 'om'):
+        raise ValueError('Unknown backend: ' + str(backend))
+
+    results = [None] * plan.size
+    for index, prefix, message in plan.errors:
+        results[index] = core.BuildResult(prefix, None, message)
+
+    # planned name -> name Maya gave the node
+    actual = {}
+    failed_nodes = set()
+
+    cmds.undoInfo(openChunk=True, chunkName='executeBuildPlan')
+    cmds.refresh(suspend=True)
+    try:
+        if backend == 'om':
+            built = _apply_om(plan.references, actual, results, failed_nodes)
+        else:
+            built = _apply_cmds(
+                plan.references, actual, results, failed_nodes)
+
+        for reference in built:
+            ref_grp = actual[reference.group]
+            core.register_ref_grp(
+                reference.prefix, ref_grp, reference.unit,
+                reference.dimensions)
+            results[reference.index] = core.BuildResult(
+                reference.prefix, ref_grp, None)
+
+        for op in plan.post_ops:
+            apply_op(op, actual, failed_nodes)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
+
+    return results
+
+
+def _apply_cmds(references, actual, results, failed_nodes):
+    built = []
+    for reference in references:
+        try:
+            apply_reference(reference, actual)
+        except (RuntimeError, ValueError) as err:
+            _fail_reference(reference, str(err), results, failed_nodes)
+        else:
+            built.append(reference)
+    return built
+
+
+def _apply_om(references, actual, results, failed_nodes):
+    import om_backend
+
+    try:
+        actual.update(om_backend.execute_ops(itertools.chain.from_iterable(
+            reference.ops for reference in references)))
+    except RuntimeError as err:
+        for reference in references:
+            _fail_reference(reference, str(err), results, failed_nodes)
+        return []
+    return references
+
+
+def _fail_reference(reference, message, results, failed_nodes):
+    failed_nodes.update(
+        op[2] for op in reference.ops if op[0] == CREATE_NODE)
+    results[reference.index] = core.BuildResult(
+        reference.prefix, None, message)
+
+
+def save_plan(plan, path):
+    '''Writes a plan to a compact JSON file, gzipped if path ends with .gz.
+
+    Only the (index, prefix, unit, dimensions, position) row of every
+    reference is written, load_plan() plans its ops again.
+
+    Arguments:
+        plan {BuildPlan} -- Plan to write.
+        path {str} -- File to write.
+    '''
+
+    data = {
+        'version': PLAN_VERSION,
+        'scene_unit': plan.scene_unit,
+        'size': plan.size,
+        'references': [
+            (reference.index, reference.prefix, reference.unit,
+             reference.dimensions, reference.position)
+            for reference in plan.references],
+        'errors': plan.errors,
+    }
+    data = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    with _open_plan_file(path, 'wb') as plan_file:
+        plan_file.write(data)
+
+
+def load_plan(path):
+    '''Reads a plan written by save_plan().
+
+    Arguments:
+        path {str} -- JSON or gzipped JSON file.
+
+    Raises:
+        ValueError -- If the file is not a plan of this PLAN_VERSION.
+
+    Returns:
+        BuildPlan -- The plan, made of tuples again.
+    '''
+
+    with _open_plan_file(path, 'rb') as plan_file:
+        data = json.loads(plan_file.read().decode('utf-8'))
+
+    if not isinstance(data, dict) or data.get('version') != PLAN_VERSION:
+        raise ValueError('Unsupported build plan: ' + str(path))
+
+    scene_unit = data['scene_unit']
+    references = [
+        plan_reference(index, prefix, dimensions, unit, position, scene_unit)
+        for index, prefix, unit, dimensions, position in data['references']]
+    return _build_plan(
+        scene_unit, data['size'], references, _tuples(data['errors']))
+
+
+def _open_plan_file(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _tuples(value):
+    # JSON has no tuples, plans are made of them
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    return value
+
+
+def plan_from_scene(prefixes=None):
+    '''Returns the plan that rebuilds the scene's references as they are.
+
+    Dimensions, units and world positions are read like report.py does.
+    Dimensions are measured from the distance shapes and positions are in
+    scene units, so the references built with any backend, or resized
+    since, are recorded as they are.
+
+    Keyword Arguments:
+        prefixes {list} -- Prefixes of the references to record, None
+            records all of them (default: {None})
+
+    Returns:
+        BuildPlan -- Plan in the scene's unit, references by group name.
+    '''
+
+    import report
+
+    if prefixes is not None:
+        prefixes = set(prefixes)
+
+    scene_unit = core.get_scene_units()
+    references = []
+    for row in report.iter_report_rows():
+        if prefixes is not None and row.prefix not in prefixes:
+            continue
+        # a reference missing one of its distance shapes cannot be rebuilt
+        if None in (row.length, row.width, row.height):
+            continue
+        references.append(plan_reference(
+            len(references), row.prefix,
+            (row.length, row.width, row.height), row.unit,
+            (row.x, row.y, row.z), scene_unit))
+
+    return _build_plan(scene_unit, len(references), references, ())
+
+
+def record_scene(path, prefixes=None):
+    '''Saves the plan of the scene's references, see plan_from_scene().
+
+    Arguments:
+        path {str} -- File to write, see save_plan().
+
+    Keyword Arguments:
+        prefixes {list} -- See plan_from_scene (default: {None})
+
+    Returns:
+        int -- Number of references recorded.
+    '''
+
+    plan = plan_from_scene(prefixes)
+    save_plan(plan, path)
+    return len(plan.references)
+
+
+def fastest_backend():
+    '''Returns the fastest backend execute_plan() can use in this session.
+
+    '''
+
+    backend = scene.get_backend()
+    # look through the counting backend of profiling.enable()
+    backend = getattr(backend, '_backend', backend)
+    return 'om' if isinstance(backend, scene.MayaCmdsBackend) else 'cmds'
+
+
+def replay_plan(plan, backend=None):
+    '''Executes a saved plan in the open scene.
+
+    The specs were validated and converted when the plan was made, so
+    replaying skips both. Only references whose prefix is already in the
+    scene are rejected, and the values are converted again when the scene
+    unit differs from the plan's.
+
+    Arguments:
+        plan {BuildPlan or str} -- Plan, or the file save_plan() wrote it
+            to.
+
+    Keyword Arguments:
+        backend {str} -- See execute_plan, None uses fastest_backend()
+            (default: {None})
+
+    Returns:
+        list -- One core.BuildResult per planned spec, in order.
+    '''
+
+    if not isinstance(plan, BuildPlan):
+        plan = load_plan(plan)
+    if backend is None:
+        backend = fastest_backend()
+
+    scene_unit = core.get_scene_units()
+    existing = registry.existing_prefixes()
+    convert = plan.scene_unit != scene_unit
+    if not convert and existing.isdisjoint(
+            reference.prefix for reference in plan.references):
+        return execute_plan(plan, backend)
+
+    references = []
+    errors = list(plan.errors)
+    for reference in plan.references:
+        if reference.prefix in existing:
+            errors.append((
+                reference.index, reference.prefix,
+                reference.prefix + registry.REF_GRP_SUFFIX +
+                ' already exists'))
+            continue
+
+        if convert:
+            position = reference.position
+            if position is not None:
+                position = units.convert_many(
+                    position, plan.scene_unit, scene_unit)
+            reference = plan_reference(
+                reference.index, reference.prefix, units.convert_many(
+                    reference.dimensions, plan.scene_unit, scene_unit),
+                reference.unit, position, scene_unit)
+        references.append(reference)
+
+    return execute_plan(
+        _build_plan(scene_unit, plan.size, references, sorted(errors)),
+        backend)
+
+
+def plan_in_background(specs, on_planned, on_error=None, **kwargs):
+    '''Plans specs on a background thread, then hands the plan back.
+
+    The snapshot is taken on the calling thread, which must be the main
+    thread. Inside Maya the callbacks are called on the main thread with
+    maya.utils.executeDeferred, ready to call execute_plan(). Outside Maya
+    there is no event loop to defer to and they are called on the planning
+    thread.
+
+    Arguments:
+        specs {list} -- Specs, see core.create_dimension_grps.
+        on_planned {callable} -- Called with the BuildPlan.
+
+    Keyword Arguments:
+        on_error {callable} -- Called with the exception when planning
+            fails, None lets the planning thread raise it (default: {None})
+        **kwargs -- See plan_references.
+
+    Returns:
+        threading.Thread -- The planning thread.
+    '''
+
+    snapshot = take_snapshot()
+
+    try:
+        from maya import utils
+        deliver = utils.executeDeferred
+    except ImportError:
+        def deliver(func, *args):
+            func(*args)
+
+    def run():
+        try:
+            build_plan = plan_references(specs, snapshot, **kwargs)
+        except Exception as err:
+            if on_error is None:
+                raise
+            deliver(on_error, err)
+        else:
+            deliver(on_planned, build_plan)
+
+    thread = threading.Thread(target=run, name='scaleReferencePlanner')
+    thread.daemon = True
+    thread.start()
+    return thread
@@ -0,0 +1,233 @@
+'''Optional timing of the phases of a reference build.
+
+core wraps each step of a build (grouping, locators, distance shapes,
+connections, renames, color overrides, ...) in a phase:
+
+    with profiling.phase('locators'):
+        ...
+
+While profiling is disabled phase() returns a shared no-op context, so
+instrumented code only pays for one global lookup per phase. While it is
+enabled every phase is timed and every scene command issued through the
+scene proxy is counted against the innermost open phase.
+
+    with profiling.profile() as profiler:
+        core.create_dimension_grps(specs)
+    print(profiler.summary())
+    profiler.export_chrome_trace('build.json')  # open in chrome://tracing
+'''
+
+import json
+from collections import namedtuple
+from contextlib import contextmanager
+
+import scene
+from scene import _clock
+
+# start and duration are in seconds from the profiler's creation, depth is
+# the number of enclosing phases, commands the scene commands issued
+# directly inside the phase
+PhaseEvent = namedtuple(
+    'PhaseEvent', ['name', 'start', 'duration', 'depth', 'commands'])
+
+_PROFILER = None
+
+
+class Profiler(object):
+    '''Records timed phases and counts scene commands.
+
+    '''
+
+    def __init__(self):
+        self.events = []
+        self.commands = {}
+        self._stack = []
+        self._origin = _clock()
+
+    def begin(self, name):
+        self._stack.append([name, _clock(), 0])
+
+    def end(self):
+        name, start, commands = self._stack.pop()
+        self.events.append(PhaseEvent(
+            name, start - self._origin, _clock() - start, len(self._stack),
+            commands))
+
+    def count_command(self, name):
+        self.commands[name] = self.commands.get(name, 0) + 1
+        if self._stack:
+            self._stack[-1][2] += 1
+
+    def totals(self):
+        '''Returns the aggregated phases.
+
+        Returns:
+            list -- (name, calls, seconds, commands) tuples, slowest first.
+        '''
+
+        totals = {}
+        for event in self.events:
+            calls, seconds, commands = totals.get(event.name, (0, 0.0, 0))
+            totals[event.name] = (
+                calls + 1, seconds + event.duration,
+                commands + event.commands)
+
+        return sorted(
+            ((name,) + values for name, values in totals.items()),
+            key=lambda row: -row[2])
+
+    def summary(self):
+        '''Returns the aggregated phases and command counts as a table.
+
+        Phases nest, so the seconds of an outer phase include its inner
+        phases while commands only count those issued directly inside it.
+        '''
+
+        lines = ['%-20s %8s %12s %10s %10s' % (
+            'phase', 'calls', 'seconds', 'mean ms', 'commands')]
+        for name, calls, seconds, commands in self.totals():
+            lines.append('%-20s %8d %12.4f %10.4f %10d' % (
+                name, calls, seconds, seconds * 1000.0 / calls, commands))
+
+        lines.append('')
+        lines.append('%-20s %8s' % ('command', 'calls'))
+        for name, calls in sorted(
+                self.commands.items(), key=lambda item: -item[1]):
+            lines.append('%-20s %8d' % (name, calls))
+
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        '''Returns the phases in Chrome's trace event format.
+
+        '''
+
+        return {'traceEvents': [
+            {'name': event.name, 'ph': 'X', 'pid': 0, 'tid': 0,
+             'ts': event.start * 1e6, 'dur': event.duration * 1e6,
+             'args': {'commands': event.commands}}
+            for event in self.events]}
+
+    def export_chrome_trace(self, path):
+        '''Writes the phases to a JSON file chrome://tracing can open.
+
+        '''
+
+        with open(path, 'w') as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+
+class _Phase(object):
+
+    __slots__ = ('profiler', 'name')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.begin(self.name)
+
+    def __exit__(self, *exc_info):
+        self.profiler.end()
+
+
+class _NullPhase(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _CountingBackend(object):
+    '''Scene backend that counts every command before forwarding it.
+
+    '''
+
+    def __init__(self, backend, profiler):
+        self._backend = backend
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        attr = getattr(self._backend, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        profiler = self._profiler
+
+        def counted(*args, **kwargs):
+            profiler.count_command(name)
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def phase(name):
+    '''Returns a context manager timing the enclosed block as phase name.
+
+    '''
+
+    if _PROFILER is None:
+        return _NULL_PHASE
+    return _Phase(_PROFILER, name)
+
+
+def get_profiler():
+    '''Returns the active profiler, or None if profiling is disabled.
+
+    '''
+
+    return _PROFILER
+
+
+def enable():
+    '''Starts a new profiler and counts the active backend's commands.
+
+    Returns:
+        Profiler -- The active profiler.
+    '''
+
+    global _PROFILER
+
+    disable()
+    _PROFILER = Profiler()
+    scene.set_backend(_CountingBackend(scene.get_backend(), _PROFILER))
+
+    return _PROFILER
+
+
+def disable():
+    '''Stops profiling and restores the uncounted backend.
+
+    Returns:
+        Profiler -- The profiler that was active, or None.
+    '''
+
+    global _PROFILER
+
+    profiler, _PROFILER = _PROFILER, None
+    backend = scene.get_backend()
+    if isinstance(backend, _CountingBackend):
+        scene.set_backend(backend._backend)
+
+    return profiler
+
+
+@contextmanager
+def profile():
+    '''Context manager that profiles the enclosed block.
+
+    '''
+
+    profiler = enable()
+    try:
+        yield profiler
+    finally:
+        disable()
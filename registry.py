@@ -0,0 +1,320 @@
+'''In-process registry of the scene's _refDistance_grp groups.
+
+The registry is built with one scene scan and then kept current by core,
+which reports every reference it creates or deletes, and inside Maya by
+scene-change callbacks. Existence checks, listings and duplicate detection
+are dictionary lookups instead of scene queries.
+
+The registry is opt-in: call enable() once, ie. when the tool opens.
+'''
+
+from collections import namedtuple
+
+from scene import cmds
+
+import metadata
+import units
+
+REF_GRP_SUFFIX = '_refDistance_grp'
+
+# dimensions are (length, width, height) in scene units, unit is the unit
+# the reference was specified in. Both are None when unknown.
+ReferenceEntry = namedtuple(
+    'ReferenceEntry', ['prefix', 'group', 'unit', 'dimensions'])
+
+# decimals dimensions are rounded to when used as a lookup key
+DIMENSION_KEY_DECIMALS = 6
+
+_REGISTRY = None
+
+
+def get_prefix(grp_name):
+    '''Returns the prefix of a _refDistance_grp, or None for other nodes.
+
+    Arguments:
+        grp_name {str} -- Short or long node name.
+    '''
+
+    short_name = str(grp_name).split('|')[-1]
+    if not short_name.endswith(REF_GRP_SUFFIX):
+        return None
+    return short_name[:-len(REF_GRP_SUFFIX)]
+
+
+def dimension_key(dimensions):
+    '''Returns a hashable lookup key for (length, width, height).
+
+    '''
+
+    if dimensions is None:
+        return None
+    return tuple(round(float(value), DIMENSION_KEY_DECIMALS)
+                 for value in dimensions)
+
+
+class ReferenceRegistry(object):
+    '''Index of reference groups by prefix, unit and dimensions.
+
+    '''
+
+    def __init__(self):
+        self._by_prefix = {}
+        self._by_unit = {}
+        self._by_dimensions = {}
+        self._callback_ids = []
+
+    def __len__(self):
+        return len(self._by_prefix)
+
+    def __contains__(self, prefix):
+        return prefix in self._by_prefix
+
+    def scan(self):
+        '''Rebuilds the registry from a single scene query.
+
+        Units and dimensions come from each group's metadata, groups
+        without metadata are registered without them. Dimensions are
+        converted from the scene unit the metadata was written in.
+        '''
+
+        self.clear()
+        scene_unit = cmds.currentUnit(query=True, linear=True)
+        for grp_name, ref_data in metadata.read_all('*' + REF_GRP_SUFFIX):
+            grp_name = grp_name.split('|')[-1]
+            if ref_data is None:
+                self.add(get_prefix(grp_name), grp_name)
+                continue
+
+            dimensions = ref_data['dimensions']
+            written_unit = ref_data.get('scene_unit')
+            if written_unit and written_unit != scene_unit:
+                dimensions = units.convert_many(
+                    dimensions, written_unit, scene_unit)
+            self.add(get_prefix(grp_name), grp_name, ref_data.get('unit'),
+                     dimensions)
+
+    def clear(self):
+        self._by_prefix.clear()
+        self._by_unit.clear()
+        self._by_dimensions.clear()
+
+    def add(self, prefix, group=None, unit=None, dimensions=None):
+        '''Registers a reference, replacing any entry with the same prefix.
+
+        Arguments:
+            prefix {str} -- Prefix of the reference.
+
+        Keyword Arguments:
+            group {str} -- Name of the _refDistance_grp
+                (default: {prefix + REF_GRP_SUFFIX})
+            unit {str} -- Unit the reference was specified in
+                (default: {None})
+            dimensions {tuple} -- (length, width, height) in scene units
+                (default: {None})
+        '''
+
+        self.remove(prefix)
+
+        if group is None:
+            group = str(prefix) + REF_GRP_SUFFIX
+        if dimensions is not None:
+            dimensions = tuple(float(value) for value in dimensions)
+
+        entry = ReferenceEntry(prefix, group, unit, dimensions)
+        self._by_prefix[prefix] = entry
+        self._by_unit.setdefault(unit, set()).add(prefix)
+        self._by_dimensions.setdefault(
+            dimension_key(dimensions), set()).add(prefix)
+
+        return entry
+
+    def remove(self, prefix):
+        '''Unregisters a reference. Unknown prefixes are ignored.
+
+        '''
+
+        entry = self._by_prefix.pop(prefix, None)
+        if entry is None:
+            return
+
+        self._by_unit[entry.unit].discard(prefix)
+        self._by_dimensions[dimension_key(entry.dimensions)].discard(prefix)
+
+    def exists(self, prefix):
+        return prefix in self._by_prefix
+
+    def get(self, prefix):
+        '''Returns the ReferenceEntry of prefix, or None.
+
+        '''
+
+        return self._by_prefix.get(prefix)
+
+    def prefixes(self):
+        return sorted(self._by_prefix)
+
+    def entries(self):
+        return [self._by_prefix[prefix] for prefix in self.prefixes()]
+
+    def find(self, unit=None, dimensions=None):
+        '''Returns the entries matching a unit and/or dimensions.
+
+        Keyword Arguments:
+            unit {str} -- Unit the references were specified in
+                (default: {None})
+            dimensions {tuple} -- (length, width, height) in scene units
+                (default: {None})
+
+        Returns:
+            list -- Matching ReferenceEntry tuples, sorted by prefix.
+        '''
+
+        matches = None
+        if unit is not None:
+            matches = set(self._by_unit.get(unit, ()))
+        if dimensions is not None:
+            dimension_matches = self._by_dimensions.get(
+                dimension_key(dimensions), set())
+            matches = dimension_matches if matches is None \
+                else matches & dimension_matches
+        if matches is None:
+            matches = self._by_prefix
+
+        return [self._by_prefix[prefix] for prefix in sorted(matches)]
+
+    def duplicates(self):
+        '''Returns groups of prefixes that share the same dimensions.
+
+        Returns:
+            list -- Sorted lists of two or more prefixes.
+        '''
+
+        return [sorted(prefixes)
+                for key, prefixes in self._by_dimensions.items()
+                if key is not None and len(prefixes) > 1]
+
+    # -- Maya callbacks ------------------------------------------------------
+
+    def install_callbacks(self):
+        '''Keeps the registry current with Maya scene-change callbacks.
+
+        Does nothing outside of Maya.
+        '''
+
+        try:
+            from maya.api import OpenMaya as om
+        except ImportError:
+            return
+
+        self.remove_callbacks()
+        self._callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(
+                self._on_node_added, 'transform'),
+            om.MDGMessage.addNodeRemovedCallback(
+                self._on_node_removed, 'transform'),
+            om.MNodeMessage.addNameChangedCallback(
+                om.MObject.kNullObj, self._on_name_changed),
+        ]
+        for message in (om.MSceneMessage.kAfterNew,
+                        om.MSceneMessage.kAfterOpen,
+                        om.MSceneMessage.kAfterImport):
+            self._callback_ids.append(
+                om.MSceneMessage.addCallback(message, self._on_scene_changed))
+
+    def remove_callbacks(self):
+        if not self._callback_ids:
+            return
+
+        from maya.api import OpenMaya as om
+
+        om.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = []
+
+    @classmethod
+    def _node_name(cls, node):
+        from maya.api import OpenMaya as om
+        return om.MFnDependencyNode(node).name()
+
+    def _on_node_added(self, node, client_data=None):
+        grp_name = self._node_name(node)
+        prefix = get_prefix(grp_name)
+        if prefix is not None and prefix not in self._by_prefix:
+            self.add(prefix, grp_name)
+
+    def _on_node_removed(self, node, client_data=None):
+        prefix = get_prefix(self._node_name(node))
+        if prefix is not None:
+            self.remove(prefix)
+
+    def _on_name_changed(self, node, previous_name, client_data=None):
+        old_prefix = get_prefix(previous_name)
+        new_prefix = get_prefix(self._node_name(node))
+        if old_prefix == new_prefix:
+            return
+
+        entry = self._by_prefix.get(old_prefix)
+        if old_prefix is not None:
+            self.remove(old_prefix)
+        if new_prefix is not None:
+            if entry is None:
+                self.add(new_prefix)
+            else:
+                self.add(new_prefix, unit=entry.unit,
+                         dimensions=entry.dimensions)
+
+    def _on_scene_changed(self, client_data=None):
+        self.scan()
+
+
+def existing_prefixes():
+    '''Returns the prefixes of every reference in the scene.
+
+    Uses the active registry, or a single ls query when it is not enabled.
+
+    Returns:
+        set -- Prefixes of the scene's _refDistance_grps.
+    '''
+
+    if _REGISTRY is not None:
+        return set(_REGISTRY.prefixes())
+
+    return set(
+        get_prefix(grp_name) for grp_name in
+        cmds.ls('*' + REF_GRP_SUFFIX, type='transform') or [])
+
+
+def get_registry():
+    '''Returns the active registry, or None if it is not enabled.
+
+    '''
+
+    return _REGISTRY
+
+
+def enable():
+    '''Scans the scene and activates the registry.
+
+    Returns:
+        ReferenceRegistry -- The active registry.
+    '''
+
+    global _REGISTRY
+
+    if _REGISTRY is None:
+        _REGISTRY = ReferenceRegistry()
+        _REGISTRY.install_callbacks()
+    _REGISTRY.scan()
+
+    return _REGISTRY
+
+
+def disable():
+    '''Removes the registry's callbacks and deactivates it.
+
+    '''
+
+    global _REGISTRY
+
+    if _REGISTRY is not None:
+        _REGISTRY.remove_callbacks()
+    _REGISTRY = None
@@ -0,0 +1,186 @@
+'''Exports a report of every scale reference in the scene.
+
+One row per _refDistance_grp with its prefix, dimensions, units and world
+position, written as CSV or JSON Lines while the groups are walked, so
+scenes with thousands of references are never held in memory as a whole.
+
+Dimensions are measured from each group's distance shapes. Every group's
+metadata is read with one query, and world positions with one more. A row
+is flagged stale when the measured size no longer matches the metadata
+written when the reference was built, ie. after its locators were moved
+or rigged. measure=False reports the metadata without measuring, which is
+faster but cannot tell stale sizes apart.
+
+Inside Maya:
+
+    import report
+    report.export_report('/tmp/sh010_refs.csv')
+
+Headless, on a saved scene:
+
+    mayapy report.py SCENE OUTPUT [--metadata]
+'''
+
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import namedtuple
+
+from scene import cmds
+
+import core
+import metadata
+import registry
+import units
+
+# source is 'metadata' or 'measured'. stale is True when the measured size
+# differs from the metadata, None when there was nothing to compare.
+ReportRow = namedtuple('ReportRow', [
+    'prefix', 'group', 'length', 'width', 'height', 'unit', 'scene_unit',
+    'x', 'y', 'z', 'source', 'stale'])
+
+FORMATS = ('csv', 'jsonl')
+
+# relative difference between measured and metadata sizes that is stale
+STALE_TOLERANCE = 1e-6
+
+
+def iter_report_rows(measure=True):
+    '''Yields a ReportRow for every reference of the scene, by group name.
+
+    Keyword Arguments:
+        measure {bool} -- Read the dimensions from the distance shapes,
+            False trusts the metadata of groups that have it
+            (default: {True})
+    '''
+
+    scene_unit = core.get_scene_units()
+    groups = sorted(metadata.read_all('*' + registry.REF_GRP_SUFFIX))
+    if not groups:
+        return
+
+    positions = cmds.worldPositions([grp_name for grp_name, _ in groups])
+    for (grp_name, ref_data), position in zip(groups, positions):
+        unit = None
+        written = None
+        if ref_data is not None:
+            unit = ref_data.get('unit')
+            written = ref_data['dimensions']
+            # the scene unit may have changed since the group was built
+            written_unit = ref_data.get('scene_unit') or scene_unit
+            if written_unit != scene_unit:
+                written = units.convert_many(
+                    written, written_unit, scene_unit)
+
+        stale = None
+        if ref_data is None or measure:
+            dimensions = core.get_dimension_distances(grp_name)
+            source = 'measured'
+            if written is not None:
+                stale = _is_stale(dimensions, written)
+        else:
+            dimensions = written
+            source = 'metadata'
+
+        yield ReportRow(*(
+            (registry.get_prefix(grp_name), grp_name) + tuple(dimensions) +
+            (unit, scene_unit) + tuple(position) + (source, stale)))
+
+
+def _is_stale(measured, written):
+    for measured_value, written_value in zip(measured, written):
+        if measured_value is None or abs(measured_value - written_value) > \
+                STALE_TOLERANCE * max(abs(written_value), 1.0):
+            return True
+    return False
+
+
+def write_report(rows, path, report_format=None):
+    '''Writes report rows to a file as they are produced.
+
+    Arguments:
+        rows {iterable} -- ReportRow tuples.
+        path {str} -- File to write.
+
+    Keyword Arguments:
+        report_format {str} -- 'csv' or 'jsonl', None picks it from the
+            extension of path (default: {None})
+
+    Returns:
+        int -- Number of rows written.
+    '''
+
+    if report_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        report_format = 'jsonl' if extension in ('.jsonl', '.ndjson') \
+            else 'csv'
+    if report_format not in FORMATS:
+        raise ValueError('Unknown report format: ' + str(report_format))
+
+    count = 0
+    if report_format == 'csv':
+        if sys.version_info[0] < 3:
+            report_file = open(path, 'wb')
+        else:
+            report_file = open(path, 'w', newline='')
+        with report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(ReportRow._fields)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    else:
+        with open(path, 'w') as report_file:
+            for row in rows:
+                report_file.write(json.dumps(row._asdict()) + '\n')
+                count += 1
+
+    return count
+
+
+def export_report(path, report_format=None, measure=True):
+    '''Writes the report of the open scene to path.
+
+    Arguments:
+        path {str} -- CSV or JSON Lines file to write.
+
+    Keyword Arguments:
+        report_format {str} -- See write_report (default: {None})
+        measure {bool} -- See iter_report_rows (default: {True})
+
+    Returns:
+        int -- Number of references reported.
+    '''
+
+    return write_report(iter_report_rows(measure), path, report_format)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scene', help='Maya scene to report on')
+    parser.add_argument('output', help='CSV or JSON Lines file to write')
+    parser.add_argument('--format', choices=FORMATS)
+    parser.add_argument(
+        '--metadata', action='store_true',
+        help='report the metadata instead of measuring every reference')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+    try:
+        from maya import cmds as maya_cmds
+
+        maya_cmds.file(args.scene, open=True, force=True)
+        count = export_report(
+            args.output, args.format, not args.metadata)
+    finally:
+        maya.standalone.uninitialize()
+
+    print('%d references written to %s' % (count, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,725 @@
+'''Pluggable scene backends core issues its scene commands through.
+
+core never imports maya.cmds directly, it calls the cmds proxy defined
+here. The proxy forwards every call to the active backend:
+
+    MayaCmdsBackend -- maya.cmds, used by default inside Maya.
+    FakeCmds -- in-memory scene that models nodes, names, parenting and
+        connections and records every operation with its count and time.
+        Lets the builder run, be benchmarked and regression-tested without
+        a Maya session.
+'''
+
+import fnmatch
+import functools
+import math
+import time
+from contextlib import contextmanager
+
+# time.perf_counter does not exist in Maya's Python 2.7
+_clock = getattr(time, 'perf_counter', time.time)
+
+_BACKEND = None
+
+
+class MayaCmdsBackend(object):
+    '''Forwards every call to maya.cmds.
+
+    '''
+
+    def __init__(self):
+        from maya import cmds as maya_cmds
+        self._cmds = maya_cmds
+
+    def __getattr__(self, name):
+        return getattr(self._cmds, name)
+
+    def worldBoundingBoxes(self, nodes):
+        '''Returns the world bounding boxes of many DAG nodes in one pass.
+
+        Reads every box through OpenMaya instead of issuing one
+        exactWorldBoundingBox or xform command per node.
+
+        Arguments:
+            nodes {list} -- Names of shape nodes, ie. meshes.
+
+        Returns:
+            list -- (xmin, ymin, zmin, xmax, ymax, zmax) per node, in order,
+                in scene units.
+        '''
+
+        from maya.api import OpenMaya as om
+
+        selection = om.MSelectionList()
+        for node in nodes:
+            selection.add(node)
+
+        # OpenMaya returns centimeters whatever the scene unit is
+        factor = om.MDistance.internalToUI(1.0)
+
+        bounds = []
+        for index in range(selection.length()):
+            dag_path = selection.getDagPath(index)
+            bbox = om.MFnDagNode(dag_path).boundingBox
+            bbox.transformUsing(dag_path.inclusiveMatrix())
+            bounds.append(tuple(
+                value * factor
+                for value in tuple(bbox.min)[:3] + tuple(bbox.max)[:3]))
+        return bounds
+
+    def worldPositions(self, nodes):
+        '''Returns the world translation of many DAG nodes in one pass.
+
+        Arguments:
+            nodes {list} -- Names of transforms.
+
+        Returns:
+            list -- (x, y, z) per node, in order, in scene units.
+        '''
+
+        from maya.api import OpenMaya as om
+
+        selection = om.MSelectionList()
+        for node in nodes:
+            selection.add(node)
+
+        # OpenMaya returns centimeters whatever the scene unit is
+        factor = om.MDistance.internalToUI(1.0)
+
+        positions = []
+        for index in range(selection.length()):
+            matrix = om.MTransformationMatrix(
+                selection.getDagPath(index).inclusiveMatrix())
+            positions.append(tuple(
+                value * factor
+                for value in matrix.translation(om.MSpace.kWorld)))
+        return positions
+
+    def stringAttrValues(self, pattern, attr):
+        '''Reads a string attribute of every node matching pattern at once.
+
+        Reads every value through OpenMaya instead of issuing one getAttr
+        command per node.
+
+        Arguments:
+            pattern {str} -- Node name or wildcard, ie. '*_grp'.
+            attr {str} -- Name of the string attribute.
+
+        Returns:
+            list -- (node name, value) per transform matching pattern.
+                value is None when the node does not have the attribute.
+        '''
+
+        from maya.api import OpenMaya as om
+
+        selection = om.MSelectionList()
+        try:
+            selection.add(pattern)
+        except RuntimeError:
+            # nothing matches the pattern
+            return []
+
+        values = []
+        for index in range(selection.length()):
+            node = selection.getDependNode(index)
+            if not node.hasFn(om.MFn.kTransform):
+                continue
+            node_fn = om.MFnDependencyNode(node)
+            value = None
+            if node_fn.hasAttribute(attr):
+                value = node_fn.findPlug(attr, False).asString()
+            values.append((node_fn.name(), value))
+        return values
+
+    def setColorOverrides(self, colors):
+        '''Enables and sets the override color of many nodes at once.
+
+        Every value is queued on one MDGModifier and applied as a single
+        undoable command instead of two setAttr commands per node.
+
+        Arguments:
+            colors {dict} -- overrideColor index -> names of the nodes to
+                draw with it.
+        '''
+
+        from maya.api import OpenMaya as om
+
+        import om_backend
+
+        modifier = om.MDGModifier()
+        for color_index, nodes in colors.items():
+            selection = om.MSelectionList()
+            for node in nodes:
+                selection.add(node)
+
+            for index in range(selection.length()):
+                node_fn = om.MFnDependencyNode(selection.getDependNode(index))
+                modifier.newPlugValueBool(
+                    node_fn.findPlug('overrideEnabled', False), True)
+                modifier.newPlugValueInt(
+                    node_fn.findPlug('overrideColor', False), color_index)
+
+        om_backend.run_modifier(modifier)
+
+
+class _BackendProxy(object):
+    '''Module level stand-in for maya.cmds that resolves the active backend.
+
+    '''
+
+    def __getattr__(self, name):
+        return getattr(get_backend(), name)
+
+
+cmds = _BackendProxy()
+
+
+def get_backend():
+    '''Returns the active scene backend, defaulting to maya.cmds.
+
+    '''
+
+    global _BACKEND
+
+    if _BACKEND is None:
+        _BACKEND = MayaCmdsBackend()
+    return _BACKEND
+
+
+def set_backend(backend):
+    '''Makes backend the active scene backend.
+
+    Arguments:
+        backend {object} -- Object exposing the maya.cmds functions core
+            uses, or None to fall back to maya.cmds.
+
+    Returns:
+        object -- The previously active backend.
+    '''
+
+    global _BACKEND
+
+    previous, _BACKEND = _BACKEND, backend
+    return previous
+
+
+@contextmanager
+def use_backend(backend):
+    '''Context manager that activates backend for the enclosed block.
+
+    '''
+
+    previous = set_backend(backend)
+    try:
+        yield backend
+    finally:
+        set_backend(previous)
+
+
+# =============================================================================
+# In-memory fake
+# =============================================================================
+
+SHAPE_TYPES = ('locator', 'distanceDimShape', 'mesh')
+
+# attributes of a new display layer
+DISPLAY_LAYER_ATTRS = {'color': 0, 'visibility': True, 'displayType': 0}
+
+# values getAttr returns for attributes that were never set
+DEFAULT_ATTRS = {
+    'translate': (0.0, 0.0, 0.0),
+    'localPosition': (0.0, 0.0, 0.0),
+    'overrideEnabled': False,
+    'overrideColor': 0,
+    'visibility': True,
+}
+
+
+def _recorded(func):
+    '''Records the call count and time of a FakeCmds operation.
+
+    '''
+
+    op_name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        start = _clock()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            stat = self.stats.setdefault(op_name, [0, 0.0])
+            stat[0] += 1
+            stat[1] += _clock() - start
+
+    return wrapper
+
+
+class FakeNode(object):
+    '''A node of the in-memory scene.
+
+    '''
+
+    __slots__ = ('name', 'node_type', 'parent', 'children', 'attrs',
+                 'connected')
+
+    def __init__(self, name, node_type, parent=None):
+        self.name = name
+        self.node_type = node_type
+        self.parent = parent
+        self.children = []
+        self.attrs = {}
+        # destination plugs of the connections this node takes part in
+        self.connected = set()
+
+
+class FakeCmds(object):
+    '''In-memory stand-in for the subset of maya.cmds core uses.
+
+    Node short names are unique across the fake scene. Errors are raised
+    with the same exception types maya.cmds uses.
+
+    Keyword Arguments:
+        linear_unit {str} -- Scene's linear unit (default: {'cm'})
+        up_axis {str} -- Scene's up axis (default: {'y'})
+    '''
+
+    def __init__(self, linear_unit='cm', up_axis='y'):
+        self.linear_unit = linear_unit
+        self.up_axis = up_axis
+        self.nodes = {}
+        # destination plug -> source plug
+        self.connections = {}
+        self.undo_depth = 0
+        self.selection = []
+        self.stats = {}
+
+    # -- recording -----------------------------------------------------------
+
+    def operation_count(self):
+        '''Returns the number of recorded operations.
+
+        '''
+
+        return sum(count for count, _ in self.stats.values())
+
+    def reset_stats(self):
+        '''Clears the recorded operation counts and timings.
+
+        '''
+
+        self.stats = {}
+
+    # -- helpers -------------------------------------------------------------
+
+    def _node(self, name):
+        node = self.nodes.get(str(name).split('|')[-1])
+        if node is None:
+            raise ValueError('No object matches name: ' + str(name))
+        return node
+
+    def _split_plug(self, plug):
+        node_name, _, attr = str(plug).partition('.')
+        return self._node(node_name), attr
+
+    def _unique_name(self, name):
+        if name not in self.nodes:
+            return name
+
+        base = name.rstrip('0123456789')
+        digits = name[len(base):]
+        number = int(digits) + 1 if digits else 1
+        while base + str(number) in self.nodes:
+            number += 1
+        return base + str(number)
+
+    def _add_node(self, name, node_type, parent=None):
+        node = FakeNode(self._unique_name(name), node_type, parent)
+        self.nodes[node.name] = node
+        if parent is not None:
+            parent.children.append(node)
+        return node
+
+    def _path(self, node):
+        path = []
+        while node is not None:
+            path.append(node.name)
+            node = node.parent
+        return '|' + '|'.join(reversed(path))
+
+    def _descendants(self, node):
+        for child in node.children:
+            yield child
+            for descendant in self._descendants(child):
+                yield descendant
+
+    def _world_position(self, node):
+        position = list(node.attrs.get('localPosition', (0.0, 0.0, 0.0)))
+        while node is not None:
+            translate = node.attrs.get('translate', (0.0, 0.0, 0.0))
+            position = [a + b for a, b in zip(position, translate)]
+            node = node.parent
+        return tuple(position)
+
+    def _link(self, dst, src):
+        self.connections[dst] = src
+        self._split_plug(dst)[0].connected.add(dst)
+        self._split_plug(src)[0].connected.add(dst)
+
+    def _unlink(self, dst, src):
+        del self.connections[dst]
+        self._split_plug(dst)[0].connected.discard(dst)
+        self._split_plug(src)[0].connected.discard(dst)
+
+    def _input_node(self, plug):
+        source = self.connections.get(plug)
+        if source is None:
+            return None
+        return self._node(source.partition('.')[0])
+
+    # -- scene queries -------------------------------------------------------
+
+    @_recorded
+    def currentUnit(self, query=False, linear=None, **kwargs):
+        if query:
+            return self.linear_unit
+        if linear is not None:
+            self.linear_unit = linear
+
+    @_recorded
+    def upAxis(self, q=False, axis=None, **kwargs):
+        if q:
+            return self.up_axis
+        if axis is not None:
+            self.up_axis = axis
+
+    @_recorded
+    def objExists(self, name):
+        node_name, _, attr = str(name).partition('.')
+        node = self.nodes.get(node_name.split('|')[-1])
+        if node is None:
+            return False
+        return not attr or attr.split('[')[0] in node.attrs
+
+    @_recorded
+    def ls(self, *patterns, **kwargs):
+        node_type = kwargs.get('type')
+        long_names = kwargs.get('long', kwargs.get('l', False))
+
+        # ls(nodes) and ls(selection=True) restrict the candidates
+        candidates = self.nodes.values()
+        if kwargs.get('selection', kwargs.get('sl', False)):
+            candidates = [self.nodes[name] for name in self.selection]
+            patterns = ()
+        elif patterns and isinstance(patterns[0], (list, tuple)):
+            candidates = [self._node(name) for name in patterns[0]]
+            patterns = ()
+        if kwargs.get('dag', False) and \
+                candidates is not self.nodes.values():
+            candidates = [
+                found for node in candidates
+                for found in [node] + list(self._descendants(node))]
+
+        names = []
+        for node in candidates:
+            if node_type and node.node_type != node_type:
+                continue
+            if patterns and not any(
+                    fnmatch.fnmatchcase(node.name, str(pattern))
+                    for pattern in patterns):
+                continue
+            names.append(self._path(node) if long_names else node.name)
+        return names
+
+    @_recorded
+    def listRelatives(self, name, **kwargs):
+        node = self._node(name)
+        node_type = kwargs.get('type')
+        full_path = kwargs.get('fullPath', kwargs.get('f', False))
+
+        if kwargs.get('parent', kwargs.get('p', False)):
+            relatives = [node.parent] if node.parent else []
+        elif kwargs.get('allDescendents', kwargs.get('ad', False)):
+            relatives = list(self._descendants(node))
+        else:
+            relatives = list(node.children)
+
+        if kwargs.get('shapes', kwargs.get('s', False)):
+            relatives = [relative for relative in relatives
+                         if relative.node_type in SHAPE_TYPES]
+        if node_type:
+            relatives = [relative for relative in relatives
+                         if relative.node_type == node_type]
+
+        if not relatives:
+            return None
+        return [self._path(relative) if full_path else relative.name
+                for relative in relatives]
+
+    @_recorded
+    def nodeType(self, name):
+        return self._node(name).node_type
+
+    @_recorded
+    def getAttr(self, plug, **kwargs):
+        node, attr = self._split_plug(plug)
+        attr_name = attr.split('[')[0]
+
+        if attr_name == 'worldPosition':
+            return [self._world_position(node)]
+        if attr_name == 'distance' and node.node_type == 'distanceDimShape':
+            start = self._input_node(node.name + '.startPoint')
+            end = self._input_node(node.name + '.endPoint')
+            if start is None or end is None:
+                return 0.0
+            return math.sqrt(sum(
+                (a - b) ** 2 for a, b in zip(
+                    self._world_position(start), self._world_position(end))))
+
+        if attr_name in node.attrs:
+            value = node.attrs[attr_name]
+        elif attr_name in DEFAULT_ATTRS:
+            value = DEFAULT_ATTRS[attr_name]
+        else:
+            raise ValueError('No object matches name: ' + str(plug))
+
+        if isinstance(value, tuple):
+            return [value]
+        return value
+
+    @_recorded
+    def worldBoundingBoxes(self, nodes):
+        bounds = []
+        for name in nodes:
+            node = self._node(name)
+            shapes = [node] if node.node_type == 'mesh' else [
+                shape for shape in self._descendants(node)
+                if shape.node_type == 'mesh']
+            if not shapes:
+                bounds.append((0.0,) * 6)
+                continue
+
+            corners = []
+            for shape in shapes:
+                offset = self._world_position(shape)
+                corners.append([a + b for a, b in zip(
+                    shape.attrs.get('boundingBoxMin', (0.0, 0.0, 0.0)),
+                    offset)])
+                corners.append([a + b for a, b in zip(
+                    shape.attrs.get('boundingBoxMax', (0.0, 0.0, 0.0)),
+                    offset)])
+            bounds.append(
+                tuple(min(axis) for axis in zip(*corners)) +
+                tuple(max(axis) for axis in zip(*corners)))
+        return bounds
+
+    @_recorded
+    def worldPositions(self, nodes):
+        return [self._world_position(self._node(name)) for name in nodes]
+
+    @_recorded
+    def stringAttrValues(self, pattern, attr):
+        return [(node.name, node.attrs.get(attr))
+                for node in self.nodes.values()
+                if node.node_type == 'transform' and
+                fnmatch.fnmatchcase(node.name, pattern)]
+
+    # -- scene edits ---------------------------------------------------------
+
+    @_recorded
+    def addAttr(self, name, longName=None, **kwargs):
+        node = self._node(name)
+        attr_name = kwargs.get('ln', longName)
+        if attr_name in node.attrs:
+            raise RuntimeError(
+                'Found a duplicate attribute name: ' + str(attr_name))
+        node.attrs[attr_name] = None
+
+    @_recorded
+    def select(self, *names, **kwargs):
+        if kwargs.get('clear', kwargs.get('cl', False)):
+            self.selection = []
+            return
+
+        selected = []
+        for name in names:
+            for item in (name if isinstance(name, (list, tuple))
+                         else [name]):
+                selected.append(self._node(item).name)
+
+        if kwargs.get('add', False):
+            self.selection.extend(
+                name for name in selected if name not in self.selection)
+        else:
+            self.selection = selected
+
+    @_recorded
+    def setColorOverrides(self, colors):
+        for color_index, nodes in colors.items():
+            for name in nodes:
+                node = self._node(name)
+                node.attrs['overrideEnabled'] = True
+                node.attrs['overrideColor'] = color_index
+
+    @_recorded
+    def createDisplayLayer(self, *names, **kwargs):
+        layer = self._add_node(
+            kwargs.get('name', kwargs.get('n')) or 'layer1', 'displayLayer')
+        layer.attrs.update(DISPLAY_LAYER_ATTRS)
+
+        if not kwargs.get('empty', kwargs.get('e', False)):
+            self._add_layer_members(
+                layer, names[0] if names else self.selection)
+        return layer.name
+
+    @_recorded
+    def editDisplayLayerMembers(self, layer_name, *names, **kwargs):
+        members = []
+        for name in names:
+            members.extend(
+                name if isinstance(name, (list, tuple)) else [name])
+        return self._add_layer_members(self._node(layer_name), members)
+
+    def _add_layer_members(self, layer, members):
+        # membership is a drawInfo -> drawOverride connection, like in Maya
+        for name in members:
+            plug = self._node(name).name + '.drawOverride'
+            if plug in self.connections:
+                self._unlink(plug, self.connections[plug])
+            self._link(plug, layer.name + '.drawInfo')
+        return len(members)
+
+    @_recorded
+    def undoInfo(self, openChunk=False, closeChunk=False, **kwargs):
+        if openChunk:
+            self.undo_depth += 1
+        elif closeChunk:
+            self.undo_depth -= 1
+
+    @_recorded
+    def refresh(self, **kwargs):
+        pass
+
+    @_recorded
+    def createNode(self, node_type, n=None, p=None, **kwargs):
+        node_name = kwargs.get('name', n) or node_type + '1'
+        parent_name = kwargs.get('parent', p)
+        parent = self._node(parent_name) if parent_name else None
+
+        if node_type in SHAPE_TYPES and parent is None:
+            parent = self._add_node(
+                node_type.replace('Shape', '') + '1', 'transform')
+
+        return self._add_node(node_name, node_type, parent).name
+
+    @_recorded
+    def duplicate(self, name, n=None, inputConnections=False, **kwargs):
+        source = self._node(name)
+        node_name = kwargs.get('name', n) or source.name
+
+        # original node -> copy. Connections between copied nodes are
+        # remapped to the copies, like Maya does.
+        copies = {}
+        root = self._add_node(node_name, source.node_type, source.parent)
+        copies[source.name] = root
+        stack = [(source, root)]
+        while stack:
+            original, copy = stack.pop()
+            copy.attrs = dict(original.attrs)
+            for child in original.children:
+                child_copy = self._add_node(child.name, child.node_type, copy)
+                copies[child.name] = child_copy
+                stack.append((child, child_copy))
+
+        for original_name in copies:
+            for dst in list(self.nodes[original_name].connected):
+                src = self.connections[dst]
+                dst_node, _, dst_attr = dst.partition('.')
+                src_node, _, src_attr = src.partition('.')
+                if dst_node not in copies:
+                    continue
+                if src_node in copies:
+                    src = copies[src_node].name + '.' + src_attr
+                elif not inputConnections:
+                    continue
+                self._link(copies[dst_node].name + '.' + dst_attr, src)
+
+        if kwargs.get('returnRootsOnly', kwargs.get('rr', False)):
+            return [root.name]
+        return [copy.name for copy in copies.values()]
+
+    @_recorded
+    def rename(self, old_name, new_name):
+        node = self._node(old_name)
+        links = [(dst, self.connections[dst]) for dst in node.connected]
+        for dst, src in links:
+            self._unlink(dst, src)
+
+        prefix = node.name + '.'
+        del self.nodes[node.name]
+        node.name = self._unique_name(new_name)
+        self.nodes[node.name] = node
+
+        for dst, src in links:
+            if dst.startswith(prefix):
+                dst = node.name + '.' + dst[len(prefix):]
+            if src.startswith(prefix):
+                src = node.name + '.' + src[len(prefix):]
+            self._link(dst, src)
+        return node.name
+
+    @_recorded
+    def setAttr(self, plug, *values, **kwargs):
+        node, attr = self._split_plug(plug)
+        attr_name = attr.split('[')[0]
+
+        if len(values) == 1:
+            value = values[0]
+        else:
+            value = tuple(values)
+        node.attrs[attr_name] = value
+
+    @_recorded
+    def connectAttr(self, source, destination, force=False, **kwargs):
+        self._split_plug(source)
+        self._split_plug(destination)
+
+        if destination in self.connections:
+            if not force:
+                raise RuntimeError(
+                    str(destination) + ' already has an incoming connection')
+            self._unlink(destination, self.connections[destination])
+        self._link(destination, source)
+
+    @_recorded
+    def disconnectAttr(self, source, destination):
+        if self.connections.get(destination) != source:
+            raise RuntimeError(
+                'No connection from ' + str(source) + ' to ' +
+                str(destination))
+        self._unlink(destination, source)
+
+    @_recorded
+    def delete(self, *names, **kwargs):
+        if not names:
+            raise ValueError('No objects were specified to delete')
+
+        doomed = set()
+        for name in names:
+            for item in (name if isinstance(name, (list, tuple))
+                         else [name]):
+                node = self._node(item)
+                doomed.add(node.name)
+                doomed.update(
+                    descendant.name
+                    for descendant in self._descendants(node))
+
+        for node_name in doomed:
+            node = self.nodes[node_name]
+            for dst in list(node.connected):
+                self._unlink(dst, self.connections[dst])
+
+        for node_name in doomed:
+            node = self.nodes.pop(node_name)
+            if node.parent is not None and node.parent.name not in doomed:
+                node.parent.children.remove(node)
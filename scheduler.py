@@ -0,0 +1,218 @@
+'''Builds long batches of references a chunk at a time.
+
+A ChunkedBuild does a small amount of work per step() call, so the caller
+can hand control back to Maya between chunks and keep the UI responsive.
+The window drives it with a Qt timer, scripts can use run_deferred().
+
+Every chunk is one core.create_dimension_grps call, which only ever builds
+whole references. Cancelling between chunks therefore leaves whole
+references only, and can remove them again with one delete. The scene's
+node names and reference prefixes are indexed once for the whole batch
+and shared by its chunks, so a chunk never rescans the scene.
+'''
+
+import itertools
+
+import core
+import manifest
+import naming
+import registry
+from scene import _clock
+
+# chunk sizes are adapted to take about this long, in seconds
+DEFAULT_TARGET_SECONDS = 0.05
+
+DEFAULT_CHUNK_SIZE = 50
+MAX_CHUNK_SIZE = 2000
+
+
+class ChunkedBuild(object):
+    '''A batch of reference specs built a chunk at a time.
+
+    Arguments:
+        specs {iterable} -- Specs, see core.create_dimension_grps. They are
+            consumed lazily, so a generator is never materialized.
+
+    Keyword Arguments:
+        total {int} -- Number of specs, None uses len(specs) when it has
+            one (default: {None})
+        backend {str} -- See core.create_dimension_grps
+            (default: {'cmds'})
+        target_seconds {float} -- Time each chunk should take, the chunk
+            size is adapted to the measured throughput
+            (default: {DEFAULT_TARGET_SECONDS})
+    '''
+
+    def __init__(self, specs, total=None, backend='cmds',
+                 target_seconds=DEFAULT_TARGET_SECONDS):
+        if total is None and hasattr(specs, '__len__'):
+            total = len(specs)
+
+        self.total = total
+        self.backend = backend
+        self.target_seconds = target_seconds
+        self.chunk_size = DEFAULT_CHUNK_SIZE
+
+        # prefixes of the references built so far
+        self.created = []
+        # (prefix or line, message) of the specs that failed
+        self.errors = []
+        self.processed = 0
+        self.cancelled = False
+        self.finished = False
+
+        self._specs = iter(specs)
+        self._start = None
+        self._build_seconds = 0.0
+        # scene index shared by every chunk, built with the first one
+        self._allocator = None
+        self._existing_prefixes = None
+
+    @classmethod
+    def from_manifest(cls, path, backend='cmds', **kwargs):
+        '''Returns a build streaming the specs of a CSV or JSON manifest.
+
+        Invalid rows are reported in errors by line number.
+        '''
+
+        # rows are streamed, the total is unknown unless given
+        build = cls(iter(()), backend=backend, **kwargs)
+
+        def specs():
+            for row in manifest.iter_rows(path):
+                if row.error:
+                    build.errors.append((row.line, row.error))
+                    build.processed += 1
+                else:
+                    yield row.spec
+
+        build._specs = specs()
+        return build
+
+    @property
+    def elapsed(self):
+        '''Seconds since the first chunk started.
+
+        '''
+
+        return 0.0 if self._start is None else _clock() - self._start
+
+    @property
+    def refs_per_second(self):
+        '''Throughput of the chunks built so far.
+
+        '''
+
+        if not self._build_seconds:
+            return 0.0
+        return len(self.created) / self._build_seconds
+
+    @property
+    def progress(self):
+        '''Fraction of the specs processed, None when the total is unknown.
+
+        '''
+
+        if not self.total:
+            return 1.0 if self.finished else None
+        return min(1.0, self.processed / float(self.total))
+
+    def step(self):
+        '''Builds the next chunk of references.
+
+        Returns:
+            bool -- True while there is more to build.
+        '''
+
+        if self.finished:
+            return False
+        if self._start is None:
+            self._start = _clock()
+
+        chunk = list(itertools.islice(self._specs, self.chunk_size))
+        if not chunk:
+            self.finished = True
+            return False
+
+        start = _clock()
+        if self._allocator is None:
+            self._allocator = naming.NameAllocator()
+            self._existing_prefixes = set(registry.existing_prefixes())
+        results = core.create_dimension_grps(
+            chunk, backend=self.backend, allocator=self._allocator,
+            existing_prefixes=self._existing_prefixes)
+        seconds = _clock() - start
+        self._build_seconds += seconds
+
+        for result in results:
+            if result.error:
+                self.errors.append((result.prefix, result.error))
+            else:
+                self.created.append(result.prefix)
+        self.processed += len(chunk)
+
+        # size the next chunk to take about target_seconds
+        if seconds > 0.0:
+            self.chunk_size = max(1, min(MAX_CHUNK_SIZE, int(
+                len(chunk) * self.target_seconds / seconds)))
+
+        return True
+
+    def run(self):
+        '''Builds every remaining chunk without yielding.
+
+        '''
+
+        while self.step():
+            pass
+
+    def cancel(self, rollback=False):
+        '''Stops the build before its next chunk.
+
+        Keyword Arguments:
+            rollback {bool} -- Delete the references built so far, with a
+                single delete command (default: {False})
+
+        Returns:
+            list -- Prefixes of the references that were removed.
+        '''
+
+        self.cancelled = True
+        self.finished = True
+
+        removed = []
+        if rollback and self.created:
+            removed = core.delete_ref_grps(names=self.created)
+            self.created = []
+        return removed
+
+
+def run_deferred(build, on_progress=None, on_finished=None):
+    '''Builds one chunk per Maya idle cycle with maya.utils.executeDeferred.
+
+    Arguments:
+        build {ChunkedBuild} -- Build to drive.
+
+    Keyword Arguments:
+        on_progress {callable} -- Called with build after every chunk
+            (default: {None})
+        on_finished {callable} -- Called with build once it finished or
+            was cancelled (default: {None})
+    '''
+
+    from maya import utils
+
+    def tick():
+        if build.cancelled:
+            more = False
+        else:
+            more = build.step()
+            if on_progress is not None:
+                on_progress(build)
+
+        if more:
+            utils.executeDeferred(tick)
+        elif on_finished is not None:
+            on_finished(build)
+
+    utils.executeDeferred(tick)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the modules import each other as top level modules, like in Maya's
+# scripts folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,69 @@
+import unittest
+
+import audit
+import core
+import scene
+
+
+@unittest.skipIf(audit.numpy is None, 'audit needs NumPy')
+class AuditScaleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+        core.create_dimension_grps([
+            ('chair', 2, 4, 3, None, (0, 0, 0)),
+            ('house', 20, 40, 30, None, (100, 0, 0))])
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+
+    def add_mesh(self, name, center, size, parent=None):
+        transform = self.cmds.createNode('transform', n=name, p=parent)
+        self.cmds.setAttr(transform + '.translate', *center)
+        shape = self.cmds.createNode('mesh', n=name + 'Shape', p=transform)
+        self.cmds.setAttr(
+            shape + '.boundingBoxMin', *[-value / 2.0 for value in size])
+        self.cmds.setAttr(
+            shape + '.boundingBoxMax', *[value / 2.0 for value in size])
+        return transform
+
+    def test_nearest_reference(self):
+        self.add_mesh('chair1', (1, 0, 0), (2, 3, 4))
+        self.add_mesh('chair2', (0, 0, 1), (8, 3, 4))
+        self.add_mesh('house1', (90, 0, 0), (20, 30, 40))
+
+        results = audit.audit_scale(tolerance=0.1)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].mesh, '|chair2')
+        self.assertEqual(results[0].reference, 'chair')
+        self.assertEqual(results[0].dimensions, (8.0, 4.0, 3.0))
+        self.assertEqual(results[0].expected, (2.0, 4.0, 3.0))
+        self.assertAlmostEqual(results[0].ratio, 4.0)
+
+    def test_assignments_by_full_path(self):
+        self.cmds.createNode('transform', n='room1')
+        self.cmds.createNode('transform', n='room2')
+        self.add_mesh('seat', (0, 0, 0), (2, 3, 4), parent='room1')
+        # the fake scene keeps short names unique
+        seat = self.add_mesh('seat', (0, 0, 0), (2, 3, 4), parent='room2')
+
+        results = audit.audit_scale(
+            assignments={'|room2|' + seat: 'house'}, outliers_only=False)
+        self.assertEqual(
+            sorted((result.mesh, result.reference) for result in results),
+            [('|room1|seat', 'chair'), ('|room2|' + seat, 'house')])
+        self.assertRaises(ValueError, audit.audit_scale,
+                          assignments={'|room1|seat': 'missing'})
+
+    def test_any_orientation(self):
+        self.add_mesh('lying', (0, 0, 0), (3, 2, 4))
+
+        self.assertEqual(len(audit.audit_scale(tolerance=0.1)), 1)
+        self.assertEqual(
+            audit.audit_scale(tolerance=0.1, any_orientation=True), [])
+
+    def test_format_audit(self):
+        self.add_mesh('chair2', (0, 0, 1), (8, 3, 4))
+        text = audit.format_audit(audit.audit_scale(), limit=0)
+        self.assertIn('1 more', text)
@@ -0,0 +1,60 @@
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+import batch
+
+
+@unittest.skipIf(os.name == 'nt', 'stub mayapy is a POSIX script')
+class RunBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def stub_mayapy(self, output, code=0):
+        path = os.path.join(self.directory, 'mayapy')
+        with open(path, 'w') as stub:
+            stub.write('#!' + sys.executable + '\n'
+                       'import sys\n'
+                       'out = getattr(sys.stdout, "buffer", sys.stdout)\n'
+                       'out.write(' + repr(output) + ')\n'
+                       'sys.exit(' + str(code) + ')\n')
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def run_jobs(self, mayapy, jobs):
+        log_path = os.path.join(self.directory, 'log.jsonl')
+        counts = batch.run_batch(jobs, log_path, mayapy=mayapy, workers=2,
+                                 retries=0)
+        with open(log_path) as log_file:
+            return counts, [json.loads(line) for line in log_file]
+
+    def test_worker_result(self):
+        mayapy = self.stub_mayapy(
+            b'noise\n' + batch.RESULT_MARKER.encode('utf-8') +
+            b'{"status": "ok", "created": 2}\n')
+        counts, results = self.run_jobs(mayapy, [{'scene': 'a.ma'}])
+        self.assertEqual(counts, {'ok': 1})
+        self.assertEqual(results[0]['created'], 2)
+
+    def test_undecodable_output_fails_one_scene(self):
+        mayapy = self.stub_mayapy(b'\xff\xfe\n', code=1)
+        counts, results = self.run_jobs(
+            mayapy, [{'scene': 'a.ma'}, {'scene': 'b.ma'}])
+        self.assertEqual(counts, {'failed': 2})
+        self.assertEqual(sorted(result['scene'] for result in results),
+                         ['a.ma', 'b.ma'])
+
+    def test_unreadable_result_fails_one_scene(self):
+        mayapy = self.stub_mayapy(
+            batch.RESULT_MARKER.encode('utf-8') + b'{\xff\n')
+        counts, results = self.run_jobs(mayapy, [{'scene': 'a.ma'}])
+        self.assertEqual(counts, {'failed': 1})
+        self.assertIn('unreadable worker result', results[0]['errors'][0])
@@ -0,0 +1,264 @@
+import unittest
+
+import core
+import scene
+import validation
+
+
+class FakeSceneTest(unittest.TestCase):
+
+    linear_unit = 'cm'
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds(linear_unit=self.linear_unit)
+        self.previous = scene.set_backend(self.cmds)
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+
+
+class CreateDimensionGrpsTest(FakeSceneTest):
+
+    def test_builds_every_reference(self):
+        results = core.create_dimension_grps([
+            ('box', 10, 20, 30, None), ('door', 2, 1, 0.5, 'm')])
+
+        self.assertEqual(results, [
+            core.BuildResult('box', 'box_refDistance_grp', None),
+            core.BuildResult('door', 'door_refDistance_grp', None)])
+        self.assertTrue(core.check_ref_grp_exists('box'))
+        self.assertEqual(self.cmds.undo_depth, 0)
+
+    def test_distances(self):
+        core.create_dimension_grps([
+            ('box', 10, 20, 30, None), ('door', 2, 1, 0.5, 'm')])
+
+        for prefix, expected in (
+                ('box', (10.0, 20.0, 30.0)),
+                ('door', (200.0, 100.0, 50.0))):
+            for distance, value in zip(core.get_dimension_distances(
+                    prefix + '_refDistance_grp'), expected):
+                self.assertAlmostEqual(distance, value)
+
+    def test_metadata(self):
+        core.create_dimension_grps([('door', 2, 1, 0.5, 'm')])
+
+        entry = core.read_ref_grp('door')
+        self.assertEqual(entry.unit, 'm')
+        self.assertEqual(entry.dimensions, (200.0, 100.0, 50.0))
+
+    def test_failed_specs_are_reported(self):
+        core.create_dimension_grps([('box', 10, 20, 30, None)])
+        results = core.create_dimension_grps([
+            ('box', 10, 20, 30, None), ('ok', 1, 1, 1, None)])
+
+        self.assertIsNone(results[0].group)
+        self.assertIn('already exists', results[0].error)
+        self.assertEqual(results[1].group, 'ok_refDistance_grp')
+
+    def test_backends_match(self):
+        for backend in ('cmds', 'template'):
+            prefix = 'ref_' + backend
+            core.create_dimension_grps(
+                [(prefix, 4, 5, 6, None, (1, 2, 3))], backend=backend)
+            self.assertEqual(
+                core.get_dimension_distances(prefix + '_refDistance_grp'),
+                (4.0, 5.0, 6.0))
+            self.assertEqual(
+                self.cmds.worldPositions([prefix + '_refDistance_grp']),
+                [(1.0, 2.0, 3.0)])
+
+
+class TemplateBackendTest(unittest.TestCase):
+
+    specs = [('box', 10, 20, 30, None, (1, 2, 3)), ('door', 2, 1, 0.5, 'm'),
+             ('box', 1, 1, 1, None)]
+
+    def build(self, backend, **kwargs):
+        cmds = scene.FakeCmds()
+        previous = scene.set_backend(cmds)
+        try:
+            results = core.create_dimension_grps(
+                self.specs, backend=backend, **kwargs)
+        finally:
+            scene.set_backend(previous)
+
+        nodes = dict(
+            (cmds._path(node), (node.node_type, node.attrs))
+            for node in cmds.nodes.values())
+        return results, nodes, cmds.connections
+
+    def test_matches_the_cmds_backend(self):
+        self.assertEqual(self.build('template'), self.build('cmds'))
+
+    def test_matches_with_display_layers(self):
+        self.assertEqual(self.build('template', display_layers=True),
+                         self.build('cmds', display_layers=True))
+
+    def test_template_is_removed(self):
+        _, nodes, _ = self.build('template')
+        self.assertFalse([path for path in nodes
+                          if core.TEMPLATE_PREFIX in path])
+
+
+class FittedSpecsTest(FakeSceneTest):
+
+    def test_fits_mesh_bounds(self):
+        self.cmds.createNode('transform', n='crate')
+        self.cmds.setAttr('crate.translate', 10, 0, 0)
+        shape = self.cmds.createNode('mesh', n='crateShape', p='crate')
+        self.cmds.setAttr(shape + '.boundingBoxMin', -1, 0, -2)
+        self.cmds.setAttr(shape + '.boundingBoxMax', 1, 3, 2)
+
+        self.assertEqual(core.get_fitted_specs(['crate']), [
+            ('crate', 2.0, 4.0, 3.0, None, (10.0, 1.5, 0.0))])
+
+    def test_prefixes_are_unique(self):
+        self.assertEqual(core.fitted_prefixes([
+            '|room1|chair', '|room2|chair', '|set:table']),
+            ['room1_chair', 'room2_chair', 'set_table'])
+
+
+class MetreSceneTest(FakeSceneTest):
+
+    linear_unit = 'm'
+
+    def test_converts_to_scene_units(self):
+        core.create_dimension_grps([('door', 200, 100, 50, 'cm')])
+
+        for distance, value in zip(
+                core.get_dimension_distances('door_refDistance_grp'),
+                (2.0, 1.0, 0.5)):
+            self.assertAlmostEqual(distance, value)
+
+    def test_read_ref_grp_after_unit_change(self):
+        core.create_dimension_grps([('door', 200, 100, 50, 'cm')])
+        self.cmds.currentUnit(linear='cm')
+
+        entry = core.read_ref_grp('door')
+        self.assertEqual(entry.unit, 'cm')
+        for value, expected in zip(entry.dimensions, (200.0, 100.0, 50.0)):
+            self.assertAlmostEqual(value, expected)
+
+
+class ValidationTest(FakeSceneTest):
+
+    def codes(self, specs, min_size=None):
+        return [(error.index, error.code) for error in
+                validation.validate_specs(specs, 'cm', min_size)]
+
+    def test_valid_specs(self):
+        self.assertEqual(self.codes([('a', 1, 2, 3, 'm')]), [])
+
+    def test_error_codes(self):
+        self.assertEqual(self.codes([
+            ('', 1, 1, 1, None),
+            ('a', 'x', 1, 1, None),
+            ('b', 1, 1, 1, 'parsec'),
+            ('c', 0, 1, 1, None),
+            ('d', 1, 1, 1, 'mm'),
+            ('d', 5, 5, 5, None),
+        ], min_size=0.5), [
+            (0, validation.EMPTY_PREFIX),
+            (1, validation.INVALID_NUMBER),
+            (2, validation.UNKNOWN_UNIT),
+            (3, validation.NON_POSITIVE),
+            (4, validation.TOO_SMALL),
+            (5, validation.DUPLICATE_PREFIX),
+        ])
+
+    def test_malformed_specs(self):
+        self.assertEqual(self.codes([
+            ('q', 1, 2),
+            None,
+            'abcde',
+            ('q', 1, 2, 3, None),
+            (),
+        ]), [
+            (0, validation.MALFORMED),
+            (1, validation.MALFORMED),
+            (2, validation.MALFORMED),
+            (4, validation.MALFORMED),
+        ])
+
+    def test_malformed_specs_are_not_built(self):
+        results = core.create_dimension_grps(
+            [('q', 1, 2), ('ok', 1, 1, 1, None), 7])
+
+        self.assertEqual(results[0].prefix, 'q')
+        self.assertIn('expected (prefix', results[0].error)
+        self.assertEqual(results[1].group, 'ok_refDistance_grp')
+        self.assertIsNotNone(results[2].error)
+
+    def test_exists(self):
+        core.create_dimension_grps([('a', 1, 1, 1, None)])
+        self.assertEqual(
+            self.codes([('a', 1, 1, 1, None)]), [(0, validation.EXISTS)])
+        self.assertEqual(validation.validate_specs(
+            [('a', 1, 1, 1, None)], 'cm', check_scene=False), [])
+
+
+class DeleteRefGrpsTest(FakeSceneTest):
+
+    def setUp(self):
+        super(DeleteRefGrpsTest, self).setUp()
+        core.create_dimension_grps([
+            (prefix, 1, 1, 1, None)
+            for prefix in ('shot010_a', 'shot010_b', 'shot020_a', 'prop')])
+
+    def test_find(self):
+        self.assertEqual(core.find_ref_grps(pattern='shot010_*'),
+                         ['shot010_a', 'shot010_b'])
+        self.assertEqual(core.find_ref_grps(regex=r'shot\d+_a'),
+                         ['shot010_a', 'shot020_a'])
+        self.assertEqual(core.find_ref_grps(regex='shot'), [])
+        self.assertEqual(core.find_ref_grps(names=['prop', 'missing']),
+                         ['prop'])
+
+    def test_delete_with_one_command(self):
+        self.cmds.reset_stats()
+        self.assertEqual(
+            core.delete_ref_grps(names=['prop'], pattern='*_a'),
+            ['prop', 'shot010_a', 'shot020_a'])
+
+        self.assertEqual(self.cmds.stats['delete'][0], 1)
+        self.assertEqual(core.find_ref_grps(pattern='*'), ['shot010_b'])
+
+    def test_dry_run(self):
+        self.assertEqual(core.delete_ref_grps(pattern='*', dry_run=True),
+                         ['prop', 'shot010_a', 'shot010_b', 'shot020_a'])
+        self.assertTrue(core.check_ref_grp_exists('prop'))
+
+
+class DisplayTest(FakeSceneTest):
+
+    specs = [('box', 1, 2, 3, None), ('door', 2, 1, 0.5, None)]
+
+    def test_colors_in_one_command(self):
+        self.cmds.reset_stats()
+        core.create_dimension_grps(self.specs)
+
+        self.assertEqual(self.cmds.stats['setColorOverrides'][0], 1)
+        for dimen, color_index in core.DIMENSION_COLORS:
+            self.assertEqual(self.cmds.getAttr(
+                'door_dist' + dimen + '_01.overrideColor'), color_index)
+            self.assertNotIn('overrideColor', self.cmds._node(
+                'door_' + dimen + 'Dist_grp').attrs)
+
+    def test_display_layers(self):
+        core.create_dimension_grps(self.specs, display_layers=True)
+        core.create_dimension_grps(
+            [('crate', 1, 1, 1, None)], display_layers=True)
+
+        self.assertEqual(sorted(self.cmds.ls(type='displayLayer')), [
+            core.DISPLAY_LAYER_FORMAT.format(dimen)
+            for dimen in ('height', 'length', 'width')])
+        for prefix in ('box', 'crate'):
+            self.assertEqual(
+                self.cmds.connections[
+                    prefix + '_widthDist_grp.drawOverride'],
+                'scaleReference_width_layer.drawInfo')
+        self.assertEqual(self.cmds.getAttr(
+            'scaleReference_length_layer.color'), 13)
+        self.assertNotIn('overrideColor',
+                         self.cmds._node('box_distlength_01').attrs)
@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import core
+import manifest
+import scene
+
+
+class ManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.read_size = manifest.JSON_READ_SIZE
+
+    def tearDown(self):
+        manifest.JSON_READ_SIZE = self.read_size
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as manifest_file:
+            manifest_file.write(text)
+        return path
+
+    def rows(self, name, text):
+        return list(manifest.iter_rows(self.write(name, text)))
+
+    def test_parse_spec(self):
+        self.assertEqual(
+            manifest.parse_spec(['box', '1', 2, 3.5, 'm']),
+            ('box', 1.0, 2.0, 3.5, 'm'))
+        self.assertEqual(
+            manifest.parse_spec({'prefix': 'box', 'length': 1, 'width': 2,
+                                 'height': 3, 'position': [4, 5, 6]}),
+            ('box', 1.0, 2.0, 3.0, None, (4.0, 5.0, 6.0)))
+        self.assertRaises(ValueError, manifest.parse_spec, ['', 1, 2, 3])
+        self.assertRaises(ValueError, manifest.parse_spec, ['a', 1, 2])
+        self.assertRaises(ValueError, manifest.parse_spec, 'box')
+
+    def test_csv(self):
+        rows = self.rows('refs.csv', 'box,1,2,3,m,4,5,6\n'
+                                     '\n'
+                                     'door,2,x,3\n')
+        self.assertEqual(rows, [
+            manifest.ManifestRow(
+                1, ('box', 1.0, 2.0, 3.0, 'm', (4.0, 5.0, 6.0)), None),
+            manifest.ManifestRow(3, None, "invalid width: 'x'")])
+
+    def test_json_lines(self):
+        rows = self.rows('refs.jsonl', '["box", 1, 2, 3]\n'
+                                       '{"prefix": "door", "length": }\n')
+        self.assertEqual(rows[0].spec, ('box', 1.0, 2.0, 3.0, None))
+        self.assertEqual(rows[1].line, 2)
+        self.assertEqual(rows[1].error, 'Expecting value')
+
+    def test_json_items_span_reads(self):
+        manifest.JSON_READ_SIZE = 7
+        items = [{'prefix': 'ref%d' % index, 'length': index + 1,
+                  'width': 2, 'height': 3, 'position': [1, 2, 3]}
+                 for index in range(20)]
+        rows = self.rows('refs.json', json.dumps(items, indent=2))
+
+        self.assertEqual([row.spec[0] for row in rows],
+                         [item['prefix'] for item in items])
+        self.assertEqual(rows[1].line, 13)
+
+    def test_json_resyncs_after_malformed_item(self):
+        for read_size in (7, manifest.JSON_READ_SIZE):
+            manifest.JSON_READ_SIZE = read_size
+            rows = self.rows('refs.json', '[\n'
+                                          '  ["a", 1, 2, 3],\n'
+                                          '  {"prefix": "b", "length" 1},\n'
+                                          '  ["c", 1, 2 3],\n'
+                                          '  ["d", [1, 2], {"x": "],"}],\n'
+                                          '  ["e", 1, 2, 3]\n'
+                                          ']\n')
+
+            self.assertEqual(
+                [(row.line, row.spec and row.spec[0]) for row in rows],
+                [(2, 'a'), (3, None), (4, None), (5, None), (6, 'e')])
+            self.assertEqual(rows[1].error, "Expecting ':' delimiter")
+            self.assertNotIn('column', rows[2].error)
+
+    def test_json_unterminated_item(self):
+        rows = self.rows('refs.json', '[["a", 1, 2, 3],\n'
+                                      ' ["b, 1, 2, 3],\n'
+                                      ' ["c", 1, 2, 3]]\n')
+
+        self.assertEqual(rows[0].spec[0], 'a')
+        self.assertEqual(rows[1].line, 2)
+        self.assertIn('the rest of the file was skipped', rows[1].error)
+        self.assertEqual(len(rows), 2)
+
+    def test_json_not_an_array(self):
+        rows = self.rows('refs.json', '{"prefix": "a"}')
+        self.assertEqual(rows, [manifest.ManifestRow(
+            1, None, 'expected a JSON array of references')])
+
+    def test_unsupported_manifest(self):
+        self.assertRaises(ValueError, manifest.iter_rows, 'refs.txt')
+
+
+class BuildFromManifestTest(ManifestTest):
+
+    def setUp(self):
+        super(BuildFromManifestTest, self).setUp()
+        self.previous = scene.set_backend(scene.FakeCmds())
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+        super(BuildFromManifestTest, self).tearDown()
+
+    def test_build(self):
+        chunks = []
+        path = self.write('refs.csv', 'prefix,length,width,height,unit\n'
+                                      'box,1,2,3,m\n'
+                                      'bad,1,2\n'
+                                      'box,1,2,3,m\n'
+                                      'door,2,1,0.5,m\n')
+        report = manifest.build_from_manifest(
+            path, chunk_size=2, on_chunk=lambda report: chunks.append(1))
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([line for line, _ in report['errors']], [3, 4])
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(
+            core.get_dimension_distances('box_refDistance_grp'),
+            (100.0, 200.0, 300.0))
@@ -0,0 +1,67 @@
+import unittest
+
+import core
+import naming
+import scene
+
+
+class NameAllocatorTest(unittest.TestCase):
+
+    def test_allocate(self):
+        allocator = naming.NameAllocator(['a_01', 'a_03'])
+
+        self.assertEqual(allocator.allocate('a'), 'a_02')
+        self.assertEqual(allocator.allocate('a'), 'a_04')
+        self.assertEqual(allocator.allocate('b', padding=3), 'b_001')
+        self.assertIn('a_02', allocator)
+
+    def test_allocate_exact(self):
+        allocator = naming.NameAllocator(['grp'])
+
+        self.assertEqual(allocator.allocate_exact('other'), 'other')
+        self.assertEqual(allocator.allocate_exact('grp'), 'grp1')
+        self.assertEqual(allocator.allocate_exact('grp'), 'grp2')
+
+    def test_release(self):
+        allocator = naming.NameAllocator([])
+        allocator.reserve('a')
+        self.assertFalse(allocator.is_free('a'))
+        allocator.release('a')
+        self.assertTrue(allocator.is_free('a'))
+
+    def test_indexes_the_scene(self):
+        previous = scene.set_backend(scene.FakeCmds())
+        try:
+            core.create_dimension_grps([('box', 1, 2, 3, None)])
+            allocator = naming.NameAllocator()
+        finally:
+            scene.set_backend(previous)
+
+        self.assertIn('box_refDistance_grp', allocator)
+        self.assertEqual(allocator.allocate('box_startlength_loc'),
+                         'box_startlength_loc_02')
+
+
+class ReferenceNodeNamesTest(unittest.TestCase):
+
+    def test_default_names(self):
+        names = naming.reference_node_names('box', ['length'])
+
+        self.assertEqual(names['ref_grp'], 'box_refDistance_grp')
+        self.assertEqual(names['length', 'grp'], 'box_lengthDist_grp')
+        self.assertEqual(names['length', 'start'], 'box_startlength_loc_01')
+        self.assertEqual(names['length', 'start_shape'],
+                         'box_startlength_loc_01Shape')
+        self.assertEqual(names['length', 'dist_shape'],
+                         'box_distlength_01Shape')
+
+    def test_names_are_unique(self):
+        allocator = naming.NameAllocator(['box_startlength_loc_01'])
+        names = naming.reference_node_names(
+            'box', ['length', 'width'], allocator)
+        again = naming.reference_node_names(
+            'box', ['length', 'width'], allocator)
+
+        self.assertEqual(names['length', 'start'], 'box_startlength_loc_02')
+        self.assertEqual(len(set(names.values()) | set(again.values())),
+                         2 * len(names))
@@ -0,0 +1,82 @@
+import threading
+import unittest
+
+import core
+import plan
+import scene
+
+
+class PlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+
+    def test_plan_touches_no_scene(self):
+        snapshot = plan.take_snapshot()
+        self.cmds.reset_stats()
+        build_plan = plan.plan_references(
+            [('box', 10, 20, 30, None), ('door', 2, 1, 0.5, 'm')], snapshot)
+
+        self.assertEqual(self.cmds.operation_count(), 0)
+        self.assertEqual(build_plan.references[1].dimensions,
+                         (200.0, 100.0, 50.0))
+
+    def test_execute_plan(self):
+        core.create_dimension_grps([('box', 10, 20, 30, None)])
+        build_plan = plan.plan_references(
+            [('box', 1, 1, 1, None), ('door', 2, 1, 0.5, 'm'),
+             ('bad', -1, 1, 1, None)],
+            plan.take_snapshot())
+        results = plan.execute_plan(build_plan)
+
+        self.assertIn('already exists', results[0].error)
+        self.assertEqual(results[1].group, 'door_refDistance_grp')
+        self.assertIsNotNone(results[2].error)
+        self.assertEqual(
+            core.get_dimension_distances('door_refDistance_grp'),
+            (200.0, 100.0, 50.0))
+        self.assertEqual(self.cmds.undo_depth, 0)
+
+    def test_malformed_specs_are_rejected(self):
+        build_plan = plan.plan_references(
+            [('q', 1, 2), ['a', 1, 1, 1, None]], plan.take_snapshot())
+
+        self.assertEqual(build_plan.errors[0][:2], (0, 'q'))
+        self.assertEqual([reference.prefix
+                          for reference in build_plan.references], ['a'])
+
+    def test_workers_plan_the_same(self):
+        specs = [('ref%d' % index, 1, 2, 3, None) for index in range(10)]
+        snapshot = plan.take_snapshot()
+        self.assertEqual(
+            plan.plan_references(specs, snapshot),
+            plan.plan_references(specs, snapshot, workers=3, chunk_size=3))
+
+    def test_plan_in_background(self):
+        done = threading.Event()
+        planned = []
+
+        def on_planned(build_plan):
+            planned.append(build_plan)
+            done.set()
+
+        plan.plan_in_background([('box', 10, 20, 30, None)], on_planned)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(planned[0].references[0].prefix, 'box')
+
+    def test_plan_in_background_error(self):
+        done = threading.Event()
+        errors = []
+
+        def on_error(err):
+            errors.append(err)
+            done.set()
+
+        plan.plan_in_background(
+            None, lambda build_plan: self.fail('planned'), on_error)
+        self.assertTrue(done.wait(5))
+        self.assertIsInstance(errors[0], TypeError)
@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import core
+import profiling
+import scene
+
+
+class ProfilingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+
+    def tearDown(self):
+        profiling.disable()
+        scene.set_backend(self.previous)
+
+    def test_disabled(self):
+        self.assertIsNone(profiling.get_profiler())
+        self.assertIs(profiling.phase('a'), profiling.phase('b'))
+
+        core.create_dimension_grps([('box', 1, 2, 3, None)])
+        self.assertIs(scene.get_backend(), self.cmds)
+
+    def test_build_steps(self):
+        with profiling.profile() as profiler:
+            core.create_dimension_grps(
+                [('box', 1, 2, 3, None), ('door', 1, 2, 3, None)])
+        self.assertIs(scene.get_backend(), self.cmds)
+
+        totals = dict((name, (calls, commands))
+                      for name, calls, _, commands in profiler.totals())
+        # the reference group and one group per dimension
+        self.assertEqual(totals['group'], (8, 8))
+        self.assertEqual(totals['locators'], (6, 36))
+        self.assertEqual(totals['distance'], (6, 12))
+        self.assertEqual(totals['connect'], (6, 12))
+        self.assertEqual(totals['metadata'], (2, 4))
+        self.assertEqual(totals['color'], (1, 1))
+        self.assertEqual(profiler.commands['createNode'], 2 * 22)
+        self.assertIn('createNode', profiler.summary())
+
+    def test_chrome_trace(self):
+        directory = tempfile.mkdtemp()
+        try:
+            with profiling.profile() as profiler:
+                with profiling.phase('outer'):
+                    with profiling.phase('inner'):
+                        scene.cmds.createNode('transform', n='a')
+
+            path = os.path.join(directory, 'trace.json')
+            profiler.export_chrome_trace(path)
+            with open(path) as trace_file:
+                events = json.load(trace_file)['traceEvents']
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual([(event['name'], event['args']['commands'])
+                          for event in events],
+                         [('inner', 1), ('outer', 0)])
+        self.assertEqual([event.depth for event in profiler.events], [1, 0])
@@ -0,0 +1,64 @@
+import unittest
+
+import core
+import registry
+import scene
+
+
+class RegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+        core.create_dimension_grps([
+            ('box', 10, 20, 30, None), ('crate', 10, 20, 30, None),
+            ('door', 2, 1, 0.5, 'm')])
+
+    def tearDown(self):
+        registry.disable()
+        scene.set_backend(self.previous)
+
+    def test_get_prefix(self):
+        self.assertEqual(registry.get_prefix('|a|box_refDistance_grp'), 'box')
+        self.assertIsNone(registry.get_prefix('box_lengthDist_grp'))
+
+    def test_scan(self):
+        ref_registry = registry.enable()
+
+        self.assertEqual(ref_registry.prefixes(), ['box', 'crate', 'door'])
+        self.assertEqual(ref_registry.get('door'), registry.ReferenceEntry(
+            'door', 'door_refDistance_grp', 'm', (200.0, 100.0, 50.0)))
+        self.assertEqual(
+            [entry.prefix for entry in ref_registry.find(unit='m')],
+            ['door'])
+        self.assertEqual(
+            [entry.prefix for entry in ref_registry.find(
+                dimensions=(10, 20, 30.0000001))],
+            ['box', 'crate'])
+        self.assertEqual(ref_registry.duplicates(), [['box', 'crate']])
+
+    def test_scan_converts_to_the_scene_unit(self):
+        self.cmds.currentUnit(linear='m')
+        ref_registry = registry.enable()
+
+        for value, expected in zip(
+                ref_registry.get('door').dimensions, (2.0, 1.0, 0.5)):
+            self.assertAlmostEqual(value, expected)
+
+    def test_kept_current_by_core(self):
+        ref_registry = registry.enable()
+        self.cmds.reset_stats()
+
+        core.create_dimension_grps([('shelf', 1, 2, 3, None)])
+        self.assertTrue(core.check_ref_grp_exists('shelf'))
+        self.assertEqual(core.delete_ref_grps(pattern='b*'), ['box'])
+        self.assertEqual(ref_registry.prefixes(), ['crate', 'door', 'shelf'])
+        self.assertEqual(self.cmds.stats.get('objExists', 0), 0)
+
+    def test_disable(self):
+        registry.enable()
+        registry.disable()
+
+        self.assertIsNone(registry.get_registry())
+        self.assertEqual(registry.existing_prefixes(),
+                         set(['box', 'crate', 'door']))
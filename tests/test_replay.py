@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import core
+import plan
+import scene
+
+
+class ReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.previous = scene.set_backend(scene.FakeCmds())
+        self.directory = tempfile.mkdtemp()
+        core.create_dimension_grps([
+            ('box', 10, 20, 30, None, (1, 2, 3)), ('door', 2, 1, 0.5, 'm')])
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+        shutil.rmtree(self.directory)
+
+    def record(self, name='lineup.json'):
+        path = os.path.join(self.directory, name)
+        self.assertEqual(plan.record_scene(path), 2)
+        return path
+
+    def test_saved_plan_loads_the_same(self):
+        for name in ('lineup.json', 'lineup.json.gz'):
+            path = self.record(name)
+            self.assertEqual(plan.load_plan(path), plan.plan_from_scene())
+
+    def test_file_holds_rows(self):
+        path = self.record()
+        self.assertLess(os.path.getsize(path), 300)
+
+    def test_replay(self):
+        path = self.record()
+        cmds = scene.FakeCmds()
+        scene.set_backend(cmds)
+
+        results = plan.replay_plan(path)
+        self.assertEqual([result.group for result in results],
+                         ['box_refDistance_grp', 'door_refDistance_grp'])
+        self.assertEqual(
+            core.get_dimension_distances('door_refDistance_grp'),
+            (200.0, 100.0, 50.0))
+        self.assertEqual(
+            cmds.getAttr('box_refDistance_grp.translate')[0], (1, 2, 3))
+        self.assertEqual(core.read_ref_grp('door').unit, 'm')
+
+    def test_replay_converts_scene_units(self):
+        path = self.record()
+        cmds = scene.FakeCmds(linear_unit='m')
+        scene.set_backend(cmds)
+
+        plan.replay_plan(path)
+        for value, expected in zip(
+                core.get_dimension_distances('door_refDistance_grp'),
+                (2.0, 1.0, 0.5)):
+            self.assertAlmostEqual(value, expected)
+        for value, expected in zip(
+                cmds.getAttr('box_refDistance_grp.translate')[0],
+                (0.01, 0.02, 0.03)):
+            self.assertAlmostEqual(value, expected)
+
+    def test_existing_prefixes_are_rejected(self):
+        path = self.record()
+        core.delete_ref_grps(names=['door'])
+
+        results = plan.replay_plan(path)
+        self.assertIn('already exists', results[0].error)
+        self.assertEqual(results[1].group, 'door_refDistance_grp')
+
+    def test_unsupported_file(self):
+        path = os.path.join(self.directory, 'old.json')
+        with open(path, 'w') as plan_file:
+            plan_file.write('{"version": 1}')
+        self.assertRaises(ValueError, plan.load_plan, path)
@@ -0,0 +1,38 @@
+import unittest
+
+import core
+import report
+import scene
+
+
+class ReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+        core.create_dimension_grps([
+            ('box', 10, 20, 30, None, (1, 2, 3)), ('door', 2, 1, 0.5, 'm')])
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+
+    def test_rows(self):
+        rows = list(report.iter_report_rows())
+
+        self.assertEqual([row.prefix for row in rows], ['box', 'door'])
+        self.assertEqual(rows[0][2:], (
+            10.0, 20.0, 30.0, None, 'cm', 1.0, 2.0, 3.0, 'measured', False))
+        self.assertEqual(rows[1].unit, 'm')
+
+    def test_moved_locators_are_stale(self):
+        start, end = core.get_dimension_locators(
+            'box_refDistance_grp')['length']
+        self.cmds.setAttr(start + '.localPosition', 8, 0, 0)
+
+        row = list(report.iter_report_rows())[0]
+        self.assertAlmostEqual(row.length, 13.0)
+        self.assertIs(row.stale, True)
+
+        row = list(report.iter_report_rows(measure=False))[0]
+        self.assertEqual((row.length, row.source, row.stale),
+                         (10.0, 'metadata', None))
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import core
+import scene
+import scheduler
+
+
+class ChunkedBuildTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+
+    def test_builds_in_chunks(self):
+        specs = [('ref%d' % index, 1, 2, 3, None) for index in range(10)]
+        build = scheduler.ChunkedBuild(specs)
+        build.chunk_size = 3
+
+        self.assertTrue(build.step())
+        self.assertEqual(build.created, ['ref0', 'ref1', 'ref2'])
+        self.assertAlmostEqual(build.progress, 0.3)
+
+        build.run()
+        self.assertTrue(build.finished)
+        self.assertEqual(build.processed, 10)
+        self.assertEqual(len(build.created), 10)
+        self.assertEqual(build.progress, 1.0)
+
+    def test_names_are_unique_across_chunks(self):
+        core.create_dimension_grps([('box', 1, 1, 1, None)])
+        build = scheduler.ChunkedBuild(
+            [('box', 1, 1, 1, None), ('a', 1, 1, 1, None),
+             ('a', 1, 1, 1, None)])
+        build.chunk_size = 1
+        build.run()
+
+        self.assertEqual(build.created, ['a'])
+        self.assertEqual([prefix for prefix, _ in build.errors],
+                         ['box', 'a'])
+
+    def test_cancel_rollback(self):
+        build = scheduler.ChunkedBuild(
+            [('ref%d' % index, 1, 2, 3, None) for index in range(4)])
+        build.chunk_size = 2
+        build.step()
+
+        self.assertEqual(sorted(build.cancel(rollback=True)),
+                         ['ref0', 'ref1'])
+        self.assertFalse(build.step())
+        self.assertFalse(core.check_ref_grp_exists('ref0'))
+
+
+class FromManifestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        scene.set_backend(self.previous)
+        shutil.rmtree(self.directory)
+
+    def test_streamed_total_is_unknown(self):
+        path = os.path.join(self.directory, 'refs.csv')
+        with open(path, 'w') as csv_file:
+            csv_file.write('prefix,length,width,height\n'
+                           'box,1,2,3\n'
+                           'bad,1,x,3\n'
+                           'door,2,1,0.5\n')
+
+        build = scheduler.ChunkedBuild.from_manifest(path)
+        self.assertIsNone(build.total)
+        self.assertIsNone(build.progress)
+
+        build.run()
+        self.assertEqual(build.created, ['box', 'door'])
+        self.assertEqual(build.errors, [(3, "invalid width: 'x'")])
+        self.assertEqual(build.processed, 3)
+        self.assertEqual(build.progress, 1.0)
@@ -0,0 +1,33 @@
+import unittest
+
+import units
+
+
+class UnitsTest(unittest.TestCase):
+
+    def test_known_factors(self):
+        for from_unit, to_unit, factor in (
+                ('m', 'cm', 100.0), ('cm', 'mm', 10.0), ('km', 'm', 1000.0),
+                ('in', 'cm', 2.54), ('ft', 'in', 12.0), ('yd', 'ft', 3.0),
+                ('mi', 'ft', 5280.0), ('cm', 'cm', 1.0)):
+            self.assertAlmostEqual(
+                units.conversion_factor(from_unit, to_unit), factor)
+
+    def test_round_trip(self):
+        for unit in units.UNIT_MEASUREMENTS:
+            self.assertAlmostEqual(
+                units.convert(units.convert(12.5, 'cm', unit), unit, 'cm'),
+                12.5)
+
+    def test_long_names(self):
+        self.assertEqual(units.normalize_unit('meter'), 'm')
+        self.assertAlmostEqual(units.convert(1, 'foot', 'inch'), 12.0)
+
+    def test_convert_many(self):
+        self.assertEqual(
+            [round(value, 9) for value in
+             units.convert_many((1, 2, 3), 'm', 'cm')],
+            [100.0, 200.0, 300.0])
+
+    def test_unknown_unit(self):
+        self.assertRaises(ValueError, units.conversion_factor, 'parsec', 'cm')
@@ -0,0 +1,71 @@
+import unittest
+
+import core
+import metadata
+import registry
+import scene
+
+
+class UpdateDimensionGrpTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmds = scene.FakeCmds()
+        self.previous = scene.set_backend(self.cmds)
+        core.create_dimension_grps([('box', 10, 20, 30, None)])
+
+    def tearDown(self):
+        registry.disable()
+        scene.set_backend(self.previous)
+
+    def distances(self):
+        return core.get_dimension_distances('box_refDistance_grp')
+
+    def test_resizes_only_changed_dimensions(self):
+        self.cmds.reset_stats()
+        self.assertEqual(
+            core.update_dimension_grp('box', length=12, width=20),
+            ['length'])
+        self.assertEqual(self.distances(), (12.0, 20.0, 30.0))
+        self.assertEqual(self.cmds.stats['setAttr'][0], 3)
+        self.assertEqual(
+            metadata.read('box_refDistance_grp')['dimensions'],
+            [12.0, 20.0, 30.0])
+
+    def test_converts_new_values(self):
+        core.update_dimension_grp('box', height=1, unit='m')
+        self.assertEqual(self.distances(), (10.0, 20.0, 100.0))
+        self.assertEqual(core.read_ref_grp('box').unit, 'm')
+
+    def test_moved_locators_are_resized(self):
+        start, _ = core.get_dimension_locators(
+            'box_refDistance_grp')['length']
+        self.cmds.setAttr(start + '.localPosition', 8, 0, 0)
+        self.assertAlmostEqual(self.distances()[0], 13.0)
+
+        self.assertEqual(
+            core.update_dimension_grp('box', length=10), ['length'])
+        self.assertEqual(self.distances(), (10.0, 20.0, 30.0))
+
+    def test_moved_locators_with_registry(self):
+        registry.enable()
+        start, _ = core.get_dimension_locators(
+            'box_refDistance_grp')['length']
+        self.cmds.setAttr(start + '.localPosition', 8, 0, 0)
+
+        self.assertEqual(
+            core.update_dimension_grp('box', length=10), ['length'])
+
+    def test_scene_unit_changed(self):
+        self.cmds.currentUnit(linear='m')
+        core.update_dimension_grp('box', width=1)
+
+        ref_data = metadata.read('box_refDistance_grp')
+        self.assertEqual(ref_data['scene_unit'], 'm')
+        for value, expected in zip(ref_data['dimensions'], (0.1, 1.0, 0.3)):
+            self.assertAlmostEqual(value, expected)
+
+    def test_missing_reference(self):
+        self.assertRaises(
+            ValueError, core.update_dimension_grp, 'nope', length=1)
+        self.assertRaises(
+            ValueError, core.update_dimension_grp, 'box', length=0)
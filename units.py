@@ -0,0 +1,126 @@
+'''Table driven linear unit conversion.
+
+Works on plain floats and, when NumPy is available, on whole arrays of
+dimensions at once. Nothing in here needs a Maya session.
+'''
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+UNIT_MEASUREMENTS = ['cm', 'mm', 'm', 'km', 'in', 'ft', 'yd', 'mi']
+
+# Size of one unit expressed in centimeters, Maya's internal linear unit.
+CENTIMETERS_PER_UNIT = {
+    'cm': 1.0,
+    'mm': 0.1,
+    'm': 100.0,
+    'km': 100000.0,
+    'in': 2.54,
+    'ft': 30.48,
+    'yd': 91.44,
+    'mi': 160934.4,
+}
+
+# Long names returned by cmds.currentUnit(query=True, fullName=True).
+UNIT_ALIASES = {
+    'centimeter': 'cm',
+    'millimeter': 'mm',
+    'meter': 'm',
+    'kilometer': 'km',
+    'inch': 'in',
+    'foot': 'ft',
+    'yard': 'yd',
+    'mile': 'mi',
+}
+
+
+def normalize_unit(unit):
+    '''Returns the short name of a linear unit.
+
+    Arguments:
+        unit {str} -- Short or long unit name, ie. 'cm' or 'centimeter'.
+
+    Raises:
+        ValueError -- If unit is not a known linear unit.
+
+    Returns:
+        str -- Short unit name, one of UNIT_MEASUREMENTS.
+    '''
+
+    short_unit = UNIT_ALIASES.get(unit, unit)
+    if short_unit not in CENTIMETERS_PER_UNIT:
+        raise ValueError('Unknown linear unit: ' + str(unit))
+    return short_unit
+
+
+def conversion_factor(from_unit, to_unit):
+    '''Returns the multiplier that converts from_unit values to to_unit.
+
+    Arguments:
+        from_unit {str} -- Unit the values are expressed in.
+        to_unit {str} -- Unit to convert the values to.
+
+    Returns:
+        float -- Conversion multiplier.
+    '''
+
+    from_unit = normalize_unit(from_unit)
+    to_unit = normalize_unit(to_unit)
+    if from_unit == to_unit:
+        return 1.0
+    return CENTIMETERS_PER_UNIT[from_unit] / CENTIMETERS_PER_UNIT[to_unit]
+
+
+def convert(value, from_unit, to_unit):
+    '''Converts a single value between linear units.
+
+    Arguments:
+        value {float} -- Value expressed in from_unit.
+        from_unit {str} -- Unit the value is expressed in.
+        to_unit {str} -- Unit to convert the value to.
+
+    Returns:
+        float -- Value expressed in to_unit.
+    '''
+
+    return float(value) * conversion_factor(from_unit, to_unit)
+
+
+def convert_many(values, from_unit, to_unit):
+    '''Converts a sequence of values between linear units.
+
+    Arguments:
+        values {iterable} -- Values expressed in from_unit.
+        from_unit {str} -- Unit the values are expressed in.
+        to_unit {str} -- Unit to convert the values to.
+
+    Returns:
+        list -- Values expressed in to_unit.
+    '''
+
+    factor = conversion_factor(from_unit, to_unit)
+    return [float(value) * factor for value in values]
+
+
+def convert_array(values, from_unit, to_unit):
+    '''Converts an array of dimensions between linear units with NumPy.
+
+    Arguments:
+        values {array_like} -- Values of any shape, ie. an (N, 3) array of
+            length, width and height rows.
+        from_unit {str} -- Unit the values are expressed in.
+        to_unit {str} -- Unit to convert the values to.
+
+    Raises:
+        ImportError -- If NumPy is not available.
+
+    Returns:
+        numpy.ndarray -- Float64 array of converted values.
+    '''
+
+    if numpy is None:
+        raise ImportError('convert_array requires NumPy')
+    return numpy.asarray(values, dtype=numpy.float64) * \
+        conversion_factor(from_unit, to_unit)
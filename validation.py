@@ -0,0 +1,237 @@
+'''Pre-flight validation of reference specs before any scene work.
+
+Checks a whole batch at once, with NumPy when it is available:
+
+    MALFORMED -- the spec is not a (prefix, length, width, height, unit[,
+        position]) list or tuple. The other checks skip it.
+    EMPTY_PREFIX -- the prefix is empty.
+    INVALID_NUMBER -- a dimension is not a finite number.
+    UNKNOWN_UNIT -- the unit is not a linear unit.
+    NON_POSITIVE -- a dimension is zero or negative.
+    TOO_SMALL -- a dimension is below min_size once converted to scene
+        units.
+    DUPLICATE_PREFIX -- the prefix was already used earlier in the batch.
+    EXISTS -- a _refDistance_grp with the prefix is already in the scene.
+
+Scene collisions are resolved with the reference registry when it is
+enabled, otherwise with a single ls query.
+'''
+
+import math
+from collections import namedtuple
+
+import registry
+import units
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SpecError = namedtuple('SpecError', ['index', 'prefix', 'code', 'message'])
+
+# stands in for malformed specs during the other checks
+_MALFORMED_SPEC = ('', 1.0, 1.0, 1.0, None)
+
+MALFORMED = 'MALFORMED'
+EMPTY_PREFIX = 'EMPTY_PREFIX'
+INVALID_NUMBER = 'INVALID_NUMBER'
+UNKNOWN_UNIT = 'UNKNOWN_UNIT'
+NON_POSITIVE = 'NON_POSITIVE'
+TOO_SMALL = 'TOO_SMALL'
+DUPLICATE_PREFIX = 'DUPLICATE_PREFIX'
+EXISTS = 'EXISTS'
+
+
+def validate_specs(specs, scene_unit, min_size=None, check_scene=True,
+                   existing=None):
+    '''Returns every problem found in a batch of specs.
+
+    Arguments:
+        specs {list} -- (prefix, length, width, height, unit[, position])
+            tuples, see core.create_dimension_grps.
+        scene_unit {str} -- Scene's linear unit.
+
+    Keyword Arguments:
+        min_size {float} -- Smallest dimension allowed once converted to
+            scene units, None skips the check (default: {None})
+        check_scene {bool} -- Report prefixes already used in the scene
+            (default: {True})
+        existing {set} -- Prefixes already used in the scene, None
+            queries them (default: {None})
+
+    Returns:
+        list -- SpecError(index, prefix, code, message) tuples sorted by
+            index. A spec can have several errors.
+    '''
+
+    errors = []
+    malformed = set()
+    for index, spec in enumerate(specs):
+        if not isinstance(spec, (list, tuple)) or len(spec) < 5:
+            malformed.add(index)
+            errors.append(SpecError(
+                index, spec_prefix(spec), MALFORMED,
+                'expected (prefix, length, width, height, unit[, position])'
+                ', got ' + repr(spec)))
+    if malformed:
+        # checked as a valid spec without a prefix, whose errors are dropped
+        specs = [_MALFORMED_SPEC if index in malformed else spec
+                 for index, spec in enumerate(specs)]
+
+    prefixes = [spec_prefix(spec) for spec in specs]
+    dimensions, bad_numbers = _coerce_dimensions(specs)
+
+    # unit -> factor to scene units, None for unknown units
+    factors = {}
+    unit_factors = []
+    for index, spec in enumerate(specs):
+        unit = spec[4] or scene_unit
+        if unit not in factors:
+            try:
+                factors[unit] = units.conversion_factor(unit, scene_unit)
+            except ValueError:
+                factors[unit] = None
+        if factors[unit] is None:
+            errors.append(SpecError(
+                index, prefixes[index], UNKNOWN_UNIT,
+                'unknown unit ' + repr(spec[4])))
+        unit_factors.append(factors[unit] or 1.0)
+
+    for index in bad_numbers:
+        errors.append(SpecError(
+            index, prefixes[index], INVALID_NUMBER,
+            'dimensions must be finite numbers'))
+
+    if numpy is not None:
+        non_positive, too_small = _check_sizes_numpy(
+            dimensions, unit_factors, min_size)
+    else:
+        non_positive, too_small = _check_sizes_python(
+            dimensions, unit_factors, min_size)
+
+    bad_numbers = set(bad_numbers)
+    for index in non_positive:
+        if index not in bad_numbers:
+            errors.append(SpecError(
+                index, prefixes[index], NON_POSITIVE,
+                'dimensions must be greater than zero'))
+    for index in too_small:
+        if index not in bad_numbers:
+            errors.append(SpecError(
+                index, prefixes[index], TOO_SMALL,
+                'dimensions are smaller than ' + str(min_size) + ' ' +
+                str(scene_unit) + ' in scene units'))
+
+    seen = set()
+    if not check_scene:
+        existing = set()
+    elif existing is None:
+        existing = registry.existing_prefixes()
+    for index, prefix in enumerate(prefixes):
+        if index in malformed:
+            continue
+        if not prefix:
+            errors.append(SpecError(
+                index, prefix, EMPTY_PREFIX, 'a name was not entered'))
+            continue
+        if prefix in seen:
+            errors.append(SpecError(
+                index, prefix, DUPLICATE_PREFIX,
+                'prefix is used more than once in the batch'))
+        elif prefix in existing:
+            errors.append(SpecError(
+                index, prefix, EXISTS,
+                prefix + registry.REF_GRP_SUFFIX + ' already exists'))
+        seen.add(prefix)
+
+    errors.sort(key=lambda error: error.index)
+    return errors
+
+
+def spec_prefix(spec):
+    '''Returns the prefix of a spec as text, '' when it has none.
+
+    '''
+
+    if not isinstance(spec, (list, tuple)) or not spec or spec[0] is None:
+        return ''
+    return str(spec[0])
+
+
+def invalid_indices(errors):
+    '''Returns the set of spec indices that have at least one error.
+
+    '''
+
+    return set(error.index for error in errors)
+
+
+def format_errors(errors, limit=20):
+    '''Returns the error table as text, ie. for a popup or a log.
+
+    Keyword Arguments:
+        limit {int} -- Rows to show before summarizing the rest
+            (default: {20})
+    '''
+
+    lines = ['%6s  %-20s %-16s %s' % ('index', 'prefix', 'code', 'message')]
+    for error in errors[:limit]:
+        lines.append('%6d  %-20s %-16s %s' % error)
+    if len(errors) > limit:
+        lines.append('... ' + str(len(errors) - limit) + ' more')
+    return '\n'.join(lines)
+
+
+def _coerce_dimensions(specs):
+    # returns (length, width, height) rows and the indices of rows holding
+    # values that are not finite numbers, which are replaced with 1.0
+    if numpy is not None:
+        try:
+            rows = numpy.array(
+                [spec[1:4] for spec in specs], dtype=numpy.float64)
+        except (TypeError, ValueError):
+            pass
+        else:
+            if rows.shape == (len(specs), 3) and numpy.isfinite(rows).all():
+                return rows, []
+
+    rows = []
+    bad_numbers = []
+    for index, spec in enumerate(specs):
+        try:
+            row = tuple(float(value) for value in spec[1:4])
+            if len(row) != 3 or \
+                    any(math.isnan(value) or math.isinf(value)
+                        for value in row):
+                raise ValueError(row)
+        except (TypeError, ValueError):
+            bad_numbers.append(index)
+            row = (1.0, 1.0, 1.0)
+        rows.append(row)
+    return rows, bad_numbers
+
+
+def _check_sizes_numpy(dimensions, unit_factors, min_size):
+    dimensions = numpy.asarray(dimensions, dtype=numpy.float64).reshape(-1, 3)
+
+    non_positive = (dimensions <= 0.0).any(axis=1)
+    too_small = numpy.zeros(len(dimensions), dtype=bool)
+    if min_size is not None:
+        converted = dimensions * numpy.asarray(
+            unit_factors, dtype=numpy.float64)[:, None]
+        too_small = (converted < min_size).any(axis=1) & ~non_positive
+
+    return numpy.flatnonzero(non_positive).tolist(), \
+        numpy.flatnonzero(too_small).tolist()
+
+
+def _check_sizes_python(dimensions, unit_factors, min_size):
+    non_positive = []
+    too_small = []
+    for index, (row, factor) in enumerate(zip(dimensions, unit_factors)):
+        if min(row) <= 0.0:
+            non_positive.append(index)
+        elif min_size is not None and min(row) * factor < min_size:
+            too_small.append(index)
+    return non_positive, too_small